@@ -1,19 +1,23 @@
 """Custom formatter and action for argparse."""
 
+# Modules needed only for ``--help`` and ``README.rst`` actions are imported when first
+# needed, to speed up starting the command line tools
+# pylint: disable=import-outside-toplevel
+
 import logging
 import re
 import sys
 from abc import ABC
 from argparse import SUPPRESS, Action, ArgumentParser, HelpFormatter, Namespace
-from difflib import ndiff
 from pathlib import Path
-from textwrap import fill
 from typing import Any, List, Optional, Sequence, Union
 
 WORD_RE = re.compile(r"\w")
 
 
 def _fill_line(line: str, width: int, indent: str) -> str:
+    from textwrap import fill
+
     first_word_match = WORD_RE.search(line)
     first_word_offset = first_word_match.start() if first_word_match else 0
     return fill(
@@ -110,6 +114,8 @@ class VerifyReadmeAction(SuppressedFlagAction):
                 usage = generate_options_for_readme(parser).splitlines(keepends=True)
                 if lines == usage:
                     parser.exit(0, "README.rst is up to date\n")
+                from difflib import ndiff
+
                 parser.exit(1, "".join(ndiff(lines, usage)) + "\n")
         parser.exit(2, "Could not find --help output in README.rst\n")
 
@@ -0,0 +1,6 @@
+"""Benchmarks for Darkgraylib
+
+Run the benchmarks using e.g. ``python -m darkgraylib.bench diff``, and see
+``python -m darkgraylib.bench --help`` for options.
+
+"""
@@ -0,0 +1,7 @@
+"""Entry point for ``python -m darkgraylib.bench``"""
+
+import sys
+
+from darkgraylib.bench.cli import main
+
+sys.exit(main())
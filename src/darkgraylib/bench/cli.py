@@ -0,0 +1,99 @@
+"""Command line interface for running benchmarks"""
+
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Callable
+
+from darkgraylib.bench import diff, editing, textdocument
+from darkgraylib.bench.runner import (
+    Benchmark,
+    compare_to_baseline,
+    format_result,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+SUITES: dict[str, Callable[[], list[Benchmark]]] = {
+    "diff": diff.get_benchmarks,
+    "edit": editing.get_benchmarks,
+    "textdocument": textdocument.get_benchmarks,
+}
+
+
+def make_argument_parser() -> ArgumentParser:
+    """Create the argument parser for the benchmark runner"""
+    parser = ArgumentParser(
+        prog="python -m darkgraylib.bench",
+        description="Run Darkgraylib benchmarks on deterministic synthetic corpora",
+    )
+    parser.add_argument("suite", choices=sorted(SUITES), help="Benchmark suite to run")
+    parser.add_argument(
+        "-k",
+        "--filter",
+        default="",
+        help="Only run benchmarks whose name contains this string",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for the size of the corpora [default: 1.0]",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of timed runs for each benchmark [default: 3]",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        metavar="PATH",
+        help="Compare results to a JSON baseline stored using `--save-baseline`",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        type=Path,
+        metavar="PATH",
+        help="Store the results in a JSON baseline file",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative slowdown or memory growth to accept [default: 0.25]",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a benchmark suite and report the results
+
+    :param argv: The command line arguments, or ``None`` to use ``sys.argv``
+    :return: ``1`` if results regressed compared to the baseline, ``0`` otherwise
+
+    """
+    args = make_argument_parser().parse_args(argv)
+    benchmarks = [
+        benchmark for benchmark in SUITES[args.suite]() if args.filter in benchmark.name
+    ]
+    baseline = load_baseline(args.baseline).get(args.suite, {}) if args.baseline else {}
+    results = run_benchmarks(benchmarks, args.scale, args.repeat)
+    regressions = []
+    for result in results:
+        print(format_result(result, baseline.get(result.name)))
+        regressions.extend(
+            compare_to_baseline(result, baseline.get(result.name), args.tolerance)
+        )
+    if args.save_baseline:
+        save_baseline(args.save_baseline, args.suite, results)
+    if regressions:
+        print("\nRegressions compared to baseline:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,141 @@
+"""Deterministic synthetic corpora of original and modified documents for benchmarks
+
+Each corpus is generated from a fixed random seed, so repeated runs and runs on
+different machines benchmark identical content. The ``scale`` argument multiplies the
+size of each corpus.
+
+"""
+
+from random import Random
+from typing import Callable, Dict, List, Tuple
+
+from darkgraylib.utils import TextDocument, joinlines
+
+Corpus = List[Tuple[TextDocument, TextDocument]]
+
+SEED = 20240229
+
+WORDS = (
+    "alpha beta gamma delta epsilon value result items config path line source"
+    " document opcode chunk linter reformat revision worktree parser"
+).split()
+
+
+def _scaled(count: int, scale: float) -> int:
+    """Return the given count multiplied by the scale, but at least one"""
+    return max(1, int(count * scale))
+
+
+def generate_python_lines(rng: Random, count: int) -> List[str]:
+    """Generate Python-like source code lines
+
+    :param rng: The random number generator to use
+    :param count: The number of lines to generate
+    :return: The generated lines
+
+    """
+    lines: List[str] = []
+    while len(lines) < count:
+        name = "_".join(rng.sample(WORDS, 2))
+        lines.append(f"def {name}({rng.choice(WORDS)}, {rng.choice(WORDS)}):")
+        for _ in range(rng.randint(2, 12)):
+            target, call, arg = rng.choice(WORDS), rng.choice(WORDS), rng.choice(WORDS)
+            lines.append(f"    {target} = {call}({arg}, {rng.randint(0, 999)})")
+        lines.append(f"    return {rng.choice(WORDS)}")
+        lines.append("")
+    return lines[:count]
+
+
+def edit_lines(rng: Random, lines: List[str], edits: int) -> List[str]:
+    """Return a copy of the lines with random replacements, insertions and deletions
+
+    :param rng: The random number generator to use
+    :param lines: The original lines
+    :param edits: The number of edits to make
+    :return: The edited lines
+
+    """
+    result = list(lines)
+    for _ in range(edits):
+        start = rng.randrange(len(result) + 1)
+        operation = rng.choice(("replace", "insert", "delete"))
+        new_lines = generate_python_lines(rng, rng.randint(1, 4))
+        end = start + len(new_lines)
+        if operation == "insert" or start == len(result):
+            result[start:start] = new_lines
+        elif operation == "replace":
+            result[start:end] = new_lines
+        else:
+            del result[start:end]
+    return result
+
+
+def small_edits_to_large_file(scale: float) -> Corpus:
+    """A single large file with a few edits scattered around it"""
+    rng = Random(SEED)
+    lines = generate_python_lines(rng, _scaled(10_000, scale))
+    edited = edit_lines(rng, lines, _scaled(20, scale))
+    return [(TextDocument.from_lines(lines), TextDocument.from_lines(edited))]
+
+
+def many_small_files(scale: float) -> Corpus:
+    """Lots of small files with one or two edits each"""
+    rng = Random(SEED)
+    corpus = []
+    for _ in range(_scaled(2_000, scale)):
+        lines = generate_python_lines(rng, rng.randint(5, 60))
+        edited = edit_lines(rng, lines, rng.randint(1, 2))
+        corpus.append((TextDocument.from_lines(lines), TextDocument.from_lines(edited)))
+    return corpus
+
+
+def repetitive_content(scale: float) -> Corpus:
+    """Files consisting of a handful of distinct lines repeated over and over
+
+    This is the worst case for diff algorithms which look for unique matching lines.
+
+    """
+    rng = Random(SEED)
+    vocabulary = ["", "    pass", "    x = 1", "    return x", "def f():", "# ---"]
+    corpus = []
+    for _ in range(_scaled(20, scale)):
+        lines = [rng.choice(vocabulary) for _ in range(1_000)]
+        edited = list(lines)
+        for _ in range(20):
+            edited[rng.randrange(len(edited))] = rng.choice(vocabulary)
+        corpus.append((TextDocument.from_lines(lines), TextDocument.from_lines(edited)))
+    return corpus
+
+
+def crlf_mixture(scale: float) -> Corpus:
+    """Files with CRLF, LF and mixed newlines, parsed from strings"""
+    rng = Random(SEED)
+    corpus = []
+    for index in range(_scaled(500, scale)):
+        lines = generate_python_lines(rng, rng.randint(20, 200))
+        edited = edit_lines(rng, lines, 2)
+        newline = ("\n", "\r\n")[index % 2]
+        original = joinlines(lines, newline)
+        if index % 3 == 0:
+            # Mix in lines with the other kind of newline
+            original = original.replace("    return", "\r\n    return")
+        corpus.append(
+            (
+                TextDocument.from_str(original),
+                TextDocument.from_str(joinlines(edited, "\r\n")),
+            )
+        )
+    return corpus
+
+
+CORPORA: Dict[str, Callable[[float], Corpus]] = {
+    "large-file-small-edits": small_edits_to_large_file,
+    "many-small-files": many_small_files,
+    "repetitive": repetitive_content,
+    "crlf-mixture": crlf_mixture,
+}
+
+
+def count_lines(corpus: Corpus) -> int:
+    """Return the total number of lines in all documents of the corpus"""
+    return sum(len(src.lines) + len(dst.lines) for src, dst in corpus)
@@ -0,0 +1,99 @@
+"""Benchmarks for `darkgraylib.diff`"""
+
+from functools import partial
+from typing import Callable, List
+
+from darkgraylib.bench.corpora import CORPORA, Corpus, count_lines
+from darkgraylib.bench.runner import Benchmark, BenchmarkFunction
+from darkgraylib.diff import (
+    diff_and_get_opcodes,
+    map_moved_lines,
+    map_unmodified_lines,
+    validate_opcodes,
+)
+
+# The minimum moved block length to benchmark moved block detection with
+MIN_MOVED_BLOCK_LINES = 3
+
+
+def _prepare(make_corpus: Callable[[float], Corpus], scale: float) -> Corpus:
+    """Generate a corpus and split its documents into lines before timing"""
+    corpus = make_corpus(scale)
+    count_lines(corpus)
+    return corpus
+
+
+def _setup_diff_and_get_opcodes(
+    make_corpus: Callable[[float], Corpus], scale: float
+) -> BenchmarkFunction:
+    """Prepare to time `diff_and_get_opcodes` for each document pair"""
+    corpus = _prepare(make_corpus, scale)
+    lines = count_lines(corpus)
+
+    def run() -> int:
+        for src, dst in corpus:
+            diff_and_get_opcodes(src, dst)
+        return lines
+
+    return run
+
+
+def _setup_map_unmodified_lines(
+    make_corpus: Callable[[float], Corpus], scale: float
+) -> BenchmarkFunction:
+    """Prepare to time `map_unmodified_lines` for each document pair"""
+    corpus = _prepare(make_corpus, scale)
+    lines = count_lines(corpus)
+
+    def run() -> int:
+        for src, dst in corpus:
+            map_unmodified_lines(src, dst)
+        return lines
+
+    return run
+
+
+def _setup_map_moved_lines(
+    make_corpus: Callable[[float], Corpus], scale: float
+) -> BenchmarkFunction:
+    """Prepare to time `map_moved_lines` for each document pair, without a diff"""
+    corpus = _prepare(make_corpus, scale)
+    lines = count_lines(corpus)
+
+    def run() -> int:
+        for src, dst in corpus:
+            map_moved_lines(src.lines, dst.lines, {}, MIN_MOVED_BLOCK_LINES)
+        return lines
+
+    return run
+
+
+def _setup_validate_opcodes(
+    make_corpus: Callable[[float], Corpus], scale: float
+) -> BenchmarkFunction:
+    """Prepare to time `validate_opcodes` for the opcodes of each document pair"""
+    corpus = _prepare(make_corpus, scale)
+    lines = count_lines(corpus)
+    all_opcodes = [diff_and_get_opcodes(src, dst) for src, dst in corpus]
+
+    def run() -> int:
+        for opcodes in all_opcodes:
+            validate_opcodes(opcodes)
+        return lines
+
+    return run
+
+
+def get_benchmarks() -> List[Benchmark]:
+    """Return benchmarks for each diff function on each corpus"""
+    setups = {
+        "diff_and_get_opcodes": _setup_diff_and_get_opcodes,
+        "map_unmodified_lines": _setup_map_unmodified_lines,
+        "map_moved_lines": _setup_map_moved_lines,
+        "validate_opcodes": _setup_validate_opcodes,
+    }
+    return [
+        Benchmark(f"{function_name}[{corpus_name}]", partial(setup, make_corpus))
+        for function_name, setup in setups.items()
+        for corpus_name, make_corpus in CORPORA.items()
+    ]
@@ -0,0 +1,70 @@
+"""Benchmarks for `darkgraylib.editing`"""
+
+from functools import partial
+from random import Random
+from typing import Callable, List, Tuple
+
+from darkgraylib.bench.corpora import SEED, _scaled, generate_python_lines
+from darkgraylib.bench.runner import Benchmark, BenchmarkFunction
+from darkgraylib.editing import EditableTextDocument
+from darkgraylib.utils import TextDocument
+
+# Chunk edits as ``(start, end, new_lines)``, ordered from the end of the document
+Chunks = List[Tuple[int, int, List[str]]]
+
+
+def many_chunks(scale: float) -> Tuple[TextDocument, Chunks]:
+    """A large file with hundreds of chunks to replace, in reverse order
+
+    :param scale: Multiplier for the size of the file and the number of chunks
+    :return: The original document and the chunks to replace
+
+    """
+    rng = Random(SEED)
+    lines = generate_python_lines(rng, _scaled(20_000, scale))
+    starts = sorted(rng.sample(range(len(lines)), _scaled(500, scale)), reverse=True)
+    chunks = []
+    end = len(lines)
+    for start in starts:
+        chunk_end = min(end, start + rng.randint(0, 3))
+        chunks.append((start, chunk_end, generate_python_lines(rng, rng.randint(0, 4))))
+        end = start
+    return TextDocument.from_lines(lines), chunks
+
+
+def _replace_with_tuples(document: TextDocument, chunks: Chunks) -> TextDocument:
+    """Apply chunks by rebuilding the tuple of lines for each chunk"""
+    lines = document.lines
+    for start, end, new_lines in chunks:
+        lines = lines[:start] + tuple(new_lines) + lines[end:]
+    return TextDocument.from_lines(lines)
+
+
+def _replace_with_piece_table(document: TextDocument, chunks: Chunks) -> TextDocument:
+    """Apply chunks using `EditableTextDocument`"""
+    editable = EditableTextDocument(document)
+    for start, end, new_lines in chunks:
+        editable.replace(start, end, new_lines)
+    return editable.freeze()
+
+
+def _setup(
+    replace: Callable[[TextDocument, Chunks], TextDocument], scale: float
+) -> BenchmarkFunction:
+    """Prepare to time applying the chunks of the corpus using the given function"""
+    document, chunks = many_chunks(scale)
+
+    def run() -> int:
+        return len(replace(document, chunks).lines)
+
+    return run
+
+
+def get_benchmarks() -> List[Benchmark]:
+    """Return benchmarks for applying many chunks with and without a piece table"""
+    return [
+        Benchmark("replace_chunks[tuples]", partial(_setup, _replace_with_tuples)),
+        Benchmark(
+            "replace_chunks[piece-table]", partial(_setup, _replace_with_piece_table)
+        ),
+    ]
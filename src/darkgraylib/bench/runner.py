@@ -0,0 +1,182 @@
+"""Timing, memory measurement and baseline comparison for benchmarks"""
+
+import json
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# A benchmark function processes its data and returns the number of lines processed
+BenchmarkFunction = Callable[[], int]
+
+# Baseline results as stored in JSON: suite name -> benchmark name -> metric -> value
+Baseline = Dict[str, Dict[str, Dict[str, float]]]
+
+# Fast benchmark functions are called repeatedly until a timing takes at least this long
+MIN_TIMING_SECONDS = 0.2
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A named benchmark
+
+    ``setup`` receives the corpus scale, prepares any data for the benchmark without
+    being timed, and returns the function to be timed.
+
+    """
+
+    name: str
+    setup: Callable[[float], BenchmarkFunction]
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """The results of running one benchmark"""
+
+    name: str
+    lines: int
+    seconds: float
+    peak_memory: int
+
+    @property
+    def lines_per_second(self) -> float:
+        """Return the throughput of the benchmark"""
+        return self.lines / self.seconds if self.seconds else float("inf")
+
+
+def _time(function: BenchmarkFunction, number: int) -> Tuple[float, int]:
+    """Call the function ``number`` times, return elapsed time and lines processed"""
+    lines = 0
+    start = perf_counter()
+    for _ in range(number):
+        lines = function()
+    return perf_counter() - start, lines
+
+
+def run_benchmark(
+    name: str, function: BenchmarkFunction, repeat: int
+) -> BenchmarkResult:
+    """Time a benchmark function and measure its peak memory use
+
+    The function is timed ``repeat`` times, and the fastest timing is reported. Like in
+    `timeit`, fast functions are called multiple times in each timing to reduce noise.
+    Memory is measured in one additional run, since tracing allocations slows Python
+    down.
+
+    :param name: The name of the benchmark
+    :param function: The function to benchmark
+    :param repeat: The number of timed runs
+    :return: The results of the benchmark
+
+    """
+    number = 1
+    while True:
+        seconds, lines = _time(function, number)
+        if seconds >= MIN_TIMING_SECONDS:
+            break
+        number *= 2
+    timings = [seconds / number]
+    for _ in range(repeat - 1):
+        seconds, lines = _time(function, number)
+        timings.append(seconds / number)
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(name, lines, min(timings), peak_memory)
+
+
+def run_benchmarks(
+    benchmarks: Iterable[Benchmark], scale: float, repeat: int
+) -> List[BenchmarkResult]:
+    """Set up and run the given benchmarks
+
+    :param benchmarks: The benchmarks to run
+    :param scale: The multiplier for the size of the corpora
+    :param repeat: The number of timed runs for each benchmark
+    :return: The results for each benchmark
+
+    """
+    return [
+        run_benchmark(benchmark.name, benchmark.setup(scale), repeat)
+        for benchmark in benchmarks
+    ]
+
+
+def load_baseline(path: Path) -> Baseline:
+    """Load stored benchmark results from a JSON file
+
+    :param path: The path to the JSON file
+    :return: The baseline results, or an empty baseline if the file doesn't exist
+
+    """
+    if not path.is_file():
+        return {}
+    with path.open(encoding="utf-8") as baseline_file:
+        baseline: Baseline = json.load(baseline_file)
+    return baseline
+
+
+def save_baseline(path: Path, suite: str, results: Iterable[BenchmarkResult]) -> None:
+    """Store benchmark results for a suite in a JSON file, keeping other suites
+
+    :param path: The path to the JSON file
+    :param suite: The name of the benchmark suite
+    :param results: The results to store
+
+    """
+    baseline = load_baseline(path)
+    baseline[suite] = {
+        result.name: {
+            "lines_per_second": result.lines_per_second,
+            "peak_memory": result.peak_memory,
+        }
+        for result in results
+    }
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def compare_to_baseline(
+    result: BenchmarkResult, baseline: Optional[Dict[str, float]], tolerance: float
+) -> List[str]:
+    """Return descriptions of regressions in a result compared to the baseline
+
+    :param result: The result of a benchmark
+    :param baseline: The baseline metrics for the same benchmark, or ``None`` if there
+                     is no baseline for it
+    :param tolerance: The relative slowdown or memory growth to accept
+    :return: A list of regressions exceeding the tolerance
+
+    """
+    if not baseline:
+        return []
+    regressions = []
+    speed = result.lines_per_second / baseline["lines_per_second"]
+    if speed < 1 - tolerance:
+        regressions.append(f"{result.name}: throughput {speed - 1:+.1%}")
+    memory = result.peak_memory / max(baseline["peak_memory"], 1)
+    if memory > 1 + tolerance:
+        regressions.append(f"{result.name}: peak memory {memory - 1:+.1%}")
+    return regressions
+
+
+def format_result(result: BenchmarkResult, baseline: Optional[Dict[str, float]]) -> str:
+    """Format a benchmark result as a table row
+
+    :param result: The result of a benchmark
+    :param baseline: The baseline metrics for the same benchmark, or ``None``
+    :return: The formatted table row
+
+    """
+    row = (
+        f"{result.name:<52} {result.lines_per_second:>14,.0f} lines/s"
+        f" {result.peak_memory / 1024:>10,.0f} KiB"
+    )
+    if baseline:
+        speed = result.lines_per_second / baseline["lines_per_second"] - 1
+        memory = result.peak_memory / max(baseline["peak_memory"], 1) - 1
+        row += f"  (speed {speed:+.1%}, memory {memory:+.1%})"
+    return row
@@ -0,0 +1,32 @@
+"""Benchmarks for `darkgraylib.utils.TextDocument`"""
+
+from functools import partial
+from typing import Callable, List
+
+from darkgraylib.bench.corpora import CORPORA, Corpus, count_lines
+from darkgraylib.bench.runner import Benchmark, BenchmarkFunction
+from darkgraylib.utils import TextDocument
+
+
+def _setup_from_bytes(
+    make_corpus: Callable[[float], Corpus], scale: float
+) -> BenchmarkFunction:
+    """Prepare to time `TextDocument.from_bytes` for the encoded documents"""
+    corpus = make_corpus(scale)
+    lines = count_lines(corpus)
+    all_data = [doc.encoded_string for pair in corpus for doc in pair]
+
+    def run() -> int:
+        for data in all_data:
+            TextDocument.from_bytes(data)
+        return lines
+
+    return run
+
+
+def get_benchmarks() -> List[Benchmark]:
+    """Return benchmarks for creating text documents from each corpus"""
+    return [
+        Benchmark(f"from_bytes[{corpus_name}]", partial(_setup_from_bytes, make_corpus))
+        for corpus_name, make_corpus in CORPORA.items()
+    ]
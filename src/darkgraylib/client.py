@@ -0,0 +1,113 @@
+"""Run Darker or Graylint in a server process started with `darkgraylib.server`
+
+This module only imports light-weight modules, so a command line shim using it starts
+quickly::
+
+    >>> import sys
+    >>> sys.exit(run_client(Path("/tmp/darker.sock"), sys.argv[1:]))  # doctest: +SKIP
+
+A request consists of a header and the standard input. The header is a four byte
+length followed by a JSON object with the command line arguments, working directory,
+environment variables and whether standard output and error are terminals. Standard
+input is sent only for ``--stdin-filename``, and the client then closes its side for
+writing.
+
+The response is a sequence of frames, each with a one byte frame type and a four byte
+payload length. Frames for standard output and standard error are written to the
+corresponding streams of the client, and the last frame contains the exit code.
+
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Union
+
+FRAME_HEADER = struct.Struct(">BI")
+FRAME_STDOUT = 1
+FRAME_STDERR = 2
+FRAME_EXIT = 3
+EXIT_CODE = struct.Struct(">i")
+REQUEST_LENGTH = struct.Struct(">I")
+
+RequestHeader = Dict[str, Union[List[str], str, Dict[str, str], bool]]
+
+
+def read_exactly(connection: socket.socket, size: int) -> bytes:
+    """Read the given number of bytes from a socket
+
+    :param connection: The socket to read from
+    :param size: The number of bytes to read
+    :return: The bytes read
+    :raise ConnectionError: if the other end closed the connection before all bytes
+                            were read
+
+    """
+    chunks = []
+    while size:
+        chunk = connection.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("Connection closed in the middle of a message")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _wants_stdin(argv: List[str]) -> bool:
+    """Return ``True`` if the command line reads the file to process from stdin"""
+    return any(arg.startswith("--stdin") for arg in argv)
+
+
+def run_client(
+    socket_path: Path,
+    argv: List[str],
+    stdin: Optional[BinaryIO] = None,
+    stdout: Optional[BinaryIO] = None,
+    stderr: Optional[BinaryIO] = None,
+) -> int:
+    """Send a command line to a server, and copy its output to stdout and stderr
+
+    :param socket_path: The path to the Unix domain socket the server listens on
+    :param argv: Command line arguments, excluding the name of the program
+    :param stdin: The stream to send for ``--stdin-filename``. Defaults to the binary
+                  standard input.
+    :param stdout: The stream to write standard output into. Defaults to the binary
+                   standard output.
+    :param stderr: The stream to write standard error into. Defaults to the binary
+                   standard error.
+    :return: The exit code from the server
+    :raise OSError: if connecting to the server fails
+    :raise ConnectionError: if the server closes the connection before sending the
+                            exit code
+
+    """
+    stdout = stdout or sys.stdout.buffer
+    stderr = stderr or sys.stderr.buffer
+    header: RequestHeader = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+        "stdin": _wants_stdin(argv),
+        "stdout_isatty": stdout.isatty(),
+        "stderr_isatty": stderr.isatty(),
+    }
+    request = json.dumps(header).encode("utf-8")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(str(socket_path))
+        connection.sendall(REQUEST_LENGTH.pack(len(request)) + request)
+        if header["stdin"]:
+            connection.sendall((stdin or sys.stdin.buffer).read())
+        connection.shutdown(socket.SHUT_WR)
+        while True:
+            frame_type, length = FRAME_HEADER.unpack(
+                read_exactly(connection, FRAME_HEADER.size)
+            )
+            payload = read_exactly(connection, length)
+            if frame_type == FRAME_EXIT:
+                return int(EXIT_CODE.unpack(payload)[0])
+            stream = stdout if frame_type == FRAME_STDOUT else stderr
+            stream.write(payload)
+            stream.flush()
@@ -3,7 +3,16 @@
 from __future__ import annotations
 
 import sys
-from argparse import SUPPRESS, ArgumentParser, Namespace
+from argparse import (
+    SUPPRESS,
+    Action,
+    ArgumentError,
+    ArgumentParser,
+    Namespace,
+    _AppendAction,
+    _AppendConstAction,
+    _ExtendAction,
+)
 from functools import partial
 from typing import Any, Callable, Protocol, TypeVar
 
@@ -124,16 +133,20 @@ class ArgumentParserFactory(Protocol):  # pylint: disable=too-few-public-methods
         ...
 
 
-def parse_args(parser: ArgumentParser, argv: list[str]) -> Namespace:
+def parse_args(
+    parser: ArgumentParser, argv: list[str], namespace: Namespace | None = None
+) -> Namespace:
     """Parse command line arguments, exit with exit code 3 on error.
 
     :param parser: The argument parser object
     :param argv: Command line to parse
+    :param namespace: The object to set parsed arguments on, or ``None`` for a new
+                      `Namespace`
     :return: The parsed command line arguments
 
     """
     try:
-        return parser.parse_args(argv)
+        return parser.parse_args(argv, namespace)
     except SystemExit as exc_info:
         if exc_info.args == (2,):
             # Change all exceptions from argparse to exit code 3 (cmdline error)
@@ -142,6 +155,104 @@ def parse_args(parser: ArgumentParser, argv: list[str]) -> Namespace:
         raise
 
 
+class _UnconvertedDefault(str):
+    """A string default which argparse must not convert using the option's type"""
+
+    __slots__ = ()
+
+
+class _RecordingNamespace(Namespace):  # pylint: disable=too-few-public-methods
+    """A namespace which records the names of options given on the command line
+
+    All defaults are set when the namespace is created, so argparse only sets
+    attributes for options it finds on the command line.
+
+    """
+
+    given_options: set[str]
+
+    def __init__(self, defaults: dict[str, Any]) -> None:
+        super().__init__()
+        self.__dict__.update(defaults)
+        self.__dict__["given_options"] = set()
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
+        super().__setattr__(name, value)
+        self.given_options.add(name)
+
+
+def _get_defaults(parser: ArgumentParser) -> dict[str, Any]:
+    """Return default values of options in the order argparse sets them
+
+    :param parser: The argument parser
+    :return: Option names and their default values
+
+    """
+    # pylint: disable=protected-access
+    defaults: dict[str, Any] = {}
+    for action in parser._actions:  # noqa: SLF001
+        if action.dest is not SUPPRESS and action.default is not SUPPRESS:
+            defaults.setdefault(action.dest, action.default)
+    for dest, default in parser._defaults.items():  # noqa: SLF001
+        defaults.setdefault(dest, default)
+    return defaults
+
+
+def _merge_config(
+    parser: ArgumentParser,
+    namespace: _RecordingNamespace,
+    defaults: dict[str, Any],
+    config: BaseConfig,
+) -> Namespace:
+    """Combine options from the command line with the configuration file
+
+    The result is the same as when parsing the command line with configuration values
+    set as parser defaults. Configuration values replace defaults for options not given
+    on the command line, and are converted using the type of the option if they are
+    strings. Items given on the command line for options with an ``append`` or
+    ``extend`` action are added to items from the configuration.
+
+    :param parser: The argument parser used for parsing the command line
+    :param namespace: The parsed command line
+    :param defaults: Default values of options, as returned by `_get_defaults`
+    :param config: The configuration read from the configuration file
+    :return: The combined options
+
+    """
+    # pylint: disable=protected-access
+    actions: dict[str, Action] = {}
+    for parser_action in parser._actions:  # noqa: SLF001
+        actions.setdefault(parser_action.dest, parser_action)
+    config_values: dict[str, Any] = dict(config)
+    result = Namespace()
+    for dest in {**defaults, **config_values, **dict.fromkeys(namespace.given_options)}:
+        action = actions.get(dest)
+        value: Any = getattr(namespace, dest, None)
+        given = dest in namespace.given_options
+        if given and action and not action.option_strings:
+            # An empty positional argument is set even if not given
+            given = value != [] and value is not action.default
+        if given:
+            if dest in config_values and isinstance(
+                action, (_AppendAction, _AppendConstAction, _ExtendAction)
+            ):
+                # Items given on the command line follow the defaults in the list
+                first_given = len(defaults.get(dest) or [])
+                value = [*config_values[dest], *value[first_given:]]
+        else:
+            value = config_values.get(dest, value)
+            if action and isinstance(value, str):
+                try:
+                    value = parser._get_value(action, str(value))  # noqa: SLF001
+                except ArgumentError as exc_info:
+                    parser.print_usage(sys.stderr)
+                    parser.exit(
+                        EXIT_CODE_CMDLINE_ERROR, f"{parser.prog}: error: {exc_info}\n"
+                    )
+        setattr(result, dest, value)
+    return result
+
+
 def parse_command_line(
     argument_parser_factory: ArgumentParserFactory,
     argv: list[str] | None,
@@ -157,6 +268,8 @@ def parse_command_line(
 
     Finally, also return the set of configuration options which differ from defaults.
 
+    The argument parser is created and the command line is parsed only once.
+
     :param argument_parser_factory: A function that creates an argument parser object.
     :param argv: Command line arguments to parse (excluding the path of the script). If
                  ``None``, use ``sys.argv``.
@@ -174,16 +287,28 @@ def parse_command_line(
     if argv is None:
         argv = sys.argv[1:]
 
-    # 1. Parse the paths of files/directories to process into `args.src`, and the config
-    #    file path into `args.config`.
-    parser_for_srcs = argument_parser_factory(require_src=False)
-    args = parse_args(parser_for_srcs, argv)
+    # 1. Parse the command line, recording which options were given. String defaults
+    #    are converted only after merging with the configuration file.
+    parser = argument_parser_factory(require_src=False)
+    defaults = _get_defaults(parser)
+    namespace = _RecordingNamespace(
+        {
+            dest: _UnconvertedDefault(value) if isinstance(value, str) else value
+            for dest, value in defaults.items()
+        }
+    )
+    parse_args(parser, argv, namespace)
 
     # 2. Locate `pyproject.toml` based on the `-c`/`--config` command line option, or
     #    if it's not provided, based on the paths to process, or in the current
     #    directory if no paths were given. Load Darker or Graylint configuration from
     #    it.
-    pyproject_config = load_config(args.config, args.src, section_name, config_type)
+    pyproject_config = load_config(
+        namespace.config,  # pylint: disable=no-member
+        namespace.src,  # pylint: disable=no-member
+        section_name,
+        config_type,
+    )
     if load_config_hook:
         load_config_hook(pyproject_config)
 
@@ -191,31 +316,23 @@ def parse_command_line(
     #    `--color` command line option.
     config = override_color_with_environment(pyproject_config)
 
-    # 4. Re-run the parser with configuration defaults. This way we get combined values
-    #    based on the configuration file and the command line options for all options
-    #    except `src` (the list of files to process).
-    parser_for_srcs.set_defaults(**config)
-    args = parse_args(parser_for_srcs, argv)
+    # 4. Use configuration values for options not given on the command line.
+    args = _merge_config(parser, namespace, defaults, config)
 
     # 5. Make sure an error for missing file/directory paths is thrown if we're not
     #    running in stdin mode and no file/directory is configured in `pyproject.toml`.
-    if args.stdin_filename is None and not config.get("src"):
-        parser = argument_parser_factory(require_src=True)
-        parser.set_defaults(**config)
-        args = parse_args(parser, argv)
+    if args.stdin_filename is None and not args.src:
+        parse_args(argument_parser_factory(require_src=True), argv)
 
     # Make sure there aren't invalid option combinations after merging configuration and
     # command line options.
     validate_stdin_src(args.stdin_filename, args.src)
 
-    # 7. Also create a parser which uses the original default configuration values.
-    #    This is used to find out differences between the effective configuration and
-    #    default configuration values, and print them out in verbose mode.
-    parser_with_original_defaults = argument_parser_factory(
-        require_src=args.stdin_filename is None
-    )
+    # 6. Find out differences between the effective configuration and default
+    #    configuration values, to print them out in verbose mode. The parser still has
+    #    the original defaults.
     return (
         args,
         get_effective_config(args, config_type),
-        get_modified_config(parser_with_original_defaults, args, config_type),
+        get_modified_config(parser, args, config_type),
     )
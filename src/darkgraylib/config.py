@@ -1,26 +1,56 @@
 """Load and save configuration in TOML format"""
 
+# ``toml`` is imported only when needed, to speed up starting the command line tools
+# pylint: disable=import-outside-toplevel
+
 from __future__ import annotations
 
 import logging
+import marshal
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, Iterable, TypedDict, TypeVar, Union, cast
-
-import toml
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Generic,
+    Iterable,
+    TypedDict,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from darkgraylib.files import find_project_root
 
 if TYPE_CHECKING:
     from argparse import ArgumentParser, Namespace
 
+    from toml import TomlEncoder
+
+
+@lru_cache(maxsize=1)
+def _make_toml_array_lines_encoder() -> type[TomlEncoder[Dict[str, object]]]:
+    """Create the `TomlArrayLinesEncoder` class"""
+    import toml
+
+    class TomlArrayLinesEncoder(toml.TomlEncoder):  # type: ignore
+        """Format TOML so list items are each on their own line"""
 
-class TomlArrayLinesEncoder(toml.TomlEncoder):  # type: ignore
-    """Format TOML so list items are each on their own line"""
+        def dump_list(self, v: Iterable[object]) -> str:
+            """Format a list value"""
+            items = "".join(f"\n    {self.dump_value(item)}," for item in v)
+            return f"[{items}\n]"
 
-    def dump_list(self, v: Iterable[object]) -> str:
-        """Format a list value"""
-        return "[{}\n]".format("".join(f"\n    {self.dump_value(item)}," for item in v))
+    return TomlArrayLinesEncoder
+
+
+def __getattr__(name: str) -> type[TomlEncoder[Dict[str, object]]]:
+    """Create `TomlArrayLinesEncoder` on first use"""
+    if name == "TomlArrayLinesEncoder":
+        return _make_toml_array_lines_encoder()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 UnvalidatedConfig = Dict[str, Union["list[str]", str, bool, int]]
@@ -128,6 +158,180 @@ def override_color_with_environment(pyproject_config: BaseConfig) -> BaseConfig:
     return config
 
 
+# Parsed ``[tool.<section>]`` sections from TOML files, with hyphens in keys converted
+# to underscores, or ``None`` for missing sections. Maps ``(path, section name)`` to
+# ``(st_mtime_ns, st_size, section)``, so each section is only cached for the latest
+# version of the file.
+_SECTION_CACHE: dict[tuple[Path, str], tuple[int, int, UnvalidatedConfig | None]] = {}
+
+# If this environment variable is set, parsed sections are also stored in a snapshot
+# file in the directory it names, so later runs don't need to parse TOML at all
+CACHE_DIR_ENVIRONMENT_VARIABLE = "DARKGRAYLIB_CACHE_DIR"
+
+# The snapshot maps ``(path, section name)`` to ``(st_mtime_ns, st_size, section)``
+Snapshot = Dict["tuple[str, str]", "tuple[int, int, UnvalidatedConfig | None]"]
+
+# Snapshots read in this process, by the path of the snapshot file. Each is read only
+# once, and written back by `_save_snapshots` after new sections have been added.
+_SNAPSHOTS: dict[Path, Snapshot] = {}
+_CHANGED_SNAPSHOTS: set[Path] = set()
+
+
+def _get_snapshot_path() -> Path | None:
+    """Return the path of the configuration snapshot file, or ``None`` if not enabled"""
+    cache_dir = os.getenv(CACHE_DIR_ENVIRONMENT_VARIABLE)
+    if not cache_dir:
+        return None
+    return Path(cache_dir, f"config-snapshot-{marshal.version}.marshal")
+
+
+def _read_snapshot(snapshot_path: Path) -> Snapshot:
+    """Read the configuration snapshot, or return an empty one if it can't be read"""
+    try:
+        snapshot = marshal.loads(snapshot_path.read_bytes())  # nosec
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    return cast(Snapshot, snapshot) if isinstance(snapshot, dict) else {}
+
+
+def _write_snapshot(snapshot_path: Path, snapshot: Snapshot) -> None:
+    """Replace the configuration snapshot atomically, ignoring any errors"""
+    data = marshal.dumps(snapshot)
+    temporary_path = snapshot_path.with_name(f".{snapshot_path.name}.{os.getpid()}")
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path.write_bytes(data)
+        os.replace(temporary_path, snapshot_path)
+    except OSError:
+        temporary_path.unlink(missing_ok=True)
+
+
+def _get_snapshot(snapshot_path: Path) -> Snapshot:
+    """Return the configuration snapshot, reading it only once in each process"""
+    if snapshot_path not in _SNAPSHOTS:
+        _SNAPSHOTS[snapshot_path] = _read_snapshot(snapshot_path)
+    return _SNAPSHOTS[snapshot_path]
+
+
+def _save_snapshots() -> None:
+    """Write snapshots which have new sections, dropping sections of changed files
+
+    Sections of files which have been removed or modified since they were parsed would
+    never be used again, so they are left out to keep the snapshot from growing.
+
+    """
+    for snapshot_path in _CHANGED_SNAPSHOTS:
+        snapshot = _SNAPSHOTS[snapshot_path]
+        for key, (st_mtime_ns, st_size, _) in list(snapshot.items()):
+            try:
+                stat = os.stat(key[0])
+            except OSError:
+                del snapshot[key]
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != (st_mtime_ns, st_size):
+                del snapshot[key]
+        _write_snapshot(snapshot_path, snapshot)
+    _CHANGED_SNAPSHOTS.clear()
+
+
+def _parse_pyproject_section(
+    config_path: Path, st_mtime_ns: int, st_size: int, section_name: str
+) -> UnvalidatedConfig | None:
+    """Parse a section from a TOML file, or read it from the configuration snapshot
+
+    :param config_path: The absolute path to the TOML file
+    :param st_mtime_ns: The modification time of the file in nanoseconds
+    :param st_size: The size of the file in bytes
+    :param section_name: The name of the section under ``[tool]``
+    :return: The section with hyphens in keys converted to underscores, or ``None`` if
+             the file has no such section
+
+    """
+    snapshot_path = _get_snapshot_path()
+    snapshot = _get_snapshot(snapshot_path) if snapshot_path else {}
+    snapshot_key = (str(config_path), section_name)
+    if snapshot_key in snapshot:
+        snapshot_mtime_ns, snapshot_size, section = snapshot[snapshot_key]
+        if (snapshot_mtime_ns, snapshot_size) == (st_mtime_ns, st_size):
+            return section
+    import toml
+
+    pyproject_toml = toml.load(config_path)
+    table = pyproject_toml.get("tool", {}).get(section_name)
+    section = None if table is None else convert_hyphens_to_underscores(table)
+    if snapshot_path:
+        try:
+            marshal.dumps(section)
+        except ValueError:
+            return section  # e.g. TOML dates can't be stored in the snapshot
+        snapshot[snapshot_key] = (st_mtime_ns, st_size, section)
+        _CHANGED_SNAPSHOTS.add(snapshot_path)
+    return section
+
+
+def read_pyproject_section(config_path: Path, section_name: str) -> UnvalidatedConfig:
+    """Read a ``[tool.<section_name>]`` section from a TOML file, with caching
+
+    Sections are cached until the modification time or size of the file changes, or
+    `clear_config_cache` is called. Each call returns a new copy of the section.
+
+    If the ``DARKGRAYLIB_CACHE_DIR`` environment variable names a directory, sections
+    are also kept in a snapshot file in that directory, and later runs read them from
+    there without parsing the TOML file.
+
+    :param config_path: The path to the TOML file, usually ``pyproject.toml``
+    :param section_name: The name of the section under ``[tool]``
+    :return: The section with hyphens in keys converted to underscores
+
+    """
+    section = _copy_cached_section(config_path, section_name)
+    _save_snapshots()
+    return section
+
+
+def _copy_cached_section(config_path: Path, section_name: str) -> UnvalidatedConfig:
+    """Return a copy of a cached section of a TOML file, or an empty section"""
+    import copy
+
+    return copy.deepcopy(_read_cached_section(config_path, section_name) or {})
+
+
+def _read_cached_section(
+    config_path: Path, section_name: str
+) -> UnvalidatedConfig | None:
+    """Return a cached section of a TOML file, or ``None`` if the file has no section
+
+    The section must not be modified. See `read_pyproject_section`.
+
+    """
+    stat = config_path.stat()
+    key = (config_path.absolute(), section_name)
+    cached = _SECTION_CACHE.get(key)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    section = _parse_pyproject_section(
+        key[0], stat.st_mtime_ns, stat.st_size, section_name
+    )
+    _SECTION_CACHE[key] = stat.st_mtime_ns, stat.st_size, section
+    return section
+
+
+def clear_config_cache(config_path: Path | None = None) -> None:
+    """Forget cached configuration file sections
+
+    :param config_path: The configuration file whose sections to forget, or ``None``
+                        to forget all, and to read the snapshot file again when needed
+
+    """
+    if config_path is None:
+        _SECTION_CACHE.clear()
+        _SNAPSHOTS.clear()
+        return
+    absolute_path = config_path.absolute()
+    for key in [key for key in _SECTION_CACHE if key[0] == absolute_path]:
+        del _SECTION_CACHE[key]
+
+
 def load_config(
     path: str | None,
     srcs: Iterable[str],
@@ -153,6 +357,9 @@ def load_config(
                         this is ``darker.config.DarkerConfig`` and for Graylint, this
                         is ``graylint.config.GraylintConfig``.
 
+    The configuration file is parsed only if it has changed since the previous call.
+    See `read_pyproject_section`.
+
     """
     if path:
         for candidate_path in [Path(path), Path(path, "pyproject.toml")]:
@@ -169,16 +376,108 @@ def load_config(
         config_path = find_project_root(tuple(srcs or ["."])) / "pyproject.toml"
         if not config_path.is_file():
             return cast(T, {})
-    pyproject_toml = toml.load(config_path)
-    pyproject_tool_config = convert_hyphens_to_underscores(
-        pyproject_toml.get("tool", {}).get(section_name, {}) or {}
-    )
+    config = _load_config_file(config_path, section_name, config_type)
+    _save_snapshots()
+    return config
+
+
+def _load_config_file(config_path: Path, section_name: str, config_type: type[T]) -> T:
+    """Load and validate configuration from a section of a TOML file"""
+    pyproject_tool_config = _copy_cached_section(config_path, section_name)
     validate_config_keys(pyproject_tool_config, section_name, config_type)
     config = cast(T, pyproject_tool_config)
     replace_log_level_name(config)
     return config
 
 
+@dataclass(frozen=True)
+class ConfigBatch(Generic[T]):
+    """Paths which share the same configuration file"""
+
+    config_path: Path | None
+    config: T
+    paths: list[Path]
+
+
+def _find_nearest_config(
+    directory: Path, section_name: str, nearest: dict[Path, Path | None]
+) -> Path | None:
+    """Find the nearest ``pyproject.toml`` with the section in a directory or above
+
+    The search stops at the root of a Git or Mercurial repository.
+
+    :param directory: The resolved directory to start the search from
+    :param section_name: The name of the section under ``[tool]``
+    :param nearest: Results of previous searches for directories. Results for all
+                    directories looked at are added to it.
+    :return: The path to the configuration file, or ``None`` if there is none
+
+    """
+    visited = []
+    config_path = None
+    for candidate in (directory, *directory.parents):
+        if candidate in nearest:
+            config_path = nearest[candidate]
+            break
+        visited.append(candidate)
+        pyproject_path = candidate / "pyproject.toml"
+        if (
+            pyproject_path.is_file()
+            and _read_cached_section(pyproject_path, section_name) is not None
+        ):
+            config_path = pyproject_path
+            break
+        if (candidate / ".git").exists() or (candidate / ".hg").is_dir():
+            break
+    for candidate in visited:
+        nearest[candidate] = config_path
+    return config_path
+
+
+def group_paths_by_config(
+    paths: Iterable[Path], section_name: str, config_type: type[T]
+) -> list[ConfigBatch[T]]:
+    """Group paths by the nearest configuration file which has a section for the tool
+
+    In a repository with many packages, each package can have its own ``pyproject.toml``
+    with a ``[tool.<section_name>]`` table. For each path, the nearest such file in the
+    path's directory or its parents is used, up to the root of the repository. Files
+    without the table are skipped, so packages without their own configuration use the
+    configuration of an outer directory.
+
+    Each configuration file is looked for and loaded only once for all paths::
+
+        >>> for batch in group_paths_by_config(paths, "darker", DarkerConfig):
+        ...     process(batch.paths, batch.config)  # doctest: +SKIP
+
+    :param paths: Files and directories to process
+    :param section_name: The name of the section in the configuration files. For
+                         Darker, this is ``"darker"`` and for Graylint, this is
+                         ``"graylint"``.
+    :param config_type: The class representing the configuration options
+    :return: Batches of paths, in the order of the first path in each batch. The
+             configuration of paths with no configuration file is empty.
+    :raise ConfigurationError: if a configuration file has unknown options
+
+    """
+    nearest: dict[Path, Path | None] = {}
+    batches: dict[Path | None, ConfigBatch[T]] = {}
+    for path in paths:
+        resolved_path = Path(path).resolve()
+        directory = resolved_path if resolved_path.is_dir() else resolved_path.parent
+        config_path = _find_nearest_config(directory, section_name, nearest)
+        if config_path not in batches:
+            config = (
+                _load_config_file(config_path, section_name, config_type)
+                if config_path
+                else cast(T, {})
+            )
+            batches[config_path] = ConfigBatch(config_path, config, [])
+        batches[config_path].paths.append(Path(path))
+    _save_snapshots()
+    return list(batches.values())
+
+
 def get_effective_config(
     args: Namespace,
     config_type: type[T],  # pylint: disable=unused-argument  # noqa: ARG001
@@ -227,8 +526,11 @@ def dump_config(config: BaseConfig, section_name: str) -> str:
     :param section_name: The name of the section in the configuration file
 
     """
+    import toml
+
     dump = toml.dumps(
-        convert_underscores_to_hyphens(config), encoder=TomlArrayLinesEncoder()
+        convert_underscores_to_hyphens(config),
+        encoder=_make_toml_array_lines_encoder()(),
     )
     return f"[tool.{section_name}]\n{dump}"
 
@@ -5,6 +5,11 @@ The functions in this module implement
 - diffing text files, returning opcodes
 - turning opcodes into a list of line numbers of changed lines
 - turning opcodes into chunks of original and modified text
+- character-level diffs between similar lines in replaced chunks
+
+Diffs can optionally ignore changes in trailing whitespace or indentation. In that case,
+lines are compared using normalized keys, but opcodes and line numbers still refer to
+the original lines of the documents.
 
 In our case, we run a diff between original and user-edited source code.
 Graylint creates a mapping of line numbers between the two versions of the source code.
@@ -42,20 +47,71 @@ in the original and reformatted content, e.g.::
     >>> opcodes[1]  # keep 'print("done")' as such
     ('equal', 1, 2, 2, 3)
 
+With ``normalization="ignore-indentation"``, re-indenting a line doesn't count as a
+modification::
+
+    >>> diff_and_get_opcodes(
+    ...     TextDocument.from_lines(["if x:", "  pass"]),
+    ...     TextDocument.from_lines(["if x:", "    pass"]),
+    ...     normalization="ignore-indentation",
+    ... )
+    [('equal', 0, 2, 0, 2)]
+
 """
 
 import logging
+from bisect import bisect_left
+from collections import Counter
 from difflib import SequenceMatcher
-from typing import Dict, List, Literal, Tuple
+from itertools import islice
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-from darkgraylib.utils import TextDocument
+from darkgraylib.utils import LineNormalization, TextDocument
 
 logger = logging.getLogger(__name__)
 
+Opcode = Tuple[Literal["replace", "delete", "insert", "equal"], int, int, int, int]
+
+# The default number of lines to read from each side at a time in streaming diffs
+DEFAULT_STREAMING_WINDOW_LINES = 10_000
+
+# The minimum similarity ratio for pairing up lines for intra-line diffs
+LINE_SIMILARITY_CUTOFF = 0.5
+
+# The minimum number of lines in an equal chunk to cut windows after in a streaming
+# diff when there are no anchor lines. Shorter chunks of e.g. blank lines match by
+# chance between misaligned windows.
+_MIN_STREAMING_EQUAL_LINES = 3
+
+# How many windows of lines to look ahead on each side in a streaming diff when the
+# windows have no lines in common. Edits shorter than this many windows are diffed
+# exactly.
+_STREAMING_LOOKAHEAD_WINDOWS = 8
+
+# Parameters for the polynomial rolling hash used in moved block detection
+_HASH_BASE = 1_000_003
+_HASH_MODULUS = (1 << 61) - 1
+
+# The maximum number of candidate source blocks to compare with each destination window
+# in moved block detection. Limits the time spent on highly repetitive content.
+_MAX_MOVED_BLOCK_CANDIDATES = 32
+
 
 def diff_and_get_opcodes(
-    src: TextDocument, dst: TextDocument
-) -> List[Tuple[Literal["replace", "delete", "insert", "equal"], int, int, int, int]]:
+    src: TextDocument,
+    dst: TextDocument,
+    normalization: LineNormalization = "exact",
+) -> List[Opcode]:
     """Return opcodes and line numbers for chunks in the diff of two lists of strings
 
     The opcodes are 5-tuples for each chunk with
@@ -68,8 +124,20 @@ def diff_and_get_opcodes(
 
     Line numbers are zero based.
 
+    :param src: The original text document
+    :param dst: The modified text document
+    :param normalization: How to normalize lines before comparing them. The default,
+                          ``"exact"``, compares lines as such. See
+                          `TextDocument.normalized_lines` for other options.
+    :return: The opcodes for the diff
+
     """
-    matcher = SequenceMatcher(None, src.lines, dst.lines, autojunk=False)
+    matcher = SequenceMatcher(
+        None,
+        src.normalized_lines(normalization),
+        dst.normalized_lines(normalization),
+        autojunk=False,
+    )
     opcodes = matcher.get_opcodes()
     logger.debug(
         "Diff between edited and reformatted has %s opcode%s",
@@ -79,11 +147,272 @@ def diff_and_get_opcodes(
     return opcodes
 
 
-def validate_opcodes(
-    opcodes: List[
-        Tuple[Literal["replace", "delete", "insert", "equal"], int, int, int, int]
-    ]
-) -> None:
+def _find_anchor(
+    src_lines: List[str], dst_lines: List[str]
+) -> Optional[Tuple[int, int]]:
+    """Find the last usable anchor line in two windows of lines
+
+    Anchor lines are lines which appear exactly once in both windows. The longest
+    sequence of anchors appearing in the same order in both windows is found, and the
+    last anchor of that sequence is returned.
+
+    :param src_lines: The window of lines from the original document
+    :param dst_lines: The window of lines from the modified document
+    :return: The indices of the anchor line in both windows, or ``None`` if there are
+             no anchor lines
+
+    """
+    src_counts = Counter(src_lines)
+    dst_counts = Counter(dst_lines)
+    dst_unique = {
+        line: dst_index
+        for dst_index, line in enumerate(dst_lines)
+        if dst_counts[line] == 1
+    }
+    # Patience sorting for the longest increasing subsequence of destination indices
+    tails: List[int] = []  # the smallest tail dst index for each subsequence length
+    tail_pairs: List[Tuple[int, int]] = []
+    for src_index, line in enumerate(src_lines):
+        if src_counts[line] != 1 or line not in dst_unique:
+            continue
+        dst_index = dst_unique[line]
+        length = bisect_left(tails, dst_index)
+        if length == len(tails):
+            tails.append(dst_index)
+            tail_pairs.append((src_index, dst_index))
+        else:
+            tails[length] = dst_index
+            tail_pairs[length] = (src_index, dst_index)
+    return tail_pairs[-1] if tail_pairs else None
+
+
+def _merge_opcodes(first: Opcode, second: Opcode) -> Optional[Opcode]:
+    """Merge two adjacent opcodes if they are both equal or both non-equal chunks
+
+    :param first: The earlier opcode
+    :param second: The opcode immediately following ``first``
+    :return: The merged opcode, or ``None`` if the opcodes can't be merged
+
+    """
+    tag1, src_start, _, dst_start, _ = first
+    tag2, _, src_end, _, dst_end = second
+    if (tag1 == "equal") != (tag2 == "equal"):
+        return None
+    if tag1 == "equal":
+        return ("equal", src_start, src_end, dst_start, dst_end)
+    if src_start == src_end:
+        return ("insert", src_start, src_end, dst_start, dst_end)
+    if dst_start == dst_end:
+        return ("delete", src_start, src_end, dst_start, dst_end)
+    return ("replace", src_start, src_end, dst_start, dst_end)
+
+
+def _diff_windows(
+    src_window: List[str], dst_window: List[str], src_cut: int, dst_cut: int
+) -> List[Opcode]:
+    """Diff the lines before the cut in two windows"""
+    return SequenceMatcher(
+        None, src_window[:src_cut], dst_window[:dst_cut], autojunk=False
+    ).get_opcodes()
+
+
+def _find_realignment(
+    src_lines: List[str], dst_lines: List[str], min_lines: int
+) -> Optional[Tuple[int, int]]:
+    """Find the nearest lines where two sides have lines in common again
+
+    :param src_lines: The lines read ahead from the original document
+    :param dst_lines: The lines read ahead from the modified document
+    :param min_lines: The number of lines in runs of common lines to look for
+    :return: The indices of the run of common lines with the smallest sum of indices on
+             both sides, or ``None`` if the sides have no common runs of lines
+
+    """
+    src_runs: Dict[Tuple[str, ...], int] = {}
+    for src_start in range(len(src_lines) - min_lines + 1):
+        src_end = src_start + min_lines
+        src_runs.setdefault(tuple(src_lines[src_start:src_end]), src_start)
+    best: Optional[Tuple[int, int]] = None
+    for dst_start in range(len(dst_lines) - min_lines + 1):
+        if best and dst_start >= sum(best):
+            break
+        dst_end = dst_start + min_lines
+        src_start = src_runs.get(tuple(dst_lines[dst_start:dst_end]), -1)
+        if src_start >= 0 and (not best or src_start + dst_start < sum(best)):
+            best = src_start, dst_start
+    return best
+
+
+def _skip_to_realignment(
+    src_lines: List[str],
+    dst_lines: List[str],
+    min_lines: int,
+    step: int,
+    search: Tuple[int, int],
+) -> Tuple[Opcode, Tuple[int, int]]:
+    """Choose lines to skip when the windows of two sides have no lines in common
+
+    If the lines read ahead have a run of common lines, the lines before it are skipped
+    on both sides. Otherwise lines are skipped on one side only.
+
+    :param src_lines: The lines read ahead from the original document
+    :param dst_lines: The lines read ahead from the modified document
+    :param min_lines: The number of lines in runs of common lines to look for
+    :param step: The maximum number of lines to skip on one side at a time
+    :param search: The number of lines skipped in the destination minus those skipped
+                   in the source since the sides had lines in common, and the number at
+                   which to switch sides
+    :return: The opcode for the skipped lines, and the new search state
+
+    """
+    realignment = _find_realignment(src_lines, dst_lines, min_lines)
+    if realignment:
+        return _edit_opcode(*realignment), (0, step)
+    drift, drift_target = search
+    if drift_target > 0:
+        src_cut, dst_cut = 0, min(step, drift_target - drift, len(dst_lines))
+    else:
+        src_cut, dst_cut = min(step, drift - drift_target, len(src_lines)), 0
+    drift += dst_cut - src_cut
+    if drift == drift_target:
+        drift_target *= -2
+    return _edit_opcode(src_cut, dst_cut), (drift, drift_target)
+
+
+def _edit_opcode(src_end: int, dst_end: int) -> Opcode:
+    """Return the opcode for replacing lines at the start of both sides"""
+    if not src_end:
+        return ("insert", 0, 0, 0, dst_end)
+    if not dst_end:
+        return ("delete", 0, src_end, 0, 0)
+    return ("replace", 0, src_end, 0, dst_end)
+
+
+def _until_last_equal(opcodes: List[Opcode], min_lines: int) -> List[Opcode]:
+    """Return the opcodes up to and including the last long enough equal chunk
+
+    :param opcodes: The opcodes to truncate
+    :param min_lines: The minimum number of lines in the equal chunk
+    :return: The truncated opcodes, or an empty list if there's no such equal chunk
+
+    """
+    for index in range(len(opcodes) - 1, -1, -1):
+        tag, src_start, src_end, _, _ = opcodes[index]
+        if tag == "equal" and src_end - src_start >= min_lines:
+            return opcodes[: index + 1]
+    return []
+
+
+def diff_and_iter_opcodes(  # pylint: disable=too-many-locals,too-many-branches
+    src_lines: Iterable[str],
+    dst_lines: Iterable[str],
+    window_lines: int = DEFAULT_STREAMING_WINDOW_LINES,
+) -> Iterator[Opcode]:
+    """Diff two streams of lines and yield opcodes progressively
+
+    This is a streaming variant of `diff_and_get_opcodes` for very large documents. At
+    most ``window_lines`` lines are read from each side at a time. The windows are cut
+    after the last anchor line, i.e. a line which is unique in both windows, and the
+    parts before the cut are diffed and their opcodes yielded. Without an anchor line,
+    the windows are cut after the last equal chunk of at least a few lines. Peak memory
+    use hence only depends on the window size, not on the length of the documents.
+
+    If the windows have no lines in common, e.g. in the middle of an insertion or
+    deletion longer than the window, up to eight windows of lines are read ahead on
+    each side to find where the documents have lines in common again. Edits shorter
+    than that are diffed as exactly as edits shorter than the window. For longer edits,
+    lines are consumed from one side at a time, alternating sides with growing steps,
+    until the documents have lines in common again. The diff then realigns, but some
+    unchanged lines around the edit may be reported as replaced. ``8 * window_lines``
+    is hence the longest edit which is guaranteed to be diffed without such loss.
+
+    As in `diff_and_get_opcodes`, line numbers are zero based, and equal and non-equal
+    chunks alternate. The diff isn't always minimal, but for typical edits it is
+    identical to the one produced by `diff_and_get_opcodes`::
+
+        >>> list(diff_and_iter_opcodes(["a", "b", "c", "d"], ["a", "x", "c", "d"], 2))
+        [('equal', 0, 1, 0, 1), ('replace', 1, 2, 1, 2), ('equal', 2, 4, 2, 4)]
+
+    :param src_lines: The lines of the original document, e.g. an iterator reading
+                      lines from a file
+    :param dst_lines: The lines of the modified document
+    :param window_lines: The number of lines to diff from each side at a time. Up to
+                         eight times as many lines are buffered while reading ahead.
+    :return: An iterator of opcodes for the diff
+    :raises ValueError: if ``window_lines`` is smaller than one
+
+    """
+    if window_lines < 1:
+        raise ValueError(f"window_lines must be at least 1, got {window_lines}")
+    src_iter = iter(src_lines)
+    dst_iter = iter(dst_lines)
+    src_window: List[str] = []
+    dst_window: List[str] = []
+    src_offset = dst_offset = 0
+    pending: Optional[Opcode] = None
+    min_lines = min(_MIN_STREAMING_EQUAL_LINES, window_lines)
+    lookahead_lines = _STREAMING_LOOKAHEAD_WINDOWS * window_lines
+    # If there are no common lines even after reading ahead, ``search`` is the number
+    # of lines skipped in the destination minus those skipped in the source, and the
+    # number at which to switch sides and skip twice as far
+    search_step = max(lookahead_lines // 2, 1)
+    search = 0, search_step
+    while True:
+        # The buffers may already hold more lines than a window after reading ahead
+        src_window.extend(islice(src_iter, max(window_lines - len(src_window), 0)))
+        dst_window.extend(islice(dst_iter, max(window_lines - len(dst_window), 0)))
+        if not src_window and not dst_window:
+            break
+        if len(src_window) >= window_lines and len(dst_window) >= window_lines:
+            # Only cut early if there's more to read on both sides
+            anchor = _find_anchor(src_window[:window_lines], dst_window[:window_lines])
+            if anchor:
+                opcodes = _diff_windows(
+                    src_window, dst_window, anchor[0] + 1, anchor[1] + 1
+                )
+            else:
+                opcodes = _until_last_equal(
+                    _diff_windows(src_window, dst_window, window_lines, window_lines),
+                    min_lines,
+                )
+            if opcodes:
+                search = 0, search_step
+            else:
+                src_window.extend(islice(src_iter, lookahead_lines - len(src_window)))
+                dst_window.extend(islice(dst_iter, lookahead_lines - len(dst_window)))
+                skipped, search = _skip_to_realignment(
+                    src_window, dst_window, min_lines, search_step, search
+                )
+                opcodes = [skipped]
+        else:
+            opcodes = _diff_windows(
+                src_window, dst_window, len(src_window), len(dst_window)
+            )
+        for tag, src_start, src_end, dst_start, dst_end in opcodes:
+            opcode: Opcode = (
+                tag,
+                src_offset + src_start,
+                src_offset + src_end,
+                dst_offset + dst_start,
+                dst_offset + dst_end,
+            )
+            merged = _merge_opcodes(pending, opcode) if pending else None
+            if merged:
+                pending = merged
+                continue
+            if pending:
+                yield pending
+            pending = opcode
+        src_cut, dst_cut = opcodes[-1][2], opcodes[-1][4]
+        del src_window[:src_cut]
+        del dst_window[:dst_cut]
+        src_offset += src_cut
+        dst_offset += dst_cut
+    if pending:
+        yield pending
+
+
+def validate_opcodes(opcodes: List[Opcode]) -> None:
     """Make sure every other opcode is an 'equal' tag"""
     if not all(
         (tag1 == "equal") != (tag2 == "equal")
@@ -92,7 +421,12 @@ def validate_opcodes(
         raise ValueError(f"Unexpected opcodes in {opcodes!r}")
 
 
-def map_unmodified_lines(src: TextDocument, dst: TextDocument) -> Dict[int, int]:
+def map_unmodified_lines(
+    src: TextDocument,
+    dst: TextDocument,
+    normalization: LineNormalization = "exact",
+    min_moved_block_lines: Optional[int] = None,
+) -> Dict[int, int]:
     """Return a mapping of line numbers of unmodified lines between dst and src docs
 
     After doing a diff between ``src`` and ``dst``, some identical chunks of lines may
@@ -101,12 +435,19 @@ def map_unmodified_lines(src: TextDocument, dst: TextDocument) -> Dict[int, int]
 
     :param src: The original text document
     :param dst: The modified text document
+    :param normalization: How to normalize lines before comparing them. With e.g.
+                          ``"ignore-trailing-whitespace"``, lines which only differ in
+                          trailing whitespace or newline characters are considered
+                          unmodified.
+    :param min_moved_block_lines: If given, also detect blocks of at least this many
+                                  lines which were moved unchanged to another location
+                                  in the document, and map them as unmodified lines.
     :return: A mapping from ``dst`` lines to corresponding unmodified ``src`` lines.
              Line numbers are 1-based.
     :raises RuntimeError: if blocks in opcodes don't make sense
 
     """
-    opcodes = diff_and_get_opcodes(src, dst)
+    opcodes = diff_and_get_opcodes(src, dst, normalization)
     validate_opcodes(opcodes)
     if not src.string and not dst.string:
         # empty files may get linter messages on line 1
@@ -123,4 +464,285 @@ def map_unmodified_lines(src: TextDocument, dst: TextDocument) -> Dict[int, int]
                 f" src_start={src_start}, src_end={src_end},"
                 f" dst_start={dst_start}, dst_end={dst_end}"
             )
+    if min_moved_block_lines:
+        result.update(
+            map_moved_lines(
+                src.normalized_lines(normalization),
+                dst.normalized_lines(normalization),
+                result,
+                min_moved_block_lines,
+            )
+        )
+    return result
+
+
+def _iter_unmapped_runs(mapped: bytearray) -> Iterator[Tuple[int, int]]:
+    """Yield the start and end of each run of consecutive unmapped line numbers"""
+    start = mapped.find(0)
+    while start >= 0:
+        end = mapped.find(1, start)
+        if end < 0:
+            end = len(mapped)
+        yield start, end
+        start = mapped.find(0, end)
+
+
+def _window_hash(ids: Sequence[int], start: int, length: int) -> int:
+    """Return the polynomial hash of ``length`` line IDs starting at ``start``"""
+    result = 0
+    end = start + length
+    for line_id in ids[start:end]:
+        result = (result * _HASH_BASE + line_id) % _HASH_MODULUS
+    return result
+
+
+def map_moved_lines(  # pylint: disable=too-many-locals,too-many-branches
+    src_lines: Sequence[str],
+    dst_lines: Sequence[str],
+    unmodified: Dict[int, int],
+    min_block_lines: int,
+) -> Dict[int, int]:
+    """Return a mapping of line numbers for blocks moved unchanged from src to dst
+
+    Only lines not yet present in the ``unmodified`` mapping are considered. Each line
+    is first replaced by an integer ID, and a rolling hash over windows of
+    ``min_block_lines`` IDs is used to find candidate blocks in linear time. Matching
+    blocks are then extended as far as the lines keep matching. For repetitive content,
+    only a limited number of candidate blocks is compared with each window.
+
+    >>> map_moved_lines(
+    ...     ["a", "b", "c", "d", "e"], ["d", "e", "a", "b", "c"], {1: 4, 2: 5}, 2
+    ... )
+    {3: 1, 4: 2, 5: 3}
+
+    :param src_lines: The lines of the original document
+    :param dst_lines: The lines of the modified document
+    :param unmodified: The 1-based mapping of unmodified lines found by diffing
+    :param min_block_lines: The minimum number of lines in a moved block
+    :return: A mapping from ``dst`` lines to corresponding moved ``src`` lines.
+             Line numbers are 1-based.
+
+    """
+    line_ids: Dict[str, int] = {}
+    src_ids = [line_ids.setdefault(line, len(line_ids)) for line in src_lines]
+    dst_ids = [line_ids.setdefault(line, len(line_ids)) for line in dst_lines]
+    src_mapped = bytearray(len(src_ids))
+    dst_mapped = bytearray(len(dst_ids))
+    for dst_linenum, src_linenum in unmodified.items():
+        dst_mapped[dst_linenum - 1] = src_mapped[src_linenum - 1] = 1
+    top_power = pow(_HASH_BASE, min_block_lines - 1, _HASH_MODULUS)
+
+    # Index the hashes of all windows of unmapped source lines
+    src_windows: Dict[int, List[int]] = {}
+    for run_start, run_end in _iter_unmapped_runs(src_mapped):
+        if run_end - run_start < min_block_lines:
+            continue
+        src_hash = _window_hash(src_ids, run_start, min_block_lines)
+        for start in range(run_start, run_end - min_block_lines + 1):
+            if start > run_start:
+                src_hash = (
+                    (src_hash - src_ids[start - 1] * top_power) * _HASH_BASE
+                    + src_ids[start + min_block_lines - 1]
+                ) % _HASH_MODULUS
+            src_windows.setdefault(src_hash, []).append(start)
+
+    # Slide a window over unmapped destination lines and extend any matching blocks
+    result = {}
+    first_candidate: Dict[int, int] = {}
+    for run_start, run_end in _iter_unmapped_runs(dst_mapped):
+        dst_start = run_start
+        dst_hash: Optional[int] = None
+        while dst_start + min_block_lines <= run_end:
+            if dst_hash is None:
+                dst_hash = _window_hash(dst_ids, dst_start, min_block_lines)
+            dst_end = dst_start + min_block_lines
+            candidates = src_windows.get(dst_hash, [])
+            # Skip candidates which overlap mapped lines. Since lines stay mapped, they
+            # never need to be checked again.
+            first = first_candidate.get(dst_hash, 0)
+            while first < len(candidates):
+                src_start = candidates[first]
+                src_end = src_start + min_block_lines
+                if not any(src_mapped[src_start:src_end]):
+                    break
+                first += 1
+            first_candidate[dst_hash] = first
+            last = first + _MAX_MOVED_BLOCK_CANDIDATES
+            for src_start in candidates[first:last]:
+                src_end = src_start + min_block_lines
+                if (
+                    any(src_mapped[src_start:src_end])
+                    or src_ids[src_start:src_end] != dst_ids[dst_start:dst_end]
+                ):
+                    continue
+                length = min_block_lines
+                while (
+                    dst_start + length < run_end
+                    and src_start + length < len(src_ids)
+                    and not src_mapped[src_start + length]
+                    and src_ids[src_start + length] == dst_ids[dst_start + length]
+                ):
+                    length += 1
+                for delta in range(length):
+                    result[dst_start + delta + 1] = src_start + delta + 1
+                    src_mapped[src_start + delta] = 1
+                dst_start += length
+                dst_hash = None
+                break
+            else:
+                if dst_start + min_block_lines < run_end:
+                    dst_hash = (
+                        (dst_hash - dst_ids[dst_start] * top_power) * _HASH_BASE
+                        + dst_ids[dst_start + min_block_lines]
+                    ) % _HASH_MODULUS
+                dst_start += 1
     return result
+
+
+def pair_similar_lines(
+    src_lines: Sequence[str],
+    dst_lines: Sequence[str],
+    cutoff: float = LINE_SIMILARITY_CUTOFF,
+) -> List[Tuple[Optional[int], Optional[int]]]:
+    """Pair up similar lines between the original and modified lines of a chunk
+
+    If both sides have the same number of lines, they are simply paired up in order.
+    Otherwise, each original line is paired with the most similar remaining modified
+    line, as long as the similarity ratio exceeds ``cutoff``. Pairs always keep the
+    original order of lines on both sides.
+
+    >>> pair_similar_lines(["a = 1", "b = 2"], ["a = 10", "x", "b = 20"])
+    [(0, 0), (None, 1), (1, 2)]
+
+    :param src_lines: The original lines of the chunk
+    :param dst_lines: The modified lines of the chunk
+    :param cutoff: The minimum similarity ratio for pairing two lines
+    :return: Pairs of indices into ``src_lines`` and ``dst_lines``. Lines without a
+             counterpart are paired with ``None``.
+
+    """
+    if len(src_lines) == len(dst_lines):
+        return list(zip(range(len(src_lines)), range(len(dst_lines))))
+    pairs: List[Tuple[Optional[int], Optional[int]]] = []
+    matcher = SequenceMatcher(autojunk=False)
+    dst_next = 0
+    for src_index, src_line in enumerate(src_lines):
+        # `SequenceMatcher` caches information about the second sequence
+        matcher.set_seq2(src_line)
+        best_index, best_ratio = None, cutoff
+        for dst_index in range(dst_next, len(dst_lines)):
+            matcher.set_seq1(dst_lines[dst_index])
+            if (
+                matcher.real_quick_ratio() > best_ratio
+                and matcher.quick_ratio() > best_ratio
+                and matcher.ratio() > best_ratio
+            ):
+                best_index, best_ratio = dst_index, matcher.ratio()
+        if best_index is None:
+            pairs.append((src_index, None))
+            continue
+        pairs.extend((None, dst_index) for dst_index in range(dst_next, best_index))
+        pairs.append((src_index, best_index))
+        dst_next = best_index + 1
+    pairs.extend((None, dst_index) for dst_index in range(dst_next, len(dst_lines)))
+    return pairs
+
+
+class LineDiff(NamedTuple):
+    """Character-level differences between a pair of lines
+
+    ``src_linenum`` and ``dst_linenum`` are zero based line numbers in the original and
+    modified documents. One of them is ``None`` if the line has no counterpart. The
+    opcodes refer to zero based column ranges in the two lines.
+
+    """
+
+    src_linenum: Optional[int]
+    dst_linenum: Optional[int]
+    opcodes: List[Opcode]
+
+
+def diff_line_characters(src_line: str, dst_line: str) -> List[Opcode]:
+    """Return opcodes for the character-level differences between two lines
+
+    >>> diff_line_characters("print(x)", "print(y)")
+    [('equal', 0, 6, 0, 6), ('replace', 6, 7, 6, 7), ('equal', 7, 8, 7, 8)]
+
+    """
+    return SequenceMatcher(None, src_line, dst_line, autojunk=False).get_opcodes()
+
+
+class IntralineDiff:  # pylint: disable=too-few-public-methods
+    """Character-level diffs for the ``replace`` chunks of a diff, computed lazily
+
+    The character-level diff for a chunk is computed when it's first accessed, and then
+    cached. Creating this object is cheap, and nothing is computed for chunks nobody
+    asks about.
+
+    >>> intraline = IntralineDiff(
+    ...     TextDocument.from_lines(["x = 1", "y = 2"]),
+    ...     TextDocument.from_lines(["x = 10", "y = 2"]),
+    ... )
+    >>> intraline.opcodes
+    [('replace', 0, 1, 0, 1), ('equal', 1, 2, 1, 2)]
+    >>> intraline[0]
+    [LineDiff(src_linenum=0, dst_linenum=0, opcodes=[('equal', 0, 5, 0, 5),
+                                                     ('insert', 5, 5, 5, 6)])]
+
+    """
+
+    def __init__(
+        self,
+        src: TextDocument,
+        dst: TextDocument,
+        opcodes: Optional[List[Opcode]] = None,
+        cutoff: float = LINE_SIMILARITY_CUTOFF,
+    ):
+        """Prepare for computing character-level diffs between two documents
+
+        :param src: The original text document
+        :param dst: The modified text document
+        :param opcodes: The opcodes of a line-level diff between ``src`` and ``dst``, or
+                        ``None`` to compute them using `diff_and_get_opcodes`
+        :param cutoff: The minimum similarity ratio for pairing two lines
+
+        """
+        self.src = src
+        self.dst = dst
+        self.opcodes = diff_and_get_opcodes(src, dst) if opcodes is None else opcodes
+        self.cutoff = cutoff
+        self._chunks: Dict[int, List[LineDiff]] = {}
+
+    def __getitem__(self, index: int) -> List[LineDiff]:
+        """Return the character-level diff for the chunk at the given opcode index
+
+        :param index: The index of the chunk in `opcodes`
+        :return: Diffs for each pair of lines in the chunk. For chunks other than
+                 ``replace`` chunks, an empty list is returned.
+
+        """
+        if index not in self._chunks:
+            self._chunks[index] = self._diff_chunk(self.opcodes[index])
+        return self._chunks[index]
+
+    def _diff_chunk(self, opcode: Opcode) -> List[LineDiff]:
+        """Compute the character-level diff for the lines in a chunk"""
+        tag, src_start, src_end, dst_start, dst_end = opcode
+        if tag != "replace":
+            return []
+        src_lines = self.src.lines[src_start:src_end]
+        dst_lines = self.dst.lines[dst_start:dst_end]
+        result = []
+        for src_index, dst_index in pair_similar_lines(
+            src_lines, dst_lines, self.cutoff
+        ):
+            src_line = "" if src_index is None else src_lines[src_index]
+            dst_line = "" if dst_index is None else dst_lines[dst_index]
+            result.append(
+                LineDiff(
+                    None if src_index is None else src_start + src_index,
+                    None if dst_index is None else dst_start + dst_index,
+                    diff_line_characters(src_line, dst_line),
+                )
+            )
+        return result
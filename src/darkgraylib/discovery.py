@@ -0,0 +1,353 @@
+"""Find source files in directory trees, skipping ignored and excluded directories
+
+Directories are scanned using `os.scandir` in a pool of threads, and the paths of
+matching files are yielded as soon as each directory has been scanned::
+
+    >>> from pathlib import Path
+    >>> paths = discover_files([Path("src")])  # doctest: +SKIP
+
+Patterns in ``.gitignore`` files and in ``.git/info/exclude`` are compiled into one
+regular expression per file, and ignored directories aren't descended into.
+
+"""
+
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import (
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from darkgraylib.files import find_project_root
+
+DEFAULT_SUFFIXES = (".py", ".pyi")
+
+# Names of directories which are never descended into
+DEFAULT_EXCLUDED_DIRECTORIES = frozenset(
+    {
+        ".direnv",
+        ".eggs",
+        ".git",
+        ".hg",
+        ".ipynb_checkpoints",
+        ".mypy_cache",
+        ".nox",
+        ".pytest_cache",
+        ".ruff_cache",
+        ".svn",
+        ".tox",
+        ".venv",
+        "__pycache__",
+        "__pypackages__",
+        "_build",
+        "buck-out",
+        "build",
+        "dist",
+        "node_modules",
+        "venv",
+    }
+)
+
+
+def _translate_glob(glob: str) -> str:
+    """Translate a ``.gitignore`` glob into a regular expression
+
+    :param glob: The glob without leading or trailing slashes or negation
+    :return: A regular expression without anchors or capturing groups
+
+    """
+    result = []
+    index = 0
+    while index < len(glob):
+        char = glob[index]
+        if glob.startswith("**", index):
+            at_start = index == 0 or glob[index - 1] == "/"
+            index += 2
+            if at_start and glob.startswith("/", index):
+                result.append("(?:.*/)?")  # `**/` matches any number of directories
+                index += 1
+            elif at_start and index == len(glob):
+                result.append(".*")  # a trailing `/**` matches everything inside
+            else:
+                result.append("[^/]*")
+            continue
+        index += 1
+        if char == "*":
+            result.append("[^/]*")
+        elif char == "?":
+            result.append("[^/]")
+        elif char == "\\" and index < len(glob):
+            result.append(re.escape(glob[index]))
+            index += 1
+        elif char == "[" and glob.find("]", index + 1) >= 0:
+            # The first character in a bracket expression may be a literal `]`
+            end = glob.find("]", index + 1)
+            content = glob[index:end]
+            if content.startswith("!"):
+                content = f"^{content[1:]}"
+            result.append(f"[{content}]")
+            index = end + 1
+        else:
+            result.append(re.escape(char))
+    return "".join(result)
+
+
+def compile_gitignore(lines: Iterable[str]) -> Tuple[Pattern[str], Pattern[str]]:
+    """Compile patterns from a ``.gitignore`` file into regular expressions
+
+    The patterns are combined in reverse order, so the last matching pattern wins like
+    in Git. The name of the group which matched starts with ``i`` if the path is
+    ignored, and with ``n`` if it's re-included by a negated pattern.
+
+    :param lines: The lines of the ``.gitignore`` file
+    :return: Regular expressions for matching files and directories, respectively.
+             They must be matched against paths relative to the ``.gitignore`` file's
+             directory, using forward slashes.
+
+    """
+    file_alternatives: List[str] = []
+    directory_alternatives: List[str] = []
+    for number, line in enumerate(lines):
+        line = line.rstrip("\r\n")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate or line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        prefix = "" if anchored else "(?:.*/)?"
+        group = f"{'n' if negate else 'i'}{number}"
+        alternative = f"(?P<{group}>{prefix}{_translate_glob(line.lstrip('/'))})"
+        directory_alternatives.insert(0, alternative)
+        if not directory_only:
+            file_alternatives.insert(0, alternative)
+    return (
+        re.compile(f"(?:{'|'.join(file_alternatives) or '(?!)'})\\Z"),
+        re.compile(f"(?:{'|'.join(directory_alternatives) or '(?!)'})\\Z"),
+    )
+
+
+class IgnoreMatcher:
+    """Decide whether paths are ignored by ``.gitignore`` files
+
+    Each matcher holds the patterns of one directory and refers to the matcher of the
+    parent directory. Patterns in deeper directories take precedence.
+
+    """
+
+    __slots__ = ("_prefix", "_file_regex", "_directory_regex", "_parent")
+
+    def __init__(
+        self,
+        base: str,
+        lines: Iterable[str] = (),
+        parent: Optional["IgnoreMatcher"] = None,
+    ):
+        """Compile the patterns for a directory
+
+        :param base: The directory the patterns are relative to
+        :param lines: The lines of the ``.gitignore`` file in the directory
+        :param parent: The matcher of the parent directory, if any
+
+        """
+        self._prefix = os.path.join(base, "")
+        self._file_regex, self._directory_regex = compile_gitignore(lines)
+        self._parent = parent
+
+    @classmethod
+    def for_root(cls, root: Path) -> "IgnoreMatcher":
+        """Create a matcher for patterns in ``.git/info/exclude`` of a repository
+
+        :param root: The root directory of the repository
+        :return: The matcher, with no patterns if the file doesn't exist
+
+        """
+        return cls(str(root), _read_lines(root / ".git" / "info" / "exclude"))
+
+    def child(self, directory: str) -> "IgnoreMatcher":
+        """Return the matcher for a subdirectory
+
+        :param directory: The path of the subdirectory
+        :return: A new matcher if the subdirectory has a ``.gitignore`` file, or this
+                 matcher otherwise
+
+        """
+        lines = _read_lines(Path(directory, ".gitignore"))
+        if not lines:
+            return self
+        return IgnoreMatcher(directory, lines, self)
+
+    def is_ignored(self, path: str, is_directory: bool) -> bool:
+        """Return ``True`` if the path is ignored
+
+        :param path: The path to check. Must be inside the directory of this matcher.
+        :param is_directory: ``True`` if the path is a directory
+        :return: ``True`` if the last matching pattern ignores the path
+
+        """
+        # pylint: disable=protected-access
+        matcher: Optional[IgnoreMatcher] = self
+        while matcher:
+            prefix_length = len(matcher._prefix)
+            relative_path = path[prefix_length:]
+            if os.sep != "/":
+                relative_path = relative_path.replace(os.sep, "/")
+            regex = matcher._directory_regex if is_directory else matcher._file_regex
+            match = regex.match(relative_path)
+            if match:
+                return (match.lastgroup or "")[0] == "i"
+            matcher = matcher._parent
+        return False
+
+
+def _read_lines(path: Path) -> List[str]:
+    """Return the lines of a text file, or an empty list if it can't be read"""
+    try:
+        return path.read_text(encoding="utf-8", errors="surrogateescape").splitlines()
+    except OSError:
+        return []
+
+
+def _matcher_for(directory: Path, root: Path) -> IgnoreMatcher:
+    """Create a matcher with patterns from the root down to the parent of a directory"""
+    try:
+        relative_parts = directory.relative_to(root).parts
+    except ValueError:
+        return IgnoreMatcher(str(directory))
+    matcher = IgnoreMatcher.for_root(root)
+    ancestor = root
+    for part in relative_parts:
+        matcher = matcher.child(str(ancestor))
+        ancestor = ancestor / part
+    return matcher
+
+
+# The result of scanning one directory: matching files, and subdirectories to scan
+# along with the ignore matcher for their contents
+ScanResult = Tuple[List[Path], List[Tuple[str, IgnoreMatcher]]]
+
+
+def _scan_directory(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    directory: str,
+    matcher: IgnoreMatcher,
+    root_prefix: str,
+    suffixes: Tuple[str, ...],
+    excluded_directories: FrozenSet[str],
+    exclude: Optional[Pattern[str]],
+) -> ScanResult:
+    """List matching files and subdirectories to descend into in a directory"""
+    matcher = matcher.child(directory)
+    root_prefix_length = len(root_prefix) - 1
+    directory_path = Path(directory)
+    files: List[Path] = []
+    subdirectories: List[Tuple[str, IgnoreMatcher]] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            is_directory = entry.is_dir(follow_symlinks=False)
+            if is_directory:
+                if entry.name in excluded_directories:
+                    continue
+            elif not entry.name.endswith(suffixes) or not entry.is_file():
+                continue
+            if matcher.is_ignored(entry.path, is_directory):
+                continue
+            if exclude:
+                # Keep the slash after the root directory
+                relative_path = entry.path[root_prefix_length:]
+                if os.sep != "/":
+                    relative_path = relative_path.replace(os.sep, "/")
+                if exclude.search(
+                    f"{relative_path}/" if is_directory else relative_path
+                ):
+                    continue
+            if is_directory:
+                subdirectories.append((entry.path, matcher))
+            else:
+                files.append(directory_path / entry.name)
+    return files, subdirectories
+
+
+def discover_files(  # pylint: disable=too-many-arguments,too-many-locals
+    srcs: Iterable[Path],
+    *,
+    root: Optional[Path] = None,
+    suffixes: Sequence[str] = DEFAULT_SUFFIXES,
+    exclude: Optional[Pattern[str]] = None,
+    excluded_directories: Iterable[str] = DEFAULT_EXCLUDED_DIRECTORIES,
+    workers: Optional[int] = None,
+) -> Iterator[Path]:
+    """Find source files in the given files and directories
+
+    Paths of files are yielded in no particular order as soon as each directory has
+    been scanned, so processing can start before all directories have been scanned.
+    Files given explicitly in ``srcs`` are always included. Symbolic links to
+    directories aren't followed.
+
+    :param srcs: Files and directories to look for source files in
+    :param root: The directory from which to read ``.gitignore`` files down to each
+                 directory in ``srcs``. Defaults to the project root of ``srcs``.
+    :param suffixes: File name suffixes of source files
+    :param exclude: A regular expression for excluding files and directories. It's
+                    searched for in paths relative to ``root`` with a leading slash and,
+                    for directories, a trailing slash.
+    :param excluded_directories: Names of directories never to descend into
+    :param workers: The number of threads to use, or ``None`` for the
+                    `ThreadPoolExecutor` default
+    :return: Paths of source files
+
+    """
+    srcs = [Path(src) for src in srcs]
+    if root is None:
+        root = find_project_root(tuple(srcs))
+    root = root.resolve()
+    root_prefix = os.path.join(str(root), "")
+    scan_options = (
+        root_prefix,
+        tuple(suffixes),
+        frozenset(excluded_directories),
+        exclude,
+    )
+    executor = ThreadPoolExecutor(workers, thread_name_prefix="discover_files")
+    pending: Set["Future[ScanResult]"] = set()
+    try:
+        for src in srcs:
+            if not src.is_dir():
+                yield src
+                continue
+            directory = src.resolve()
+            pending.add(
+                executor.submit(
+                    _scan_directory,
+                    str(directory),
+                    _matcher_for(directory, root),
+                    *scan_options,
+                )
+            )
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirectories = future.result()
+                for subdirectory, matcher in subdirectories:
+                    pending.add(
+                        executor.submit(
+                            _scan_directory, subdirectory, matcher, *scan_options
+                        )
+                    )
+                yield from files
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,115 @@
+"""Efficient editing of text documents line by line
+
+Applying many edits to a document by rebuilding its tuple of lines after each edit
+takes time proportional to the number of edits times the size of the document.
+`EditableTextDocument` instead records edits in a piece table and builds the tuple of
+lines only once when frozen into a `TextDocument`::
+
+    >>> from darkgraylib.utils import TextDocument
+    >>> editable = EditableTextDocument(TextDocument.from_lines(["a", "b", "c", "d"]))
+    >>> editable.replace(3, 4, ["D1", "D2"])
+    >>> editable.replace(1, 2, [])
+    >>> editable.freeze().lines
+    ('a', 'c', 'D1', 'D2')
+
+"""
+
+from itertools import chain
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from darkgraylib.utils import TextDocument
+
+# A piece refers to the lines ``lines[start:stop]`` of the original document or of the
+# replacement lines of an edit
+Piece = Tuple[Sequence[str], int, int]
+
+
+class EditableTextDocument:
+    """A text document which can be edited by replacing ranges of lines
+
+    Line numbers of each edit refer to the document as it is after all previous edits,
+    like when assigning to slices of a list. To use line numbers of the original
+    document for a batch of edits, apply them from the end of the document towards the
+    beginning.
+
+    """
+
+    __slots__ = ("_document", "_pieces", "_length")
+
+    def __init__(self, document: TextDocument):
+        """Start editing the given document
+
+        :param document: The original document. It won't be modified.
+
+        """
+        self._document = document
+        lines = document.lines
+        self._pieces: List[Piece] = [(lines, 0, len(lines))] if lines else []
+        self._length = len(lines)
+
+    def __len__(self) -> int:
+        """Return the number of lines in the edited document"""
+        return self._length
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the lines of the edited document"""
+        return chain.from_iterable(
+            lines[start:stop] for lines, start, stop in self._pieces
+        )
+
+    def _split(self, index: int) -> int:
+        """Make sure a piece starts at the given line, and return the index of it
+
+        :param index: The line number in the edited document
+        :return: The index of the piece starting at the line, or the number of pieces
+                 if the line is at the end of the document
+
+        """
+        position = 0
+        for piece_index, (lines, start, stop) in enumerate(self._pieces):
+            if index == position:
+                return piece_index
+            if index < position + stop - start:
+                cut = start + index - position
+                self._pieces[piece_index] = (lines, start, cut)
+                self._pieces.insert(piece_index + 1, (lines, cut, stop))
+                return piece_index + 1
+            position += stop - start
+        return len(self._pieces)
+
+    def replace(self, start: int, end: int, new_lines: Iterable[str]) -> None:
+        """Replace a range of lines in the document
+
+        :param start: The first line to replace, counting from zero
+        :param end: The line after the last line to replace. Equal to ``start`` to
+                    insert lines without replacing any.
+        :param new_lines: The lines to insert in place of the replaced lines
+        :raise ValueError: if the range is outside the edited document
+
+        """
+        if not 0 <= start <= end <= self._length:
+            raise ValueError(
+                f"Invalid range {start}:{end} for a document of {self._length} lines"
+            )
+        replacement = tuple(new_lines)
+        first = self._split(start)
+        last = self._split(end)
+        self._pieces[first:last] = (
+            [(replacement, 0, len(replacement))] if replacement else []
+        )
+        self._length += len(replacement) - (end - start)
+
+    def freeze(self) -> TextDocument:
+        """Return the edited document
+
+        The encoding, newline and modification time are those of the original document.
+
+        :return: A new document with all edits applied
+
+        """
+        return TextDocument.from_lines(
+            self,
+            encoding=self._document.encoding,
+            newline=self._document.newline,
+            mtime=self._document._mtime,  # pylint: disable=protected-access
+        )
@@ -1,8 +1,47 @@
 """Helper functions for working with files and directories."""
 
+# Modules needed only for reading and writing files are imported when first needed, to
+# speed up starting the command line tools
+# pylint: disable=import-outside-toplevel
+
+import os
+import time
+from collections import deque
 from functools import lru_cache
 from pathlib import Path
-from typing import Sequence, Union
+from typing import (
+    TYPE_CHECKING,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from darkgraylib.utils import WINDOWS, TextDocument
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# By default, don't start reading more files when this many bytes are being read or
+# have been read but not yet consumed by the caller of `load_documents`
+DEFAULT_MAX_INFLIGHT_BYTES = 64 * 1024 * 1024
+
+FsyncMode = Literal["none", "each", "group"]
+
+
+# Whether each directory looked at so far contains a project root marker
+_MARKER_DIRECTORIES: Dict[Path, bool] = {}
+# The modification time of each directory in `_MARKER_DIRECTORIES` when it was looked at,
+# or ``None`` if it had been modified too recently to tell later changes apart
+_MARKER_DIRECTORY_MTIMES: Dict[Path, Optional[int]] = {}
+# File systems may store modification times with a coarse resolution
+_RACY_MTIME_NS = 2_000_000_000
 
 
 @lru_cache
@@ -11,6 +50,69 @@ def _cached_resolve(path: Path) -> Path:
     return path.resolve()
 
 
+def _is_project_root(directory: Path) -> bool:
+    """Return whether a directory contains .git, .hg, or pyproject.toml.
+
+    The result is cached for each directory. See `clear_project_root_cache`.
+    """
+    if directory not in _MARKER_DIRECTORIES:
+        # Creating or removing a marker changes the modification time of the directory
+        mtime_ns = _get_mtime_ns(directory)
+        racy = time.time_ns() - mtime_ns < _RACY_MTIME_NS
+        _MARKER_DIRECTORY_MTIMES[directory] = None if racy else mtime_ns
+        _MARKER_DIRECTORIES[directory] = (
+            (directory / ".git").exists()
+            or (directory / ".hg").is_dir()
+            or (directory / "pyproject.toml").is_file()
+        )
+    return _MARKER_DIRECTORIES[directory]
+
+
+def _get_mtime_ns(directory: Path) -> int:
+    """Return the modification time of a directory, or -1 if it doesn't exist"""
+    try:
+        return directory.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+
+def clear_project_root_cache(directory: Optional[Path] = None) -> None:
+    """Forget cached project root markers, e.g. when files have been created or removed.
+
+    Long-running processes should call this when they notice changes to ``.git``,
+    ``.hg`` or ``pyproject.toml`` in the file system.
+
+    :param directory: The resolved path of the directory whose markers have changed,
+                      or ``None`` to forget about all directories
+    """
+    if directory is None:
+        _MARKER_DIRECTORIES.clear()
+        _MARKER_DIRECTORY_MTIMES.clear()
+        _cached_resolve.cache_clear()
+    else:
+        _MARKER_DIRECTORIES.pop(directory, None)
+        _MARKER_DIRECTORY_MTIMES.pop(directory, None)
+    find_project_root.cache_clear()
+
+
+def clear_changed_project_root_cache() -> None:
+    """Forget cached project root markers of directories modified since looking at them
+
+    Creating or removing ``.git``, ``.hg`` or ``pyproject.toml`` in a directory changes
+    its modification time. Long-running processes without a file watcher can call this
+    before each run instead of forgetting about all directories. Directories modified
+    just before looking at them are always forgotten, since a marker created right
+    afterwards may not change the modification time on file systems with a coarse time
+    resolution. Resolved paths are forgotten, since symbolic links may have changed.
+
+    """
+    for directory, mtime_ns in list(_MARKER_DIRECTORY_MTIMES.items()):
+        if mtime_ns is None or _get_mtime_ns(directory) != mtime_ns:
+            del _MARKER_DIRECTORIES[directory], _MARKER_DIRECTORY_MTIMES[directory]
+    _cached_resolve.cache_clear()
+    find_project_root.cache_clear()
+
+
 @lru_cache
 def find_project_root(srcs: Sequence[Union[str, Path]]) -> Path:
     """Return a directory containing .git, .hg, or pyproject.toml.
@@ -21,34 +123,215 @@ def find_project_root(srcs: Sequence[Union[str, Path]]) -> Path:
     If no directory in the tree contains a marker that would specify it's the
     project root, the root of the file system is returned.
 
-    Returns a two-tuple with the first element as the project root path and
-    the second element as a string describing the method by which the
-    project root was discovered.
+    Markers found in each directory are cached across calls with different `srcs`.
+    See `clear_project_root_cache`.
     """
     if not srcs:
         srcs = [str(_cached_resolve(Path.cwd()))]
 
     path_srcs = [_cached_resolve(Path(Path.cwd(), src)) for src in srcs]
 
-    # A list of lists of parents for each 'src'. 'src' is included as a
-    # "parent" of itself if it is a directory
-    src_parents = [
-        list(path.parents) + ([path] if path.is_dir() else []) for path in path_srcs
-    ]
-
-    common_base = max(
-        set.intersection(*(set(parents) for parents in src_parents)),
-        key=lambda path: path.parts,
+    # The deepest common parent of all 'src's. A 'src' is included as a
+    # "parent" of itself if it is a directory.
+    common_parts = os.path.commonprefix(
+        [path.parts if path.is_dir() else path.parts[:-1] for path in path_srcs]
     )
+    if not common_parts:
+        raise ValueError(f"Paths have no common parent directory: {path_srcs}")
+    common_base = Path(*common_parts)
 
     for directory in (common_base, *common_base.parents):
-        if (directory / ".git").exists():
+        if _is_project_root(directory):
             return directory
 
-        if (directory / ".hg").is_dir():
-            return directory
+    return directory  # pylint: disable=undefined-loop-variable
 
-        if (directory / "pyproject.toml").is_file():
-            return directory
 
-    return directory  # pylint: disable=undefined-loop-variable
+def _read_document(path: Path) -> TextDocument:
+    """Read and decode a file, also storing its modification time"""
+    with path.open("rb") as srcbuf:
+        mtime = os.fstat(srcbuf.fileno()).st_mtime
+        data = srcbuf.read()
+    return TextDocument.from_bytes(data, mtime)
+
+
+def _get_file_size(path: Path) -> int:
+    """Return the size of a file, or zero if it can't be accessed
+
+    Errors are raised later, when reading the file fails.
+
+    """
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def load_documents(  # pylint: disable=too-many-locals
+    paths: Iterable[Path],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+) -> Iterator[Tuple[Path, TextDocument]]:
+    """Read and decode text files using a pool of threads
+
+    This hides the latency of opening and reading files e.g. on network file systems.
+    Each file is read and decoded like with `TextDocument.from_file`.
+
+    At most twice as many files as there are workers are read ahead. Files being read
+    or read but not yet consumed are kept in memory, so a file is only started if the
+    total size of those files stays within ``max_inflight_bytes``. A single file larger
+    than that is still read once no other files are in memory. An error reading a file
+    is raised when that file would have been yielded.
+
+    :param paths: Paths of the files to read
+    :param workers: The number of threads to use, or ``None`` for the
+                    `ThreadPoolExecutor` default
+    :param ordered: ``True`` to yield documents in the order of ``paths``, ``False``
+                    to yield them as soon as they've been read
+    :param max_inflight_bytes: Maximum total size of files read ahead
+    :return: Tuples of paths and the documents read from them
+    :raise ValueError: if ``workers`` or ``max_inflight_bytes`` is less than one
+
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if max_inflight_bytes < 1:
+        raise ValueError(
+            f"max_inflight_bytes must be at least 1, got {max_inflight_bytes}"
+        )
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    if workers is None:
+        # The same default as in `ThreadPoolExecutor`
+        workers = min(32, (os.cpu_count() or 1) + 4)
+    executor = ThreadPoolExecutor(workers, thread_name_prefix="load_documents")
+    path_iterator = iter(paths)
+    pending: Deque[Tuple[Path, int, "Future[TextDocument]"]] = deque()
+    inflight_bytes = 0
+    # The next path to read and its size, if there wasn't room for it in the budget
+    next_path: Optional[Tuple[Path, int]] = None
+
+    def read_ahead() -> None:
+        """Start reading more files unless the byte budget is used up"""
+        nonlocal inflight_bytes, next_path
+        while len(pending) < 2 * workers:
+            if next_path is None:
+                path = next(path_iterator, None)
+                if path is None:
+                    return
+                next_path = path, _get_file_size(path)
+            path, size = next_path
+            if pending and inflight_bytes + size > max_inflight_bytes:
+                return
+            next_path = None
+            pending.append((path, size, executor.submit(_read_document, path)))
+            inflight_bytes += size
+
+    try:
+        read_ahead()
+        while pending:
+            if not ordered:
+                wait([future for _, _, future in pending], return_when=FIRST_COMPLETED)
+                # Rotate the first finished file to the front of the queue
+                while not pending[0][2].done():
+                    pending.rotate(-1)
+            path, size, future = pending.popleft()
+            inflight_bytes -= size
+            document = future.result()
+            read_ahead()
+            yield path, document
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _write_temporary_file(path: Path, data: bytes, sync: bool) -> Path:
+    """Write data into a new temporary file next to the given path
+
+    The temporary file gets the permissions of the existing file, or the default
+    permissions for new files if the file doesn't exist yet.
+
+    :param path: The file the data is eventually for
+    :param data: The content to write
+    :param sync: ``True`` to flush the file to disk before returning
+    :return: The path to the temporary file
+
+    """
+    from uuid import uuid4
+
+    temporary_path = path.with_name(f".{path.name}.{uuid4().hex[:8]}.tmp")
+    fd = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as dstbuf:
+            dstbuf.write(data)
+            dstbuf.flush()
+            if sync:
+                os.fsync(dstbuf.fileno())
+        if path.exists():
+            os.chmod(temporary_path, path.stat().st_mode)
+    except BaseException:
+        temporary_path.unlink()
+        raise
+    return temporary_path
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush renames in a directory to disk, except on Windows where it's not possible"""
+    if WINDOWS:
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_documents(
+    documents: Iterable[Tuple[Path, TextDocument]], fsync: FsyncMode = "group"
+) -> None:
+    """Write text documents into files atomically
+
+    Each document is encoded with its own encoding and newlines, written into a
+    temporary file next to the target file, and then renamed over the target file. This
+    way, readers see either the old or the new content of each file. The permissions of
+    existing files are preserved. For symbolic links, the file they point to is
+    replaced.
+
+    With ``fsync="group"``, all documents are first written into temporary files, each
+    flushed to disk before closing it. Then all files are renamed, and each affected
+    directory is flushed only once. If writing any document fails, no files are
+    modified.
+
+    :param documents: Tuples of target paths and the documents to write into them
+    :param fsync: ``"none"`` to leave flushing to the operating system, ``"each"`` to
+                  flush each file and its directory after writing it, or ``"group"``
+                  to flush each file, and each directory once after renaming all files
+    :raise ValueError: if ``fsync`` isn't one of the supported modes
+
+    """
+    if fsync not in {"none", "each", "group"}:
+        raise ValueError(f"Invalid fsync mode {fsync!r}")
+    pending: List[Tuple[Path, Path]] = []
+    try:
+        for link_path, document in documents:
+            # Replace the file a symbolic link points to instead of the link itself
+            path = Path(os.path.realpath(link_path))
+            temporary_path = _write_temporary_file(
+                path, document.encoded_string, sync=fsync != "none"
+            )
+            pending.append((temporary_path, path))
+            if fsync == "group":
+                continue
+            os.replace(temporary_path, path)
+            pending.pop()
+            if fsync == "each":
+                _fsync_directory(path.parent)
+        if pending:
+            for temporary_path, path in pending:
+                os.replace(temporary_path, path)
+            for directory in {path.parent for _, path in pending}:
+                _fsync_directory(directory)
+    except BaseException:
+        for temporary_path, _ in pending:
+            temporary_path.unlink(missing_ok=True)
+        raise
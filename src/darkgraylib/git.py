@@ -7,14 +7,13 @@ import shlex
 import sys
 from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
 from subprocess import PIPE, CalledProcessError, check_output  # nosec
 from typing import Dict, Iterator, List, Match, Optional, Tuple, Union, cast, overload
 
 from darkgraylib.command_line import EXIT_CODE_UNKNOWN
-from darkgraylib.utils import GIT_DATEFORMAT, TextDocument
+from darkgraylib.utils import TextDocument, format_mtime
 
 logger = logging.getLogger(__name__)
 
@@ -75,10 +74,22 @@ def git_get_mtime_at_commit(path: Path, revision: str, cwd: Path) -> str:
     :param revision: The Git revision for which to get the file modification time
     :param cwd: The root of the Git repository
 
+    """
+    return format_mtime(_git_get_timestamp_at_commit(path, revision, cwd))
+
+
+def _git_get_timestamp_at_commit(path: Path, revision: str, cwd: Path) -> int:
+    """Return the committer date of the given file at the given revision
+
+    :param path: The relative path of the file in the Git repository
+    :param revision: The Git revision for which to get the file modification time
+    :param cwd: The root of the Git repository
+    :return: The committer date as a Unix timestamp
+
     """
     cmd = ["log", "-1", "--format=%ct", revision, "--", path.as_posix()]
     lines = git_check_output_lines(cmd, cwd)
-    return datetime.fromtimestamp(int(lines[0]), timezone.utc).strftime(GIT_DATEFORMAT)
+    return int(lines[0])
 
 
 def git_get_content_at_revision(path: Path, revision: str, cwd: Path) -> TextDocument:
@@ -102,7 +113,7 @@ def git_get_content_at_revision(path: Path, revision: str, cwd: Path) -> TextDoc
     try:
         return TextDocument.from_bytes(
             _git_check_output(cmd, cwd, exit_on_error=False),
-            mtime=git_get_mtime_at_commit(path, revision, cwd),
+            mtime=_git_get_timestamp_at_commit(path, revision, cwd),
         )
     except CalledProcessError as exc_info:
         if exc_info.returncode != 128:
@@ -0,0 +1,334 @@
+"""Serve Darker or Graylint runs from a warm process over a Unix domain socket
+
+Starting the interpreter, importing modules, discovering plugins, parsing
+configuration and running Git again for every run takes a large part of the time
+needed for processing a few files. A long-running server keeps those warm, and a
+command line shim using `darkgraylib.client` sends each run to it::
+
+    >>> from darker.__main__ import main  # doctest: +SKIP
+    >>> serve(Path("/tmp/darker.sock"), main)  # doctest: +SKIP
+
+Requests are handled one at a time, since the working directory, environment variables
+and standard streams are changed for the duration of each request. See
+`darkgraylib.client` for the protocol.
+
+"""
+
+import io
+import json
+import logging
+import os
+import socket
+import stat
+import struct
+import sys
+import threading
+import traceback
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    cast,
+)
+
+from darkgraylib.client import (
+    EXIT_CODE,
+    FRAME_EXIT,
+    FRAME_HEADER,
+    FRAME_STDERR,
+    FRAME_STDOUT,
+    REQUEST_LENGTH,
+    RequestHeader,
+    read_exactly,
+)
+from darkgraylib.command_line import EXIT_CODE_UNKNOWN
+from darkgraylib.files import clear_changed_project_root_cache
+from darkgraylib.git import make_git_env
+
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer
+
+logger = logging.getLogger(__name__)
+
+# The main function of the tool, taking command line arguments and returning the exit
+# code
+MainFunction = Callable[[List[str]], Optional[int]]
+
+# The types of values in a request header
+HEADER_TYPES = {
+    "argv": list,
+    "cwd": str,
+    "env": dict,
+    "stdin": bool,
+    "stdout_isatty": bool,
+    "stderr_isatty": bool,
+}
+
+# struct ucred { pid_t pid; uid_t uid; gid_t gid; } for ``SO_PEERCRED`` on Linux
+PEER_CREDENTIALS = struct.Struct("iII")
+
+
+class _FrameWriter(io.RawIOBase):
+    """A binary stream which sends everything written to it as frames of one type"""
+
+    def __init__(self, connection: socket.socket, frame_type: int):
+        super().__init__()
+        self._connection = connection
+        self._frame_type = frame_type
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: "ReadableBuffer") -> int:
+        payload = bytes(data)
+        self._connection.sendall(
+            FRAME_HEADER.pack(self._frame_type, len(payload)) + payload
+        )
+        return len(payload)
+
+
+class _ClientStream(io.TextIOWrapper):
+    """A text stream to the client which reports whether the client has a terminal"""
+
+    def __init__(self, connection: socket.socket, frame_type: int, isatty: bool):
+        super().__init__(
+            io.BufferedWriter(_FrameWriter(connection, frame_type)),
+            encoding="utf-8",
+            errors="surrogateescape",
+            line_buffering=True,
+        )
+        self._isatty = isatty
+
+    def isatty(self) -> bool:
+        return self._isatty
+
+
+def _check_header(header: object) -> RequestHeader:
+    """Make sure a request header has values of the correct types
+
+    :param header: The decoded JSON header of the request
+    :return: The header
+    :raise TypeError: if the header or a value in it is of the wrong type
+    :raise KeyError: if a value is missing from the header
+
+    """
+    if not isinstance(header, dict):
+        raise TypeError("The request header isn't a JSON object")
+    for key, value_type in HEADER_TYPES.items():
+        if not isinstance(header[key], value_type):
+            raise TypeError(f"Invalid {key!r} in the request header")
+    if not all(isinstance(argument, str) for argument in header["argv"]):
+        raise TypeError("Invalid 'argv' in the request header")
+    if not all(isinstance(value, str) for value in header["env"].values()):
+        raise TypeError("Invalid 'env' in the request header")
+    return cast(RequestHeader, header)
+
+
+def _read_request(connection: socket.socket) -> Tuple[RequestHeader, bytes]:
+    """Read the header and standard input of a request"""
+    (length,) = REQUEST_LENGTH.unpack(read_exactly(connection, REQUEST_LENGTH.size))
+    header = _check_header(json.loads(read_exactly(connection, length)))
+    chunks = []
+    while header["stdin"]:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return header, b"".join(chunks)
+
+
+@contextmanager
+def _request_context(
+    header: RequestHeader, stdin: bytes, stdout: TextIO, stderr: TextIO
+) -> Iterator[None]:
+    """Run in the client's working directory and environment, with its streams
+
+    Each request starts without root logging handlers, and handlers added while
+    running, e.g. by `logging.basicConfig`, are removed afterwards. This way every
+    request sets up logging for its own streams.
+
+    The state of the server is restored also if switching to the client's working
+    directory fails.
+
+    """
+    original_cwd = os.getcwd()
+    original_env = dict(os.environ)
+    original_streams = sys.stdin, sys.stdout, sys.stderr
+    root_logger = logging.getLogger()
+    original_handlers = root_logger.handlers[:]
+    original_level = root_logger.level
+    try:
+        root_logger.handlers.clear()
+        os.chdir(cast(str, header["cwd"]))
+        os.environ.clear()
+        os.environ.update(cast(Dict[str, str], header["env"]))
+        sys.stdin = io.TextIOWrapper(io.BytesIO(stdin), encoding="utf-8")
+        sys.stdout, sys.stderr = stdout, stderr
+        yield
+    finally:
+        for stream in stdout, stderr:
+            with suppress(OSError):  # the client may have disconnected
+                stream.close()
+        sys.stdin, sys.stdout, sys.stderr = original_streams
+        root_logger.handlers[:] = original_handlers
+        root_logger.setLevel(original_level)
+        os.environ.clear()
+        os.environ.update(original_env)
+        os.chdir(original_cwd)
+
+
+def _run_main(main: MainFunction, argv: List[str]) -> int:
+    """Run the main function of the tool, and return its exit code"""
+    try:
+        return main(argv) or 0
+    except SystemExit as exc_info:
+        if exc_info.code is None or isinstance(exc_info.code, int):
+            return exc_info.code or 0
+        print(exc_info.code, file=sys.stderr)
+        return 1
+    except Exception:  # pylint: disable=broad-except
+        traceback.print_exc()
+        return EXIT_CODE_UNKNOWN
+
+
+class _CacheState:  # pylint: disable=too-few-public-methods
+    """Clear caches which may be out of date for a new request"""
+
+    def __init__(self) -> None:
+        self._env: Optional[Dict[str, str]] = None
+
+    def update(self, header: RequestHeader) -> None:
+        """Clear caches before running a request
+
+        Project root markers may have been created or removed since the previous
+        request, so they are looked up again in directories which have been modified.
+        Git environment variables only change with the environment of the client.
+
+        """
+        clear_changed_project_root_cache()
+        if header["env"] != self._env:
+            make_git_env.cache_clear()
+            self._env = cast(Dict[str, str], header["env"])
+
+
+def _handle_connection(
+    connection: socket.socket, main: MainFunction, cache_state: _CacheState
+) -> None:
+    """Run the command line of a request, and send the output and exit code back
+
+    :param connection: The connection to the client
+    :param main: The main function of the tool
+    :param cache_state: The environment of the previous request
+
+    """
+    header, stdin = _read_request(connection)
+    cache_state.update(header)
+    stdout = _ClientStream(connection, FRAME_STDOUT, bool(header["stdout_isatty"]))
+    stderr = _ClientStream(connection, FRAME_STDERR, bool(header["stderr_isatty"]))
+    with _request_context(header, stdin, stdout, stderr):
+        exit_code = _run_main(main, cast(List[str], header["argv"]))
+    connection.sendall(
+        FRAME_HEADER.pack(FRAME_EXIT, EXIT_CODE.size) + EXIT_CODE.pack(exit_code)
+    )
+
+
+def _bind(socket_path: Path) -> socket.socket:
+    """Listen on a Unix domain socket, replacing the socket of a server which died
+
+    The socket is created with permissions only for the current user. The umask of the
+    process is changed temporarily for that, so this shouldn't be called while other
+    threads create files.
+
+    :raise OSError: if another server is listening on the socket, or something else
+                    than a socket exists at the path
+
+    """
+    try:
+        mode = socket_path.lstat().st_mode
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(mode):
+            raise OSError(f"{socket_path} exists and isn't a socket")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(socket_path))
+            except ConnectionRefusedError:
+                socket_path.unlink()
+            else:
+                raise OSError(f"A server is already listening on {socket_path}")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Create the socket without permissions for other users right from the start
+    previous_umask = os.umask(0o177)
+    try:
+        server.bind(str(socket_path))
+        server.listen()
+    except BaseException:
+        server.close()
+        raise
+    finally:
+        os.umask(previous_umask)
+    return server
+
+
+def _is_same_user(connection: socket.socket) -> bool:
+    """Return ``True`` if the client runs as the same user as the server
+
+    Where the operating system doesn't report the user of the client, only the
+    permissions of the socket prevent other users from connecting.
+
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return True
+    credentials = connection.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, PEER_CREDENTIALS.size
+    )
+    _, uid, _ = PEER_CREDENTIALS.unpack(credentials)
+    return bool(uid == os.getuid())
+
+
+def serve(
+    socket_path: Path,
+    main: MainFunction,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """Run command lines received on a Unix domain socket until stopped
+
+    Only the user running the server can connect to the socket. On Linux, the user of
+    each client is also checked.
+
+    :param socket_path: The path of the socket to create
+    :param main: The main function of the tool, e.g. ``darker.__main__.main``. It's
+                 called with the command line arguments of each request, and should
+                 call `darkgraylib.command_line.parse_command_line`.
+    :param stop: An event to set for stopping. Without one, serve until interrupted.
+    :raise OSError: if another server is listening on the socket
+
+    """
+    cache_state = _CacheState()
+    with _bind(socket_path) as server:
+        server.settimeout(0.5)
+        try:
+            while stop is None or not stop.is_set():
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    continue
+                with connection:
+                    connection.settimeout(None)
+                    if not _is_same_user(connection):
+                        logger.warning("Refused a connection from another user")
+                        continue
+                    try:
+                        _handle_connection(connection, main, cache_state)
+                    except (OSError, TypeError, ValueError, KeyError) as exc_info:
+                        logger.warning("Invalid request: %s", exc_info)
+        finally:
+            socket_path.unlink(missing_ok=True)
@@ -0,0 +1,101 @@
+"""Unit tests for `darkgraylib.bench`"""
+
+# pylint: disable=protected-access,use-dict-literal
+
+import json
+
+import pytest
+
+from darkgraylib.bench import editing, runner
+from darkgraylib.bench.cli import main
+from darkgraylib.bench.corpora import CORPORA, count_lines
+
+
+@pytest.mark.parametrize("corpus_name", list(CORPORA))
+def test_corpora_are_deterministic(corpus_name):
+    """Each corpus generates identical documents on every call"""
+    make_corpus = CORPORA[corpus_name]
+
+    corpus1 = make_corpus(0.01)
+    corpus2 = make_corpus(0.01)
+
+    assert corpus1 == corpus2
+    assert count_lines(corpus1) > 0
+
+
+def test_run_benchmark():
+    """``run_benchmark()`` reports throughput and peak memory"""
+    result = runner.run_benchmark("dummy", lambda: len([0] * 10_000), repeat=2)
+
+    assert result.name == "dummy"
+    assert result.lines == 10_000
+    assert result.lines_per_second > 0
+    assert result.peak_memory >= 80_000
+
+
+@pytest.mark.kwparametrize(
+    dict(baseline=None, expect=[]),
+    dict(baseline={"lines_per_second": 1000, "peak_memory": 1000}, expect=[]),
+    dict(
+        baseline={"lines_per_second": 1200, "peak_memory": 1000},
+        expect=["dummy: throughput -16.7%"],
+    ),
+    dict(
+        baseline={"lines_per_second": 1000, "peak_memory": 800},
+        expect=["dummy: peak memory +25.0%"],
+    ),
+)
+def test_compare_to_baseline(baseline, expect):
+    """``compare_to_baseline()`` reports regressions beyond the tolerance"""
+    result = runner.BenchmarkResult("dummy", lines=1000, seconds=1, peak_memory=1000)
+
+    regressions = runner.compare_to_baseline(result, baseline, tolerance=0.1)
+
+    assert regressions == expect
+
+
+def test_main_baseline_round_trip(tmp_path, monkeypatch, capsys):
+    """Results stored with ``--save-baseline`` can be compared to with ``--baseline``"""
+    monkeypatch.setattr(runner, "MIN_TIMING_SECONDS", 0)
+    baseline = tmp_path / "baseline.json"
+    argv = ["diff", "--scale=0.01", "--repeat=1", "-k", "validate_opcodes"]
+
+    first = main([*argv, f"--save-baseline={baseline}"])
+    second = main([*argv, f"--baseline={baseline}", "--tolerance=1000"])
+
+    assert first == second == 0
+    stored = json.loads(baseline.read_text())
+    assert sorted(stored["diff"]) == [
+        "validate_opcodes[crlf-mixture]",
+        "validate_opcodes[large-file-small-edits]",
+        "validate_opcodes[many-small-files]",
+        "validate_opcodes[repetitive]",
+    ]
+    assert "lines/s" in capsys.readouterr().out
+
+
+def test_main_textdocument_suite(monkeypatch, capsys):
+    """The ``textdocument`` suite times ``TextDocument.from_bytes()`` on each corpus"""
+    monkeypatch.setattr(runner, "MIN_TIMING_SECONDS", 0)
+
+    result = main(["textdocument", "--scale=0.01", "--repeat=1"])
+
+    assert result == 0
+    output = capsys.readouterr().out
+    assert [line.split()[0] for line in output.splitlines()] == [
+        "from_bytes[large-file-small-edits]",
+        "from_bytes[many-small-files]",
+        "from_bytes[repetitive]",
+        "from_bytes[crlf-mixture]",
+    ]
+
+
+def test_edit_benchmarks_agree():
+    """Both ways of applying chunks in the ``edit`` suite give the same result"""
+    document, chunks = editing.many_chunks(0.05)
+
+    with_tuples = editing._replace_with_tuples(document, chunks)
+    with_piece_table = editing._replace_with_piece_table(document, chunks)
+
+    assert len(chunks) == 25
+    assert with_piece_table == with_tuples
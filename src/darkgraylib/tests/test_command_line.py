@@ -4,7 +4,11 @@
 # pylint: disable=use-dict-literal
 
 import os
+import subprocess  # nosec
+import sys
+from argparse import ArgumentParser
 from pathlib import Path
+from typing import Dict
 from unittest.mock import Mock, patch
 
 import pytest
@@ -374,3 +378,131 @@ def test_parse_command_line_invalid_arguments(capsys):
     assert excinfo.value.code == 3
     captured = capsys.readouterr()
     assert "error: unrecognized arguments: --invalid-option" in captured.err
+
+
+def test_parse_command_line_creates_parser_once(tmp_path, monkeypatch):
+    """The argument parser is created only once if paths are given"""
+    monkeypatch.chdir(tmp_path)
+    factory = Mock(wraps=make_test_argument_parser)
+
+    parse_command_line(factory, ["x.py"], "darkgraylib", BaseConfig)
+
+    factory.assert_called_once_with(require_src=False)
+
+
+class LintConfig(BaseConfig, total=False):
+    """Configuration options with an ``append`` and a typed option"""
+
+    lint: list[str]
+    line_length: int
+
+
+def _make_parser_with_lint(require_src: bool) -> ArgumentParser:
+    """Create an argument parser with an ``append`` and a typed option"""
+    parser = make_test_argument_parser(require_src)
+    parser.add_argument("-L", "--lint", action="append", default=[])
+    parser.add_argument("-l", "--line-length", type=int, default="88")
+    return parser
+
+
+@pytest.mark.kwparametrize(
+    dict(config={}, argv=["x.py"], expect_lint=[], expect_line_length=88),
+    dict(
+        config={"lint": ["mypy"]},
+        argv=["x.py"],
+        expect_lint=["mypy"],
+        expect_line_length=88,
+    ),
+    dict(
+        config={"lint": ["mypy"]},
+        argv=["-L", "pylint", "x.py"],
+        expect_lint=["mypy", "pylint"],
+        expect_line_length=88,
+    ),
+    dict(
+        config={"line_length": "100"},
+        argv=["x.py"],
+        expect_lint=[],
+        expect_line_length=100,
+    ),
+    dict(
+        config={"line_length": 100},
+        argv=["-l", "79", "x.py"],
+        expect_lint=[],
+        expect_line_length=79,
+    ),
+)
+def test_parse_command_line_merge_config(
+    tmp_path, monkeypatch, config, argv, expect_lint, expect_line_length
+):
+    """Configuration is merged like parser defaults with command line options"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text(
+        toml.dumps({"tool": {"darkgraylib": config}})
+    )
+
+    args, _, _ = parse_command_line(
+        _make_parser_with_lint, argv, "darkgraylib", LintConfig
+    )
+
+    assert args.lint == expect_lint
+    assert args.line_length == expect_line_length
+
+
+# Modules which the command line entry path must not import until they're needed
+LAZILY_IMPORTED_MODULES = {
+    "concurrent.futures",
+    "datetime",
+    "difflib",
+    "hashlib",
+    "toml",
+    "uuid",
+}
+
+# Maximum cumulative time for importing `darkgraylib.command_line`, relative to the
+# time for importing `argparse` in the same interpreter. This way the budget scales
+# with the speed of the machine, e.g. on loaded CI runners or when measuring coverage.
+IMPORT_TIME_BUDGET_ARGPARSE_RATIO = 8
+
+
+def _measure_import_times(module: str, pycache_prefix: Path) -> Dict[str, int]:
+    """Import a module in a new interpreter and return cumulative import times
+
+    :param module: The name of the module to import
+    :param pycache_prefix: The directory for storing compiled bytecode
+    :return: The names of all imported modules and their cumulative import times in
+             microseconds
+
+    """
+    env = {**os.environ, "PYTHONPYCACHEPREFIX": str(pycache_prefix)}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(  # nosec
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        encoding="utf-8",
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_command_line_import_time(tmp_path):
+    """Importing the command line module is fast and doesn't import heavy modules"""
+    # Compile bytecode once so it isn't included in the measured times
+    _measure_import_times("darkgraylib.command_line", tmp_path)
+
+    measurements = [
+        _measure_import_times("darkgraylib.command_line", tmp_path) for _ in range(3)
+    ]
+
+    assert not LAZILY_IMPORTED_MODULES.intersection(measurements[0])
+    fastest_ratio = min(
+        times["darkgraylib.command_line"] / times["argparse"] for times in measurements
+    )
+    assert fastest_ratio < IMPORT_TIME_BUDGET_ARGPARSE_RATIO
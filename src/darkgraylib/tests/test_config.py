@@ -1,23 +1,32 @@
 """Tests for `darkgraylib.config`"""
 
-# pylint: disable=too-many-arguments,too-many-positional-arguments,use-dict-literal
+# pylint: disable=redefined-outer-name,too-many-arguments,too-many-positional-arguments
+# pylint: disable=use-dict-literal
 
 import os
 import re
 from argparse import ArgumentParser, Namespace
 from textwrap import dedent
+from unittest.mock import patch
 
 import pytest
+import toml
 from toml import TomlDecodeError
 
-from darkgraylib.config import (
+from darkgraylib.config import (  # pylint: disable=no-name-in-module
     ConfigurationError,
     BaseConfig,
     TomlArrayLinesEncoder,
+    _SECTION_CACHE,
+    _get_snapshot_path,
+    _read_snapshot,
+    clear_config_cache,
     dump_config,
     get_effective_config,
     get_modified_config,
+    group_paths_by_config,
     load_config,
+    read_pyproject_section,
 )
 from darkgraylib.testtools.helpers import raises_if_exception
 
@@ -566,3 +575,198 @@ def test_load_config(tmp_path, monkeypatch, config, expect):
         assert {k: type(v) for k, v in result.items()} == {
             k: type(v) for k, v in expect.items()
         }
+
+
+def test_read_pyproject_section_cache(tmp_path, monkeypatch):
+    """`read_pyproject_section()` parses a file again only if it has changed"""
+    config_path = tmp_path / "pyproject.toml"
+    config_path.write_text("[tool.darkgraylib]\nlog-level = 'INFO'\n")
+    calls = []
+    original_load = toml.load
+
+    def load(path):
+        calls.append(path)
+        return original_load(path)
+
+    monkeypatch.setattr(toml, "load", load)
+
+    first = read_pyproject_section(config_path, "darkgraylib")
+    first["log_level"] = "modified"
+    second = read_pyproject_section(config_path, "darkgraylib")
+    os.utime(config_path, ns=(0, 0))
+    third = read_pyproject_section(config_path, "darkgraylib")
+    clear_config_cache(config_path)
+    read_pyproject_section(config_path, "darkgraylib")
+
+    assert second == third == {"log_level": "INFO"}
+    assert calls == [config_path, config_path, config_path]
+
+
+def test_read_pyproject_section_cache_size(tmp_path):
+    """Only the latest version of each section is kept in the cache"""
+    config_path = tmp_path / "pyproject.toml"
+    clear_config_cache()
+
+    for mtime_ns in range(5):
+        config_path.write_text(f"[tool.darkgraylib]\nlog-level = {mtime_ns}\n")
+        os.utime(config_path, ns=(mtime_ns, mtime_ns))
+        read_pyproject_section(config_path, "darkgraylib")
+
+    size = config_path.stat().st_size
+    assert list(_SECTION_CACHE.values()) == [(4, size, {"log_level": 4})]
+
+
+def test_load_config_reloads_changed_file(tmp_path, monkeypatch):
+    """`load_config()` notices changes to the configuration file"""
+    config_path = tmp_path / "pyproject.toml"
+    config_path.write_text("[tool.darkgraylib]\nlog_level = 'INFO'\n")
+    monkeypatch.chdir(tmp_path)
+    first = load_config(None, ["."], "darkgraylib", BaseConfig)
+    config_path.write_text("[tool.darkgraylib]\nlog_level = 'DEBUG'\n")
+
+    second = load_config(None, ["."], "darkgraylib", BaseConfig)
+
+    assert first == {"log_level": "INFO"}
+    assert second == {"log_level": "DEBUG"}
+
+
+def test_read_pyproject_section_snapshot(tmp_path, monkeypatch):
+    """Sections are read from the snapshot without parsing TOML in later runs"""
+    monkeypatch.setenv("DARKGRAYLIB_CACHE_DIR", str(tmp_path / "cache"))
+    config_path = tmp_path / "pyproject.toml"
+    config_path.write_text("[tool.darkgraylib]\nlog-level = 'INFO'\n")
+    read_pyproject_section(config_path, "darkgraylib")
+    clear_config_cache()
+
+    def fail(path):
+        raise AssertionError(f"{path} parsed again")
+
+    with monkeypatch.context() as context:
+        context.setattr(toml, "load", fail)
+        result = read_pyproject_section(config_path, "darkgraylib")
+    clear_config_cache()
+    config_path.write_text("[tool.darkgraylib]\nlog-level = 'DEBUG'\n")
+    changed = read_pyproject_section(config_path, "darkgraylib")
+
+    assert result == {"log_level": "INFO"}
+    assert changed == {"log_level": "DEBUG"}
+
+
+def test_read_pyproject_section_snapshot_unsupported_value(tmp_path, monkeypatch):
+    """Sections with values which can't be stored in the snapshot are still read"""
+    monkeypatch.setenv("DARKGRAYLIB_CACHE_DIR", str(tmp_path / "cache"))
+    config_path = tmp_path / "pyproject.toml"
+    config_path.write_text("[tool.darkgraylib]\nsince = 2024-01-01\n")
+
+    result = read_pyproject_section(config_path, "darkgraylib")
+
+    assert str(result["since"]) == "2024-01-01"
+    assert not (tmp_path / "cache").exists()
+
+
+def test_read_pyproject_section_snapshot_drops_stale(tmp_path, monkeypatch):
+    """Sections of removed and modified files are dropped from the snapshot"""
+    monkeypatch.setenv("DARKGRAYLIB_CACHE_DIR", str(tmp_path / "cache"))
+    for name in "removed", "modified", "new":
+        (tmp_path / f"{name}.toml").write_text("[tool.darkgraylib]\n")
+    read_pyproject_section(tmp_path / "removed.toml", "darkgraylib")
+    read_pyproject_section(tmp_path / "modified.toml", "darkgraylib")
+    (tmp_path / "removed.toml").unlink()
+    (tmp_path / "modified.toml").write_text("[tool.darkgraylib]\nquiet = true\n")
+
+    read_pyproject_section(tmp_path / "new.toml", "darkgraylib")
+
+    snapshot_path = _get_snapshot_path()
+    assert snapshot_path
+    assert list(_read_snapshot(snapshot_path)) == [
+        (str(tmp_path / "new.toml"), "darkgraylib")
+    ]
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    """Create a repository with packages which have their own configuration"""
+    (tmp_path / ".git").mkdir()
+    for package, config in [
+        (".", "[tool.darkgraylib]\nrevision = 'main'\n"),
+        ("configured", "[tool.darkgraylib]\nrevision = 'HEAD~1'\n"),
+        ("empty", "[tool.darkgraylib]\n"),
+        ("other_tool", "[tool.other]\nrevision = 'HEAD~2'\n"),
+    ]:
+        (tmp_path / package / "src").mkdir(parents=True, exist_ok=True)
+        (tmp_path / package / "pyproject.toml").write_text(config)
+        (tmp_path / package / "src" / "module.py").touch()
+    return tmp_path.resolve()
+
+
+def test_group_paths_by_config(monorepo):
+    """Paths are grouped by the nearest configuration file with the tool's section"""
+    paths = [
+        monorepo / "configured" / "src" / "module.py",
+        monorepo / "empty" / "src",
+        monorepo / "other_tool" / "src" / "module.py",
+        monorepo / "configured",
+        monorepo / "src" / "module.py",
+    ]
+
+    result = group_paths_by_config(paths, "darkgraylib", BaseConfig)
+
+    assert [(batch.config_path, batch.config, batch.paths) for batch in result] == [
+        (
+            monorepo / "configured" / "pyproject.toml",
+            {"revision": "HEAD~1"},
+            [paths[0], paths[3]],
+        ),
+        (monorepo / "empty" / "pyproject.toml", {}, [paths[1]]),
+        (monorepo / "pyproject.toml", {"revision": "main"}, [paths[2], paths[4]]),
+    ]
+
+
+def test_group_paths_by_config_parses_once(monorepo, monkeypatch):
+    """Each configuration file is parsed only once"""
+    calls = []
+    original_load = toml.load
+
+    def load(path):
+        calls.append(path)
+        return original_load(path)
+
+    monkeypatch.setattr(toml, "load", load)
+    paths = [monorepo / "configured" / "src" / "module.py", monorepo / "configured"]
+
+    group_paths_by_config(paths, "darkgraylib", BaseConfig)
+    group_paths_by_config(paths, "darkgraylib", BaseConfig)
+
+    assert calls == [monorepo / "configured" / "pyproject.toml"]
+
+
+def test_group_paths_by_config_snapshot(monorepo, monkeypatch):
+    """The snapshot is read once in a process and written once for all new sections"""
+    monkeypatch.setenv("DARKGRAYLIB_CACHE_DIR", str(monorepo / "cache"))
+    paths = [
+        monorepo / "configured" / "src" / "module.py",
+        monorepo / "other_tool" / "src" / "module.py",
+        monorepo / "empty" / "src",
+    ]
+    with patch(
+        "darkgraylib.config._read_snapshot", wraps=_read_snapshot
+    ) as read_snapshot, patch("darkgraylib.config._write_snapshot") as write_snapshot:
+        group_paths_by_config(paths, "darkgraylib", BaseConfig)
+        group_paths_by_config(paths, "darkgraylib", BaseConfig)
+
+    assert read_snapshot.call_count == 1
+    assert write_snapshot.call_count == 1
+    assert len(write_snapshot.call_args.args[1]) == 4
+
+
+def test_group_paths_by_config_stops_at_repository_root(tmp_path):
+    """Configuration files outside the repository aren't used"""
+    (tmp_path / "pyproject.toml").write_text("[tool.darkgraylib]\nrevision = 'main'\n")
+    (tmp_path / "repo" / ".git").mkdir(parents=True)
+    (tmp_path / "repo" / "module.py").touch()
+
+    result = group_paths_by_config(
+        [tmp_path / "repo" / "module.py"], "darkgraylib", BaseConfig
+    )
+
+    assert [(batch.config_path, batch.config) for batch in result] == [(None, {})]
@@ -4,7 +4,16 @@
 
 import pytest
 
-from darkgraylib.diff import diff_and_get_opcodes, map_unmodified_lines
+from darkgraylib.diff import (
+    IntralineDiff,
+    LineDiff,
+    diff_and_get_opcodes,
+    diff_and_iter_opcodes,
+    map_moved_lines,
+    map_unmodified_lines,
+    pair_similar_lines,
+    validate_opcodes,
+)
 from darkgraylib.testtools.diff_helpers import (
     EXPECT_OPCODES,
     FUNCTIONS2_PY,
@@ -23,6 +32,147 @@ def test_diff_and_get_opcodes():
     assert opcodes == EXPECT_OPCODES
 
 
+@pytest.mark.parametrize("window_lines", [1, 2, 5, 10_000])
+def test_diff_and_iter_opcodes_example(window_lines):
+    """``diff_and_iter_opcodes()`` produces a valid diff for the example sources"""
+    src = TextDocument.from_str(FUNCTIONS2_PY)
+    dst = TextDocument.from_str(FUNCTIONS2_PY_REFORMATTED)
+
+    opcodes = list(diff_and_iter_opcodes(src.lines, dst.lines, window_lines))
+
+    validate_opcodes(opcodes)
+    rebuilt = [
+        line
+        for tag, src_start, src_end, dst_start, dst_end in opcodes
+        for line in (
+            src.lines[src_start:src_end]
+            if tag == "equal"
+            else dst.lines[dst_start:dst_end]
+        )
+    ]
+    assert rebuilt == list(dst.lines)
+    assert opcodes[0][1::2] == (0, 0)
+    assert opcodes[-1][2::2] == (len(src.lines), len(dst.lines))
+    if window_lines > len(src.lines):
+        assert opcodes == EXPECT_OPCODES
+
+
+@pytest.mark.kwparametrize(
+    dict(src_lines=[], dst_lines=[], expect=[]),
+    dict(src_lines=[], dst_lines=["a", "b"], expect=[("insert", 0, 0, 0, 2)]),
+    dict(src_lines=["a", "b"], dst_lines=[], expect=[("delete", 0, 2, 0, 0)]),
+    dict(
+        src_lines=[f"line {n}" for n in range(100)],
+        dst_lines=[f"line {n}" for n in range(100)],
+        expect=[("equal", 0, 100, 0, 100)],
+    ),
+    dict(
+        src_lines=[f"line {n}" for n in range(100)],
+        dst_lines=[f"line {n}" for n in range(50)]
+        + ["new 1", "new 2"]
+        + [f"line {n}" for n in range(50, 100)],
+        expect=[
+            ("equal", 0, 50, 0, 50),
+            ("insert", 50, 50, 50, 52),
+            ("equal", 50, 100, 52, 102),
+        ],
+    ),
+    dict(
+        src_lines=["x"] * 30,
+        dst_lines=["y"] * 25,
+        expect=[("replace", 0, 30, 0, 25)],
+    ),
+)
+def test_diff_and_iter_opcodes(src_lines, dst_lines, expect):
+    """``diff_and_iter_opcodes()`` merges opcodes across window boundaries"""
+    result = list(diff_and_iter_opcodes(iter(src_lines), iter(dst_lines), 7))
+
+    assert result == expect
+
+
+LINES = [f"line {n}" for n in range(5_000)]
+INSERTED = [f"new {n}" for n in range(2_000)]
+
+
+@pytest.mark.kwparametrize(
+    dict(
+        dst_lines=LINES[:2_000] + INSERTED[:1_200] + LINES[2_000:],
+        expect=[
+            ("equal", 0, 2_000, 0, 2_000),
+            ("insert", 2_000, 2_000, 2_000, 3_200),
+            ("equal", 2_000, 5_000, 3_200, 6_200),
+        ],
+    ),
+    dict(
+        dst_lines=LINES[:1_000] + INSERTED + LINES[1_000:],
+        expect=[
+            ("equal", 0, 1_000, 0, 1_000),
+            ("insert", 1_000, 1_000, 1_000, 3_000),
+            ("equal", 1_000, 5_000, 3_000, 7_000),
+        ],
+    ),
+    dict(
+        dst_lines=LINES[1_500:],
+        expect=[("delete", 0, 1_500, 0, 0), ("equal", 1_500, 5_000, 0, 3_500)],
+    ),
+    dict(
+        dst_lines=LINES[:2_000] + LINES[3_500:],
+        expect=[
+            ("equal", 0, 2_000, 0, 2_000),
+            ("delete", 2_000, 3_500, 2_000, 2_000),
+            ("equal", 3_500, 5_000, 2_000, 3_500),
+        ],
+    ),
+    dict(
+        dst_lines=LINES[:1_000] + INSERTED + LINES[2_500:],
+        expect=[
+            ("equal", 0, 1_000, 0, 1_000),
+            ("replace", 1_000, 2_500, 1_000, 3_000),
+            ("equal", 2_500, 5_000, 3_000, 5_500),
+        ],
+    ),
+)
+def test_diff_and_iter_opcodes_realign(dst_lines, expect):
+    """``diff_and_iter_opcodes()`` diffs edits longer than the window exactly"""
+    result = list(diff_and_iter_opcodes(LINES, dst_lines, 1_000))
+
+    assert result == expect
+
+
+LONG_LINES = [f"line {n}" for n in range(30_000)]
+
+
+@pytest.mark.kwparametrize(
+    dict(dst_lines=LONG_LINES[:1_000] + INSERTED + LONG_LINES[1_000:]),
+    dict(dst_lines=LONG_LINES[:1_000] + LONG_LINES[3_000:]),
+    dict(dst_lines=LONG_LINES[:1_000] + INSERTED[:1_000] + LONG_LINES[3_000:]),
+)
+def test_diff_and_iter_opcodes_realign_long_edit(dst_lines):
+    """After edits longer than the lookahead, the diff is valid and realigns"""
+    result = list(diff_and_iter_opcodes(LONG_LINES, dst_lines, 100))
+
+    validate_opcodes(result)
+    rebuilt = [
+        line
+        for tag, src_start, src_end, dst_start, dst_end in result
+        for line in (
+            LONG_LINES[src_start:src_end]
+            if tag == "equal"
+            else dst_lines[dst_start:dst_end]
+        )
+    ]
+    assert rebuilt == dst_lines
+    assert result[0] == ("equal", 0, 1_000, 0, 1_000)
+    assert len(result) == 3
+    assert result[-1][2::2] == (len(LONG_LINES), len(dst_lines))
+
+
+def test_diff_and_iter_opcodes_invalid_window():
+    """``diff_and_iter_opcodes()`` requires a positive window size"""
+    with pytest.raises(ValueError):
+        next(diff_and_iter_opcodes([], [], 0))
+
+
 @pytest.mark.kwparametrize(
     dict(
         expect={1: 1},
@@ -56,3 +206,148 @@ def test_map_unmodified_lines(lines1, lines2, expect):
     result = map_unmodified_lines(doc1, doc2)
 
     assert result == expect
+
+
+@pytest.mark.kwparametrize(
+    dict(
+        normalization="exact",
+        expect={1: 1, 4: 4},
+    ),
+    dict(
+        normalization="ignore-trailing-whitespace",
+        expect={1: 1, 2: 2, 4: 4},
+    ),
+    dict(
+        normalization="ignore-indentation",
+        expect={1: 1, 2: 2, 3: 3, 4: 4},
+    ),
+    lines1=["def f():", "    pass", "    return", "# end"],
+    lines2=["def f():", "    pass  \r", "        return", "# end"],
+)
+def test_map_unmodified_lines_normalization(lines1, lines2, normalization, expect):
+    """``map_unmodified_lines`` can ignore whitespace-only changes in lines"""
+    doc1 = TextDocument.from_lines(lines1)
+    doc2 = TextDocument.from_lines(lines2)
+
+    result = map_unmodified_lines(doc1, doc2, normalization)
+
+    assert result == expect
+
+
+@pytest.mark.kwparametrize(
+    dict(
+        min_moved_block_lines=None,
+        expect={1: 4, 2: 5, 3: 6, 4: 7},
+    ),
+    dict(
+        min_moved_block_lines=3,
+        expect={1: 4, 2: 5, 3: 6, 4: 7, 5: 1, 6: 2, 7: 3},
+    ),
+    dict(
+        min_moved_block_lines=4,
+        expect={1: 4, 2: 5, 3: 6, 4: 7},
+    ),
+    lines1=["can't", "follow", "both", "when", "order", "is", "changed"],
+    lines2=["when", "order", "is", "changed", "can't", "follow", "both"],
+)
+def test_map_unmodified_lines_moved_blocks(
+    lines1, lines2, min_moved_block_lines, expect
+):
+    """``map_unmodified_lines`` optionally maps blocks moved unchanged"""
+    doc1 = TextDocument.from_lines(lines1)
+    doc2 = TextDocument.from_lines(lines2)
+
+    result = map_unmodified_lines(
+        doc1, doc2, min_moved_block_lines=min_moved_block_lines
+    )
+
+    assert result == expect
+
+
+@pytest.mark.kwparametrize(
+    dict(
+        src_lines=["def f():", "    return 1", "", "x = 1", "y = 2"],
+        dst_lines=["x = 1", "y = 2", "", "def f():", "    return 1"],
+        unmodified={3: 3},
+        expect={1: 4, 2: 5, 4: 1, 5: 2},
+    ),
+    dict(
+        src_lines=["a", "b", "a", "b"],
+        dst_lines=["a", "b", "a", "b", "a", "b"],
+        unmodified={1: 1, 2: 2, 3: 3, 4: 4},
+        expect={},
+    ),
+    dict(
+        src_lines=["a", "b", "c", "x", "a", "b", "c"],
+        dst_lines=["a", "b", "c", "a", "b", "c"],
+        unmodified={},
+        expect={1: 1, 2: 2, 3: 3, 4: 5, 5: 6, 6: 7},
+    ),
+    dict(
+        src_lines=["a", "b", "c"],
+        dst_lines=["a", "b", "x", "c"],
+        unmodified={},
+        expect={1: 1, 2: 2},
+    ),
+    min_block_lines=2,
+)
+def test_map_moved_lines(src_lines, dst_lines, unmodified, min_block_lines, expect):
+    """``map_moved_lines`` maps only unmapped blocks which are long enough"""
+    result = map_moved_lines(src_lines, dst_lines, unmodified, min_block_lines)
+
+    assert result == expect
+
+
+def test_map_moved_lines_repetitive():
+    """``map_moved_lines`` maps many blocks of only a couple of distinct lines"""
+    src_lines = ["", "    pass"] * 10_000
+    dst_lines = []
+    for block in range(5_000):
+        dst_lines.extend(["", "    pass", "", "    pass", f"# {block}"])
+
+    result = map_moved_lines(src_lines, dst_lines, {}, 3)
+
+    assert len(result) == 20_000
+    assert len(set(result.values())) == 20_000
+    assert all(src_lines[src - 1] == dst_lines[dst - 1] for dst, src in result.items())
+
+
+@pytest.mark.kwparametrize(
+    dict(src_lines=[], dst_lines=[], expect=[]),
+    dict(src_lines=["a"], dst_lines=["zzz"], expect=[(0, 0)]),
+    dict(src_lines=["foo()"], dst_lines=[], expect=[(0, None)]),
+    dict(src_lines=[], dst_lines=["foo()"], expect=[(None, 0)]),
+    dict(
+        src_lines=["print(x)", "return"],
+        dst_lines=["# new", "print(xy)", "return  "],
+        expect=[(None, 0), (0, 1), (1, 2)],
+    ),
+    dict(
+        src_lines=["removed", "value = compute(a, b)"],
+        dst_lines=["value = compute(a, b, c)"],
+        expect=[(0, None), (1, 0)],
+    ),
+)
+def test_pair_similar_lines(src_lines, dst_lines, expect):
+    """``pair_similar_lines()`` pairs lines by similarity, keeping their order"""
+    result = pair_similar_lines(src_lines, dst_lines)
+
+    assert result == expect
+
+
+def test_intraline_diff():
+    """``IntralineDiff`` computes character-level diffs lazily for replace chunks"""
+    src = TextDocument.from_lines(["keep", "x = 1", "gone", "keep too"])
+    dst = TextDocument.from_lines(["keep", "x = 12", "keep too", "added"])
+    intraline = IntralineDiff(src, dst)
+
+    replaced = intraline[1]
+
+    assert intraline.opcodes[1] == ("replace", 1, 3, 1, 2)
+    assert replaced == [
+        LineDiff(1, 1, [("equal", 0, 5, 0, 5), ("insert", 5, 5, 5, 6)]),
+        LineDiff(2, None, [("delete", 0, 4, 0, 0)]),
+    ]
+    assert intraline[1] is replaced
+    assert intraline[0] == []
+    assert intraline[3] == []
@@ -0,0 +1,133 @@
+"""Unit tests for `darkgraylib.discovery`"""
+
+# pylint: disable=redefined-outer-name,use-dict-literal
+
+import re
+from pathlib import Path
+
+import pytest
+
+from darkgraylib.discovery import IgnoreMatcher, compile_gitignore, discover_files
+
+
+@pytest.mark.kwparametrize(
+    dict(pattern="foo", path="foo", expect=True),
+    dict(pattern="foo", path="a/b/foo", expect=True),
+    dict(pattern="foo", path="foobar", expect=False),
+    dict(pattern="/foo", path="a/foo", expect=False),
+    dict(pattern="a/foo", path="a/foo", expect=True),
+    dict(pattern="a/foo", path="b/a/foo", expect=False),
+    dict(pattern="*.pyc", path="a/b.pyc", expect=True),
+    dict(pattern="a/*.py", path="a/b/c.py", expect=False),
+    dict(pattern="?.py", path="ab.py", expect=False),
+    dict(pattern="[ab].py", path="b.py", expect=True),
+    dict(pattern="[!ab].py", path="b.py", expect=False),
+    dict(pattern="**/foo", path="a/b/foo", expect=True),
+    dict(pattern="a/**/foo", path="a/foo", expect=True),
+    dict(pattern="a/**/foo", path="a/b/c/foo", expect=True),
+    dict(pattern="a/**", path="a/b/c", expect=True),
+    dict(pattern="foo/", path="a/foo", expect=False),
+    dict(pattern="foo/", path="a/foo", is_directory=True, expect=True),
+    dict(pattern="\\#foo", path="#foo", expect=True),
+    dict(pattern="#foo", path="#foo", expect=False),
+    dict(pattern="foo\\ ", path="foo ", expect=True),
+    is_directory=False,
+)
+def test_compile_gitignore(pattern, path, is_directory, expect):
+    """``.gitignore`` patterns are translated like Git interprets them"""
+    file_regex, directory_regex = compile_gitignore([pattern])
+
+    match = (directory_regex if is_directory else file_regex).match(path)
+
+    assert bool(match) == expect
+
+
+@pytest.mark.kwparametrize(
+    dict(path="a.log", expect=True),
+    dict(path="keep.log", expect=False),
+    dict(path="sub/keep.log", expect=False),
+    dict(path="sub/other.log", expect=True),
+    dict(path="sub/sub.log", expect=False),
+    dict(path="a.py", expect=False),
+)
+def test_ignore_matcher(tmp_path, path, expect):
+    """The last matching pattern wins, and deeper ``.gitignore`` files win"""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / ".gitignore").write_text("*.log\n!keep.log\n")
+    (tmp_path / "sub" / ".gitignore").write_text("!sub.log\n")
+    matcher = IgnoreMatcher(str(tmp_path)).child(str(tmp_path))
+    if path.startswith("sub/"):
+        matcher = matcher.child(str(tmp_path / "sub"))
+
+    result = matcher.is_ignored(str(tmp_path / path), is_directory=False)
+
+    assert result == expect
+
+
+@pytest.fixture
+def source_tree(tmp_path: Path) -> Path:
+    """Create a directory tree with ignored and excluded files"""
+    for path in [
+        ".git/info/exclude",
+        ".gitignore",
+        "pyproject.toml",
+        "a.py",
+        "b.pyi",
+        "c.txt",
+        "generated.py",
+        "pkg/__init__.py",
+        "pkg/.gitignore",
+        "pkg/local.py",
+        "pkg/sub/module.py",
+        "pkg/sub/scratch.py",
+        "build/ignored.py",
+        ".venv/lib/ignored.py",
+        "ignored_dir/ignored.py",
+        "tests/test_a.py",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    (tmp_path / ".git" / "info" / "exclude").write_text("scratch.py\n")
+    (tmp_path / ".gitignore").write_text("ignored_dir/\ngenerated.py\n")
+    (tmp_path / "pkg" / ".gitignore").write_text("local.py\n")
+    return tmp_path
+
+
+def test_discover_files(source_tree):
+    """Ignored and excluded directories and files are skipped"""
+    result = discover_files([source_tree], workers=2)
+
+    assert sorted(path.relative_to(source_tree).as_posix() for path in result) == [
+        "a.py",
+        "b.pyi",
+        "pkg/__init__.py",
+        "pkg/sub/module.py",
+        "tests/test_a.py",
+    ]
+
+
+def test_discover_files_subdirectory(source_tree):
+    """``.gitignore`` files above a source directory apply inside it"""
+    result = discover_files([source_tree / "pkg" / "sub"], root=source_tree)
+
+    assert [path.relative_to(source_tree).as_posix() for path in result] == [
+        "pkg/sub/module.py"
+    ]
+
+
+def test_discover_files_options(source_tree):
+    """Explicit files are included, and suffixes and exclusions can be changed"""
+    result = discover_files(
+        [source_tree, source_tree / "generated.py"],
+        suffixes=[".py", ".txt"],
+        exclude=re.compile(r"^/tests/|^/a\.py$"),
+        excluded_directories={".venv"},
+    )
+
+    assert sorted(path.relative_to(source_tree).as_posix() for path in result) == [
+        "build/ignored.py",
+        "c.txt",
+        "generated.py",
+        "pkg/__init__.py",
+        "pkg/sub/module.py",
+    ]
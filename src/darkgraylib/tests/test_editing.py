@@ -0,0 +1,69 @@
+"""Unit tests for `darkgraylib.editing`"""
+
+# pylint: disable=use-dict-literal
+
+import pytest
+
+from darkgraylib.editing import EditableTextDocument
+from darkgraylib.utils import TextDocument
+
+ORIGINAL = TextDocument.from_lines(
+    ["a", "b", "c", "d", "e"], encoding="latin-1", newline="\r\n", mtime="dummy mtime"
+)
+
+
+@pytest.mark.kwparametrize(
+    dict(edits=[], expect=["a", "b", "c", "d", "e"]),
+    dict(edits=[(1, 2, ["B"])], expect=["a", "B", "c", "d", "e"]),
+    dict(edits=[(0, 5, [])], expect=[]),
+    dict(edits=[(5, 5, ["f", "g"])], expect=["a", "b", "c", "d", "e", "f", "g"]),
+    dict(edits=[(0, 0, ["0"])], expect=["0", "a", "b", "c", "d", "e"]),
+    dict(edits=[(3, 5, ["D"]), (1, 2, [])], expect=["a", "c", "D"]),
+    dict(
+        edits=[(1, 1, ["x", "y", "z"]), (2, 6, ["Y"])],
+        expect=["a", "x", "Y", "d", "e"],
+    ),
+    dict(
+        edits=[(1, 4, ["1", "2"]), (2, 2, ["3"]), (0, 2, ["4"]), (2, 4, [])],
+        expect=["4", "3"],
+    ),
+)
+def test_editable_text_document(edits, expect):
+    """Edits are applied like slice assignments to a list of lines"""
+    editable = EditableTextDocument(ORIGINAL)
+    expect_lines = list(ORIGINAL.lines)
+
+    for start, end, new_lines in edits:
+        editable.replace(start, end, new_lines)
+        expect_lines[start:end] = new_lines
+        assert len(editable) == len(expect_lines)
+    result = editable.freeze()
+
+    assert expect_lines == expect
+    assert result.lines == tuple(expect)
+    assert result.encoding == "latin-1"
+    assert result.newline == "\r\n"
+    assert result.mtime == "dummy mtime"
+    assert ORIGINAL.lines == ("a", "b", "c", "d", "e")
+
+
+@pytest.mark.kwparametrize(
+    dict(start=-1, end=0),
+    dict(start=2, end=1),
+    dict(start=5, end=6),
+)
+def test_editable_text_document_invalid_range(start, end):
+    """Ranges outside the document are rejected"""
+    editable = EditableTextDocument(ORIGINAL)
+
+    with pytest.raises(ValueError, match="Invalid range"):
+        editable.replace(start, end, [])
+
+
+def test_editable_text_document_empty():
+    """An empty document can be edited"""
+    editable = EditableTextDocument(TextDocument())
+
+    editable.replace(0, 0, ["a"])
+
+    assert editable.freeze().lines == ("a",)
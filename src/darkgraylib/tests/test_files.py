@@ -1,6 +1,6 @@
 """Tests for the `darkgraylib.files` module."""
 
-# pylint: disable=redefined-outer-name
+# pylint: disable=redefined-outer-name,use-dict-literal
 
 import os
 from contextlib import contextmanager
@@ -10,6 +10,7 @@ from typing import Iterator
 import pytest
 
 from darkgraylib import files
+from darkgraylib.utils import TextDocument
 
 
 @contextmanager
@@ -64,3 +65,257 @@ def test_find_project_root(src_root: Path) -> None:
 
     # we skip src_sub since it has no `pyproject.toml`
     assert result == (src_root / "src").resolve()
+
+
+def test_find_project_root_marker_cache(src_root: Path) -> None:
+    """Markers are probed once per directory across different `srcs`."""
+    files.clear_project_root_cache()
+    (src_root / "test" / "sub").mkdir()
+
+    first = files.find_project_root((src_root / "test" / "sub",))
+    cached = dict(files._MARKER_DIRECTORIES)  # pylint: disable=protected-access
+    second = files.find_project_root((src_root / "test",))
+
+    assert first == second == src_root.resolve()
+    assert cached == {
+        (src_root / "test" / "sub").resolve(): False,
+        (src_root / "test").resolve(): False,
+        src_root.resolve(): True,
+    }
+    assert files._MARKER_DIRECTORIES == cached  # pylint: disable=protected-access
+
+
+def test_clear_project_root_cache(src_root: Path) -> None:
+    """Invalidating a directory makes new markers in it visible."""
+    files.clear_project_root_cache()
+    assert files.find_project_root((src_root / "test",)) == src_root.resolve()
+    (src_root / "test" / "pyproject.toml").touch()
+    assert files.find_project_root((src_root / "test",)) == src_root.resolve()
+
+    files.clear_project_root_cache((src_root / "test").resolve())
+
+    assert (
+        files.find_project_root((src_root / "test",)) == (src_root / "test").resolve()
+    )
+
+
+def test_clear_changed_project_root_cache(src_root: Path) -> None:
+    """Only directories modified since looking at them are looked at again."""
+    files.clear_project_root_cache()
+    (src_root / "test" / "sub").mkdir()
+    for directory in src_root / "test" / "sub", src_root / "test", src_root:
+        os.utime(directory, (1_000_000_000, 1_000_000_000))
+    files.find_project_root((src_root / "test" / "sub",))
+    (src_root / "test" / "pyproject.toml").touch()
+
+    files.clear_changed_project_root_cache()
+
+    assert files._MARKER_DIRECTORIES == {  # pylint: disable=protected-access
+        (src_root / "test" / "sub").resolve(): False,
+        src_root.resolve(): True,
+    }
+    assert (
+        files.find_project_root((src_root / "test" / "sub",))
+        == (src_root / "test").resolve()
+    )
+
+
+def test_clear_changed_project_root_cache_racy(src_root: Path) -> None:
+    """Directories modified just before looking at them are always looked at again."""
+    files.clear_project_root_cache()
+    files.find_project_root((src_root / "test",))
+
+    files.clear_changed_project_root_cache()
+
+    assert not files._MARKER_DIRECTORIES  # pylint: disable=protected-access
+
+
+@pytest.fixture
+def text_files(tmp_path: Path) -> list[Path]:
+    """Create text files for testing `load_documents`."""
+    paths = []
+    for index in range(20):
+        path = tmp_path / f"file{index}.py"
+        path.write_bytes(f"# file {index}\r\nprint({index})\r\n".encode())
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("workers", [None, 1, 3])
+@pytest.mark.parametrize(
+    "max_inflight_bytes", [1, 100, files.DEFAULT_MAX_INFLIGHT_BYTES]
+)
+def test_load_documents_ordered(
+    text_files: list[Path], workers: int, max_inflight_bytes: int
+) -> None:
+    """`load_documents` yields documents in the order of the paths by default."""
+    result = list(
+        files.load_documents(
+            text_files, workers=workers, max_inflight_bytes=max_inflight_bytes
+        )
+    )
+
+    assert [path for path, _ in result] == text_files
+    for path, document in result:
+        assert document == TextDocument.from_file(path)
+        assert document.newline == "\r\n"
+        assert document.mtime == TextDocument.from_file(path).mtime
+
+
+def test_load_documents_unordered(text_files: list[Path]) -> None:
+    """`load_documents` can yield documents in the order they were read."""
+    result = dict(files.load_documents(text_files, workers=4, ordered=False))
+
+    assert sorted(result) == sorted(text_files)
+    for path, document in result.items():
+        assert document == TextDocument.from_file(path)
+
+
+def test_load_documents_error(text_files: list[Path], tmp_path: Path) -> None:
+    """An error reading a file is raised when that file is reached."""
+    paths = [*text_files[:3], tmp_path / "missing.py", *text_files[3:]]
+    documents = files.load_documents(paths, workers=2)
+
+    result = [next(documents) for _ in range(3)]
+
+    assert [path for path, _ in result] == text_files[:3]
+    with pytest.raises(FileNotFoundError):
+        next(documents)
+
+
+@pytest.mark.kwparametrize(
+    dict(max_inflight_bytes=45, expect_max_inflight=2),
+    dict(max_inflight_bytes=1, expect_max_inflight=1),
+)
+def test_load_documents_max_inflight_bytes(
+    text_files: list[Path],
+    monkeypatch: pytest.MonkeyPatch,
+    max_inflight_bytes: int,
+    expect_max_inflight: int,
+) -> None:
+    """Files being read count against the byte budget, but one file is always read."""
+    started: list[Path] = []
+    read_document = files._read_document  # pylint: disable=protected-access
+
+    def record_read(path: Path) -> TextDocument:
+        started.append(path)
+        return read_document(path)
+
+    monkeypatch.setattr(files, "_read_document", record_read)
+    inflight = []
+
+    for consumed, _ in enumerate(
+        files.load_documents(
+            text_files, workers=8, max_inflight_bytes=max_inflight_bytes
+        ),
+        start=1,
+    ):
+        inflight.append(len(started) - consumed)
+
+    assert len(inflight) == len(text_files)
+    assert max(inflight) <= expect_max_inflight
+
+
+@pytest.mark.kwparametrize(
+    dict(workers=0, max_inflight_bytes=1),
+    dict(workers=1, max_inflight_bytes=0),
+)
+def test_load_documents_invalid_arguments(
+    workers: int, max_inflight_bytes: int
+) -> None:
+    """`load_documents` rejects non-positive worker counts and byte budgets."""
+    with pytest.raises(ValueError):
+        next(files.load_documents([], workers, max_inflight_bytes=max_inflight_bytes))
+
+
+@pytest.fixture
+def sync_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record calls to `os.fsync` without flushing anything."""
+    calls: list[str] = []
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.append("fsync"))
+    return calls
+
+
+@pytest.mark.kwparametrize(
+    dict(fsync="none", expect_calls=[]),
+    dict(fsync="each", expect_calls=["fsync"] * 6),
+    dict(fsync="group", expect_calls=["fsync"] * 5),
+)
+def test_write_documents(
+    tmp_path: Path,
+    sync_calls: list[str],
+    fsync: files.FsyncMode,
+    expect_calls: list[str],
+) -> None:
+    """`write_documents` writes each document with its encoding and newlines."""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "existing.py").write_bytes(b"old content\n")
+    (tmp_path / "existing.py").chmod(0o751)
+    documents = [
+        (tmp_path / "existing.py", TextDocument.from_str("new\r\ncontent\r\n")),
+        (tmp_path / "new.py", TextDocument.from_lines(["\xe4"], encoding="latin-1")),
+        (tmp_path / "sub" / "bom.py", TextDocument("x\n", encoding="utf-8-sig")),
+    ]
+
+    files.write_documents(documents, fsync=fsync)
+
+    assert (tmp_path / "existing.py").read_bytes() == b"new\r\ncontent\r\n"
+    assert (tmp_path / "new.py").read_bytes() == b"\xe4\n"
+    assert (tmp_path / "sub" / "bom.py").read_bytes() == b"\xef\xbb\xbfx\n"
+    if os.name == "posix":
+        assert (tmp_path / "existing.py").stat().st_mode & 0o777 == 0o751
+    assert sorted(p.name for p in tmp_path.rglob("*")) == [
+        "bom.py",
+        "existing.py",
+        "new.py",
+        "sub",
+    ]
+    assert sync_calls == expect_calls
+
+
+@pytest.mark.parametrize("fsync", ["none", "each", "group"])
+def test_write_documents_symlink(tmp_path: Path, fsync: files.FsyncMode) -> None:
+    """`write_documents` writes through symbolic links instead of replacing them."""
+    (tmp_path / "real.py").write_bytes(b"old content\n")
+    (tmp_path / "link.py").symlink_to("real.py")
+
+    files.write_documents([(tmp_path / "link.py", TextDocument("new\n"))], fsync)
+
+    assert (tmp_path / "link.py").is_symlink()
+    assert (tmp_path / "real.py").read_bytes() == b"new\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["link.py", "real.py"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="Needs POSIX file permissions")
+@pytest.mark.parametrize("fsync", ["none", "each", "group"])
+def test_write_documents_read_only(tmp_path: Path, fsync: files.FsyncMode) -> None:
+    """`write_documents` replaces read-only files and keeps them read-only."""
+    (tmp_path / "read_only.py").write_bytes(b"old content\n")
+    (tmp_path / "read_only.py").chmod(0o444)
+
+    files.write_documents([(tmp_path / "read_only.py", TextDocument("new\n"))], fsync)
+
+    assert (tmp_path / "read_only.py").read_bytes() == b"new\n"
+    assert (tmp_path / "read_only.py").stat().st_mode & 0o777 == 0o444
+
+
+def test_write_documents_group_error(tmp_path: Path, sync_calls: list[str]) -> None:
+    """In group mode, no files are modified if any document can't be written."""
+    (tmp_path / "first.py").write_bytes(b"original\n")
+    documents = [
+        (tmp_path / "first.py", TextDocument("modified\n")),
+        (tmp_path / "second.py", TextDocument("\xe4\n", encoding="ascii")),
+    ]
+
+    with pytest.raises(UnicodeEncodeError):
+        files.write_documents(documents)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["first.py"]
+    assert (tmp_path / "first.py").read_bytes() == b"original\n"
+    assert sync_calls == ["fsync"]
+
+
+def test_write_documents_invalid_fsync_mode() -> None:
+    """`write_documents` rejects unknown fsync modes."""
+    with pytest.raises(ValueError, match="Invalid fsync mode 'always'"):
+        files.write_documents([], fsync="always")  # type: ignore[arg-type]
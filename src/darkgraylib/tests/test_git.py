@@ -150,9 +150,7 @@ def git_call(cmd, encoding=None):
             git_call("git show HEAD:./my.txt"),
             git_call("git log -1 --format=%ct HEAD -- my.txt", encoding="utf-8"),
         ],
-        expect_textdocument_calls=[
-            call.from_bytes(b"1627107028", mtime="2021-07-24 06:10:28.000000 +0000")
-        ],
+        expect_textdocument_calls=[call.from_bytes(b"1627107028", mtime=1627107028)],
     ),
     dict(
         revision="HEAD^",
@@ -160,9 +158,7 @@ def git_call(cmd, encoding=None):
             git_call("git show HEAD^:./my.txt"),
             git_call("git log -1 --format=%ct HEAD^ -- my.txt", encoding="utf-8"),
         ],
-        expect_textdocument_calls=[
-            call.from_bytes(b"1627107028", mtime="2021-07-24 06:10:28.000000 +0000")
-        ],
+        expect_textdocument_calls=[call.from_bytes(b"1627107028", mtime=1627107028)],
     ),
     dict(
         revision="master",
@@ -170,9 +166,7 @@ def git_call(cmd, encoding=None):
             git_call("git show master:./my.txt"),
             git_call("git log -1 --format=%ct master -- my.txt", encoding="utf-8"),
         ],
-        expect_textdocument_calls=[
-            call.from_bytes(b"1627107028", mtime="2021-07-24 06:10:28.000000 +0000")
-        ],
+        expect_textdocument_calls=[call.from_bytes(b"1627107028", mtime=1627107028)],
     ),
     expect_git_calls=[],
 )
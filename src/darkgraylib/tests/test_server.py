@@ -0,0 +1,210 @@
+"""Tests for `darkgraylib.server` and `darkgraylib.client`"""
+
+# pylint: disable=redefined-outer-name,use-dict-literal
+
+import io
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from darkgraylib.client import REQUEST_LENGTH, run_client
+from darkgraylib.command_line import EXIT_CODE_UNKNOWN, parse_command_line
+from darkgraylib.config import BaseConfig
+from darkgraylib.files import find_project_root
+from darkgraylib.server import serve
+from darkgraylib.testtools.mock_argument_parser import make_test_argument_parser
+
+pytestmark = [
+    pytest.mark.skipif(
+        sys.platform.startswith("win"), reason="Unix domain sockets are needed"
+    ),
+    pytest.mark.usefixtures("find_project_root_cache_clear"),
+]
+
+
+def fake_main(argv: List[str]) -> int:
+    """Print information about the request, like a tool's main function would"""
+    if argv == ["crash"]:
+        raise RuntimeError("crashed")
+    if argv == ["root"]:
+        print(find_project_root(("pkg",)))
+        return 0
+    args, _, _ = parse_command_line(
+        make_test_argument_parser, argv, "darkgraylib", BaseConfig
+    )
+    logging.basicConfig(level=logging.WARNING)
+    logging.warning("logged")
+    print(f"cwd={Path.cwd().name} src={args.src} tty={sys.stdout.isatty()}")
+    print(f"env={os.getenv('TEST_SERVER')}")
+    if args.stdin_filename:
+        sys.stdout.write(sys.stdin.buffer.read().decode("utf-8"))
+    return 7
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> Iterator[Path]:
+    """Run a server for `fake_main` in a thread"""
+    socket_path = tmp_path / "server.sock"
+    stop = threading.Event()
+    thread = threading.Thread(target=serve, args=(socket_path, fake_main, stop))
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not socket_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield socket_path
+    stop.set()
+    thread.join()
+
+
+def run(socket_path: Path, argv: List[str], stdin: bytes = b"") -> Tuple[int, str, str]:
+    """Run a command line in the server, returning the exit code, stdout and stderr"""
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    exit_code = run_client(socket_path, argv, io.BytesIO(stdin), stdout, stderr)
+    return exit_code, stdout.getvalue().decode(), stderr.getvalue().decode()
+
+
+def test_run_client(server, tmp_path, monkeypatch):
+    """The command line runs in the client's directory and environment"""
+    (tmp_path / "project").mkdir()
+    monkeypatch.chdir(tmp_path / "project")
+    monkeypatch.setenv("TEST_SERVER", "yes")
+
+    result = run(server, ["a.py"])
+
+    assert result == (
+        7,
+        "cwd=project src=['a.py'] tty=False\nenv=yes\n",
+        "WARNING:root:logged\n",
+    )
+
+
+def test_run_client_stdin(server):
+    """Standard input is sent to the server for ``--stdin-filename``"""
+    exit_code, stdout, _ = run(server, ["--stdin-filename", "a.py"], b"print(42)\n")
+
+    assert exit_code == 7
+    assert stdout.endswith("print(42)\n")
+
+
+@pytest.mark.parametrize(
+    "argv, expect_exit_code, expect_stderr",
+    [
+        (["--invalid-option"], 3, "error: unrecognized arguments: --invalid-option"),
+        (["crash"], EXIT_CODE_UNKNOWN, "RuntimeError: crashed"),
+    ],
+)
+def test_run_client_errors(server, argv, expect_exit_code, expect_stderr):
+    """Errors and exit codes are reported to the client"""
+    exit_code, _, stderr = run(server, argv)
+
+    assert exit_code == expect_exit_code
+    assert expect_stderr in stderr
+
+
+def test_serve_restores_process_state(server, tmp_path):
+    """The server restores its directory, streams and logging after each request"""
+    cwd = os.getcwd()
+    stdout = sys.stdout
+    handlers = logging.getLogger().handlers[:]
+
+    run(server, [str(tmp_path)])
+    second_result = run(server, [str(tmp_path)])
+
+    assert os.getcwd() == cwd
+    assert sys.stdout is stdout
+    assert logging.getLogger().handlers == handlers
+    assert second_result[2] == "WARNING:root:logged\n"
+
+
+@pytest.mark.kwparametrize(
+    dict(header={"cwd": "/nonexistent/directory"}),
+    dict(header={"env": ["TEST_SERVER"]}),
+    dict(header={"env": {"TEST_SERVER": 1}}),
+    dict(header={"argv": "a.py"}),
+    dict(header={"stdout_isatty": None}),
+    dict(header=["not", "an", "object"]),
+)
+def test_serve_invalid_request(server, tmp_path, header):
+    """The server survives an invalid request and restores its state"""
+    valid_header = {
+        "argv": [],
+        "cwd": str(tmp_path),
+        "env": {},
+        "stdin": False,
+        "stdout_isatty": False,
+        "stderr_isatty": False,
+    }
+    if isinstance(header, dict):
+        header = {**valid_header, **header}
+    request = json.dumps(header).encode("utf-8")
+    cwd = os.getcwd()
+    environ = dict(os.environ)
+    handlers = logging.getLogger().handlers[:]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(str(server))
+        connection.sendall(REQUEST_LENGTH.pack(len(request)) + request)
+        response = connection.recv(65536)
+
+    result = run(server, [str(tmp_path)])
+
+    assert response == b""
+    assert result[0] == 7
+    assert os.getcwd() == cwd
+    assert dict(os.environ) == environ
+    assert logging.getLogger().handlers == handlers
+
+
+def test_serve_finds_new_project_root(server, tmp_path, monkeypatch):
+    """Project root markers created between requests are noticed"""
+    repo = tmp_path.resolve() / "repo"
+    (repo / ".git").mkdir(parents=True)
+    (repo / "pkg").mkdir()
+    monkeypatch.chdir(repo)
+    first_result = run(server, ["root"])
+    (repo / "pkg" / "pyproject.toml").touch()
+
+    second_result = run(server, ["root"])
+
+    assert first_result == (0, f"{repo}\n", "")
+    assert second_result == (0, f"{repo / 'pkg'}\n", "")
+
+
+def test_serve_socket_in_use(server):
+    """Starting a second server on the same socket fails"""
+    with pytest.raises(OSError, match="already listening"):
+        serve(server, fake_main, threading.Event())
+
+
+def test_serve_socket_permissions(server):
+    """Only the user running the server can access the socket"""
+    assert server.stat().st_mode & 0o777 == 0o600
+
+
+def test_serve_doesnt_replace_file(tmp_path):
+    """A file which isn't a socket isn't replaced with one"""
+    socket_path = tmp_path / "server.sock"
+    socket_path.write_text("precious")
+
+    with pytest.raises(OSError, match="isn't a socket"):
+        serve(socket_path, fake_main, threading.Event())
+
+    assert socket_path.read_text() == "precious"
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, "SO_PEERCRED"), reason="Needs the user of the client"
+)
+def test_serve_refuses_other_user(server, monkeypatch):
+    """Connections from other users are closed without running anything"""
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+
+    with pytest.raises(ConnectionError):
+        run(server, ["a.py"])
@@ -1,18 +1,24 @@
 """Unit tests for `darkgraylib.utils`."""
 
-# pylint: disable=redefined-outer-name,use-dict-literal
+# pylint: disable=protected-access,redefined-outer-name,use-dict-literal
 
 import os
+import pickle
 from pathlib import Path
 
 import pytest
 
 from darkgraylib.utils import (
+    MappedLines,
+    MappedTextDocument,
     TextDocument,
+    TextDocumentView,
     detect_newline,
     get_common_root,
     get_path_ancestry,
     joinlines,
+    normalize_newlines,
+    splitlines,
 )
 
 
@@ -68,6 +74,108 @@ def test_detect_newline(string, expect):
     assert result == expect
 
 
+@pytest.mark.kwparametrize(
+    dict(doc1=TextDocument("a\nb\n"), doc2=TextDocument(lines=["a", "b"])),
+    dict(doc1=TextDocument("a\nb\n"), doc2=TextDocument("a\r\nb\r\n")),
+    dict(doc1=TextDocument("a\nb\n"), doc2=TextDocument("a\nb\n", encoding="utf-16")),
+    dict(doc1=TextDocument("a\nb\n"), doc2=TextDocument("a\nb\n", mtime="dummy")),
+    dict(doc1=TextDocument("a\nb\n"), doc2=TextDocument("a\nc\n"), expect=False),
+    dict(doc1=TextDocument(""), doc2=TextDocument(lines=[])),
+    dict(doc1=TextDocument(""), doc2=TextDocument(lines=[""]), expect=False),
+    expect=True,
+)
+def test_textdocument_fingerprint(doc1, doc2, expect):
+    """TextDocument.fingerprint is equal for documents with equal lines"""
+    assert (doc1.fingerprint == doc2.fingerprint) == expect
+    assert (doc1 == doc2) == expect
+    assert (hash(doc1) == hash(doc2)) == expect
+
+
+def test_textdocument_fingerprint_cached():
+    """TextDocument.fingerprint is computed only once"""
+    document = TextDocument("a\nb\n")
+
+    result = document.fingerprint
+
+    assert len(result) == 16
+    assert document._fingerprint is result
+    assert document.fingerprint is result
+
+
+def test_textdocument_eq_fingerprint_short_circuit():
+    """Equality of documents with cached fingerprints doesn't compare lines"""
+    doc1 = TextDocument("a\nb\n")
+    doc2 = TextDocument("a\nc\n")
+    doc1._fingerprint = doc2._fingerprint = b"dummy"
+
+    assert doc1 == doc2
+
+
+@pytest.mark.kwparametrize(
+    dict(start=0, stop=None, expect=("a", "b", "c", "d")),
+    dict(start=1, stop=3, expect=("b", "c")),
+    dict(start=-2, stop=None, expect=("c", "d")),
+    dict(start=3, stop=1, expect=()),
+    dict(start=2, stop=10, expect=("c", "d")),
+)
+def test_textdocument_view(start, stop, expect):
+    """TextDocument.view() refers to a range of lines of the document"""
+    document = TextDocument.from_str("a\r\nb\r\nc\r\nd\r\n", mtime="dummy mtime")
+
+    result = document.view(start, stop)
+
+    assert isinstance(result, TextDocumentView)
+    assert result.parent is document
+    assert result._lines is None
+    assert result._string is None
+    assert result.lines == expect
+    assert result.string == "".join(f"{line}\r\n" for line in expect)
+    assert result.encoded_string == result.string.encode("utf-8")
+    assert result.newline == "\r\n"
+    assert result.mtime == "dummy mtime"
+    assert result == TextDocument.from_lines(expect)
+    assert TextDocument.from_lines(expect) == result
+
+
+def test_textdocument_view_of_view():
+    """A view of a view refers directly to the original document"""
+    document = TextDocument.from_lines(["a", "b", "c", "d", "e"])
+
+    result = document.view(1, 4).view(1)
+
+    assert result.parent is document
+    assert (result.start, result.stop) == (2, 4)
+    assert result.lines == ("c", "d")
+
+
+def test_textdocument_view_pickle():
+    """A view is pickled as a regular document without its parent"""
+    document = TextDocument.from_lines(["a", "b", "c"], newline="\r\n", mtime=0)
+
+    result = pickle.loads(pickle.dumps(document.view(1)))
+
+    assert type(result) is TextDocument  # pylint: disable=unidiomatic-typecheck
+    assert result.lines == ("b", "c")
+    assert result.newline == "\r\n"
+    assert result.mtime == "1970-01-01 00:00:00.000000 +0000"
+
+
+@pytest.mark.kwparametrize(
+    dict(document=TextDocument(), expect="e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"),
+    dict(
+        document=TextDocument("hello\n"),
+        expect="ce013625030ba8dba906f756967f9e9ca394464a",
+    ),
+    dict(
+        document=TextDocument("hello\r\n", newline="\r\n"),
+        expect="ef0493b275aa2080237f676d2ef6559246f56636",
+    ),
+)
+def test_textdocument_git_blob_sha(document, expect):
+    """TextDocument.git_blob_sha() matches the object name given by Git"""
+    assert document.git_blob_sha() == expect
+
+
 @pytest.mark.kwparametrize(
     dict(textdocument=TextDocument(), expect="utf-8"),
     dict(textdocument=TextDocument(encoding="utf-8"), expect="utf-8"),
@@ -150,6 +258,103 @@ def test_textdocument_lines(doc, expect):
     assert doc.lines == expect
 
 
+def test_textdocument_has_no_instance_dict():
+    """TextDocument uses slots instead of an instance dictionary to save memory"""
+    assert not hasattr(TextDocument("foo\n"), "__dict__")
+
+
+@pytest.mark.kwparametrize(
+    dict(policy="keep-both", string="a\nb\n", expect_string=True, expect_lines=True),
+    dict(policy="keep-lines", string="a\nb\n", expect_string=False, expect_lines=True),
+    dict(
+        policy="keep-lines",
+        string="a\r\nb\r\n",
+        newline="\r\n",
+        expect_string=False,
+        expect_lines=True,
+    ),
+    dict(policy="keep-lines", string="a\nb", expect_string=True, expect_lines=True),
+    dict(policy="keep-lines", string="a\n\n", expect_string=True, expect_lines=True),
+    dict(policy="keep-lines", string="a\rb\n", expect_string=True, expect_lines=True),
+    dict(
+        policy="keep-lines",
+        string="a\n\r",
+        newline="\r\n",
+        expect_string=True,
+        expect_lines=True,
+    ),
+    dict(policy="keep-string", string="a\nb\n", expect_string=True, expect_lines=False),
+    newline="\n",
+)
+def test_textdocument_memory_policy_lines(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    monkeypatch, policy, string, newline, expect_string, expect_lines
+):
+    """TextDocument.MEMORY_POLICY controls which forms are kept after splitting"""
+    monkeypatch.setattr(TextDocument, "MEMORY_POLICY", policy)
+    document = TextDocument(string, newline=newline)
+
+    lines = document.lines
+
+    assert (document._string is not None) == expect_string
+    assert (document._lines is not None) == expect_lines
+    assert document.string == string
+    assert document.lines == lines
+
+
+@pytest.mark.kwparametrize(
+    dict(policy="keep-both", expect_string=True, expect_lines=True),
+    dict(policy="keep-lines", expect_string=False, expect_lines=True),
+    dict(policy="keep-string", expect_string=True, expect_lines=False),
+    dict(
+        policy="keep-string",
+        lines=("x = 1", ""),
+        newline="\n",
+        expect="x = 1\n\n",
+        expect_string=True,
+        expect_lines=True,
+    ),
+    dict(
+        policy="keep-string",
+        lines=("a\rb",),
+        newline="\n",
+        expect="a\rb\n",
+        expect_string=True,
+        expect_lines=True,
+    ),
+    lines=("a", "b"),
+    newline="\r\n",
+    expect="a\r\nb\r\n",
+)
+def test_textdocument_memory_policy_string(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    monkeypatch, policy, lines, newline, expect, expect_string, expect_lines
+):
+    """TextDocument.MEMORY_POLICY controls which forms are kept after joining"""
+    monkeypatch.setattr(TextDocument, "MEMORY_POLICY", policy)
+    document = TextDocument(lines=lines, newline=newline)
+
+    string = document.string
+
+    assert string == expect
+    assert (document._string is not None) == expect_string
+    assert (document._lines is not None) == expect_lines
+    assert document.lines == lines
+
+
+@pytest.mark.kwparametrize(
+    dict(normalization="exact", expect=("  a  ", "\tb\r", "")),
+    dict(normalization="ignore-trailing-whitespace", expect=("  a", "\tb", "")),
+    dict(normalization="ignore-indentation", expect=("a", "b", "")),
+)
+def test_textdocument_normalized_lines(normalization, expect):
+    """TextDocument.normalized_lines() normalizes whitespace and caches the result"""
+    doc = TextDocument.from_lines(["  a  ", "\tb\r", ""])
+
+    result = doc.normalized_lines(normalization)
+
+    assert result == expect
+    assert doc.normalized_lines(normalization) is result
+
+
 @pytest.mark.kwparametrize(
     dict(
         textdocument=TextDocument.from_str(""),
@@ -208,6 +413,13 @@ def test_textdocument_from_str(
     dict(textdocument=b'print("touch\xc3\xa9")\n', expect="utf-8"),
     dict(textdocument=b'\xef\xbb\xbfprint("touch\xc3\xa9")\n', expect="utf-8-sig"),
     dict(textdocument=b'# coding: iso-8859-1\n"touch\xe9"\n', expect="iso-8859-1"),
+    dict(
+        textdocument=b'#!/bin/python\n# coding=latin-1\n"\xe9"\n', expect="iso-8859-1"
+    ),
+    dict(textdocument=b'\n\n# coding: latin-1\n"touch\xc3\xa9"\n', expect="utf-8"),
+    dict(textdocument=b'"coding"\n"touch\xc3\xa9"\n', expect="utf-8"),
+    dict(textdocument=b"", expect="utf-8"),
+    dict(textdocument=b"\xef\xbb\xbf", expect="utf-8-sig"),
     indirect=["textdocument"],
 )
 def test_textdocument_detect_encoding(textdocument, expect):
@@ -215,6 +427,18 @@ def test_textdocument_detect_encoding(textdocument, expect):
     assert textdocument.encoding == expect
 
 
+@pytest.mark.kwparametrize(
+    dict(data=b"\xe9\n", expect=SyntaxError),
+    dict(data=b"first line\n\xe9\n", expect=UnicodeDecodeError),
+    dict(data=b"\xef\xbb\xbf\xe9\n", expect=SyntaxError),
+    dict(data=b"\xef\xbb\xbf# coding: latin-1\n", expect=SyntaxError),
+)
+def test_textdocument_from_bytes_invalid(data, expect):
+    """TextDocument.from_bytes() raises the same exceptions as `tokenize` on bad input"""
+    with pytest.raises(expect):
+        TextDocument.from_bytes(data)
+
+
 @pytest.mark.kwparametrize(
     dict(textdocument=b'print("unix")\n', expect="\n"),
     dict(textdocument=b'print("windows")\r\n', expect="\r\n"),
@@ -292,6 +516,10 @@ def test_textdocument_eq(doc1, doc2, expect):
         document=TextDocument(mtime="some mtime"),
         expect="TextDocument([0 lines], mtime='some mtime')",
     ),
+    dict(
+        document=TextDocument(mtime=0),
+        expect="TextDocument([0 lines], mtime='1970-01-01 00:00:00.000000 +0000')",
+    ),
     dict(
         document=TextDocument(encoding="utf-8"),
         expect="TextDocument([0 lines])",
@@ -320,12 +548,28 @@ def test_textdocument_repr(document, expect):
     dict(document=TextDocument(), expect=""),
     dict(document=TextDocument(mtime=""), expect=""),
     dict(document=TextDocument(mtime="dummy mtime"), expect="dummy mtime"),
+    dict(document=TextDocument(mtime=0), expect="1970-01-01 00:00:00.000000 +0000"),
+    dict(
+        document=TextDocument(mtime=1_000_000_000.5),
+        expect="2001-09-09 01:46:40.500000 +0000",
+    ),
 )
 def test_textdocument_mtime(document, expect):
     """TextDocument.mtime"""
     assert document.mtime == expect
 
 
+def test_textdocument_mtime_formatted_once():
+    """A Unix timestamp is formatted on first access and cached"""
+    document = TextDocument(mtime=1_000_000_000)
+
+    result = document.mtime
+
+    assert result == "2001-09-09 01:46:40.000000 +0000"
+    assert document._mtime is result
+    assert document.mtime is result
+
+
 def test_textdocument_from_file(tmp_path):
     """TextDocument.from_file()"""
     dummy_txt = tmp_path / "dummy.txt"
@@ -341,6 +585,121 @@ def test_textdocument_from_file(tmp_path):
     assert document.mtime == "2001-09-09 01:46:40.000000 +0000"
 
 
+@pytest.mark.kwparametrize(
+    dict(content=b"dummy\ncontent\n", expect_newline="\n"),
+    dict(content=b"dummy\r\ncontent\r\n", expect_newline="\r\n"),
+    dict(content=b"dummy\rcontent", expect_newline="\n"),
+    dict(content=b"\n\ndummy\n\ncontent\n\n\n", expect_newline="\n"),
+    dict(content=b"\xef\xbb\xbfdummy\ncontent\n", expect_newline="\n"),
+    dict(content=b"\n", expect_newline="\n"),
+    dict(content="\u00e4\r\n\u20ac\r\n".encode(), expect_newline="\r\n"),
+)
+def test_textdocument_from_file_memory_map(tmp_path, content, expect_newline):
+    """TextDocument.from_file(memory_map=True) matches reading the file in memory"""
+    dummy_txt = tmp_path / "dummy.txt"
+    dummy_txt.write_bytes(content)
+    expect = TextDocument.from_file(dummy_txt)
+
+    document = TextDocument.from_file(dummy_txt, memory_map=True)
+
+    assert isinstance(document, MappedTextDocument)
+    assert isinstance(document.lines, MappedLines)
+    assert document == expect
+    assert expect == document
+    assert hash(document) == hash(expect)
+    assert list(document.lines) == list(expect.lines)
+    assert document.lines[1:] == expect.lines[1:]
+    assert document.lines[-1] == expect.lines[-1]
+    assert len(document.lines) == len(expect.lines)
+    assert document.string == expect.string
+    assert document.encoding == expect.encoding
+    assert document.newline == expect_newline
+    assert document.mtime == expect.mtime
+
+
+@pytest.mark.kwparametrize(
+    dict(content=b""),
+    dict(content=b"# coding: iso-8859-1\n\xe4\n"),
+)
+def test_textdocument_from_file_memory_map_fallback(tmp_path, content):
+    """Empty and non-UTF-8 files are read into a regular `TextDocument`"""
+    dummy_txt = tmp_path / "dummy.txt"
+    dummy_txt.write_bytes(content)
+
+    document = TextDocument.from_file(dummy_txt, memory_map=True)
+
+    assert type(document) is TextDocument  # pylint: disable=unidiomatic-typecheck
+    assert document == TextDocument.from_file(dummy_txt)
+
+
+def test_mapped_textdocument_not_equal_to_empty(tmp_path):
+    """A memory-mapped document isn't mistaken for an empty document"""
+    dummy_txt = tmp_path / "dummy.txt"
+    dummy_txt.write_bytes(b"dummy\n")
+
+    document = TextDocument.from_file(dummy_txt, memory_map=True)
+
+    assert document != TextDocument()
+    assert TextDocument() != document
+
+
+def test_mapped_textdocument_pickle(tmp_path):
+    """A memory-mapped document is unpickled as a regular `TextDocument`"""
+    dummy_txt = tmp_path / "dummy.txt"
+    dummy_txt.write_bytes(b"dummy\r\ncontent\r\n")
+    document = TextDocument.from_file(dummy_txt, memory_map=True)
+
+    result = pickle.loads(pickle.dumps(document))
+
+    assert type(result) is TextDocument  # pylint: disable=unidiomatic-typecheck
+    assert result == document
+    assert result.string == "dummy\r\ncontent\r\n"
+    assert result.newline == "\r\n"
+    assert result.mtime == document.mtime
+
+
+def test_mapped_textdocument_close(tmp_path):
+    """A memory-mapped document closes its memory map at the end of a ``with`` block"""
+    dummy_txt = tmp_path / "dummy.txt"
+    dummy_txt.write_bytes(b"dummy\ncontent\n")
+    document = TextDocument.from_file(dummy_txt, memory_map=True)
+    assert isinstance(document, MappedTextDocument)
+
+    with document:
+        assert document.lines == ("dummy", "content")
+
+    with pytest.raises(ValueError, match="closed"):
+        document.lines[0]  # pylint: disable=pointless-statement
+
+
+@pytest.mark.kwparametrize(
+    dict(string="", expect=""),
+    dict(string="a\nb\n", expect="a\nb\n"),
+    dict(string="a\r\nb\r\n", expect="a\nb\n"),
+    dict(string="a\rb\r\nc\n", expect="a\nb\nc\n"),
+)
+def test_normalize_newlines(string, expect):
+    """normalize_newlines() converts CR and CRLF newlines to LF"""
+    assert normalize_newlines(string) == expect
+
+
+@pytest.mark.kwparametrize(
+    dict(string="", expect=[]),
+    dict(string="\n", expect=[""]),
+    dict(string="\r\n\r\n", expect=[""]),
+    dict(string="a", expect=["a"]),
+    dict(string="a\nb", expect=["a", "b"]),
+    dict(string="a\nb\n\n\n", expect=["a", "b"]),
+    dict(string="\n\na\n\nb\n", expect=["", "", "a", "", "b"]),
+    dict(string="a\r\nb\r\n", expect=["a", "b"]),
+    dict(string="a\rb\r", expect=["a", "b"]),
+    dict(string="a\r\n\rb\nc\r\r\n", expect=["a", "", "b", "c"]),
+)
+def test_splitlines(string, expect):
+    """splitlines() splits at universal newlines and ignores trailing newlines"""
+    assert splitlines(string) == expect
+
+
 def test_joinlines():
     """``joinlines() concatenates and adds a newline after each given string item"""
     result = joinlines(("a", "b", "c"))
@@ -363,6 +722,21 @@ def test_get_common_root(tmpdir):
     assert result == tmpdir / "a" / "b"
 
 
+@pytest.mark.skipif(os.name != "posix", reason="Symlinks need privileges on Windows")
+def test_get_common_root_symlinks(tmp_path):
+    """``get_common_root()`` resolves symlinks also in the last path component"""
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "c").mkdir()
+    (tmp_path / "c" / "file.py").touch()
+    (tmp_path / "a" / "link").symlink_to(tmp_path / "c")
+    (tmp_path / "a" / "b" / "file_link.py").symlink_to(tmp_path / "c" / "file.py")
+    paths = [tmp_path / "a" / "link" / "file.py", tmp_path / "a" / "b" / "file_link.py"]
+
+    result = get_common_root(paths)
+
+    assert result == (tmp_path / "c").resolve()
+
+
 def test_get_common_root_of_directory(tmpdir):
     """``get_common_root()`` returns a single directory itself"""
     tmpdir = Path(tmpdir)
@@ -0,0 +1,125 @@
+"""Unit tests for `darkgraylib.watch`"""
+
+# pylint: disable=redefined-outer-name
+
+import sys
+import threading
+from unittest.mock import call, patch
+
+import pytest
+
+from darkgraylib import watch
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is only available on Linux"
+)
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    """A watcher for a temporary directory with a subdirectory"""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    with watch.Watcher([tmp_path], debounce=0.05) as result:
+        yield result
+
+
+def test_watcher_timeout(watcher):
+    """No changes are reported if nothing changes"""
+    assert watcher.read_batch(timeout=0.01) == set()
+
+
+def test_watcher_batch(tmp_path, watcher):
+    """A burst of changes is reported as a single batch"""
+    (tmp_path / "a.py").write_text("a")
+    (tmp_path / "sub" / "b.py").write_text("b")
+    (tmp_path / "a.py").write_text("a2")
+    (tmp_path / "node_modules" / "ignored.js").write_text("c")
+
+    result = watcher.read_batch(timeout=2)
+
+    assert result == {tmp_path / "a.py", tmp_path / "sub" / "b.py"}
+    assert watcher.read_batch(timeout=0.01) == set()
+
+
+def test_watcher_new_directory(tmp_path, watcher):
+    """New directories are watched, and files already in them are reported"""
+    (tmp_path / "new").mkdir()
+    (tmp_path / "new" / "c.py").write_text("c")
+    first = watcher.read_batch(timeout=2)
+    (tmp_path / "new" / "d.py").write_text("d")
+
+    second = watcher.read_batch(timeout=2)
+
+    assert tmp_path / "new" / "c.py" in first
+    assert second == {tmp_path / "new" / "d.py"}
+
+
+def test_watcher_file(tmp_path):
+    """For a file, only changes to it and to project root markers are reported"""
+    (tmp_path / "deep" / "deeper").mkdir(parents=True)
+    (tmp_path / "setup.py").write_text("")
+    with watch.Watcher([tmp_path / "setup.py"], debounce=0.05) as watcher:
+        (tmp_path / "setup.py").write_text("changed")
+        (tmp_path / "other.py").write_text("")
+        (tmp_path / "pyproject.toml").write_text("")
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "new").mkdir()
+        (tmp_path / "deep" / "deeper" / "notes.txt").write_text("")
+
+        result = watcher.read_batch(timeout=2)
+
+    assert result == {
+        tmp_path / "setup.py",
+        tmp_path / "pyproject.toml",
+        tmp_path / ".git",
+    }
+
+
+def test_watcher_file_in_watched_directory(tmp_path):
+    """A file in a watched directory tree doesn't limit what's reported"""
+    (tmp_path / "sub").mkdir()
+    paths = [tmp_path / "sub" / "a.py", tmp_path]
+    with watch.Watcher(paths, debounce=0.05) as watcher:
+        (tmp_path / "sub" / "b.py").write_text("")
+
+        result = watcher.read_batch(timeout=2)
+
+    assert result == {tmp_path / "sub" / "b.py"}
+
+
+def test_watcher_invalidates_project_root(tmp_path, watcher):
+    """Changes to project root markers invalidate the project root cache"""
+    with patch.object(watch, "clear_project_root_cache") as clear_project_root_cache:
+        (tmp_path / "sub" / "pyproject.toml").write_text("")
+        (tmp_path / "sub" / "c.py").write_text("")
+
+        watcher.read_batch(timeout=2)
+
+    assert clear_project_root_cache.call_args_list == [call(tmp_path / "sub")]
+
+
+def test_watch(tmp_path):
+    """`watch()` delivers batches to the callback until stopped"""
+    stop = threading.Event()
+    batches = []
+
+    def callback(paths):
+        batches.append(paths)
+        stop.set()
+
+    thread = threading.Thread(
+        target=watch.watch, args=([tmp_path], callback, 0.05, stop)
+    )
+    thread.start()
+    try:
+        # Keep writing until the watcher thread has started and seen a change
+        for _ in range(100):
+            (tmp_path / "a.py").write_text("a")
+            if stop.wait(0.05):
+                break
+    finally:
+        stop.set()
+        thread.join()
+
+    assert batches[0] == {tmp_path / "a.py"}
@@ -1,12 +1,12 @@
 """Configuration and fixtures for the Pytest based test suite"""
 
 import pytest
-from darkgraylib.files import find_project_root
+from darkgraylib.files import clear_project_root_cache
 
 
 @pytest.fixture
 def find_project_root_cache_clear() -> None:
-    """Clear LRU caching in `darkgraylib.files.find_project_root` before each test.
+    """Clear caching in `darkgraylib.files.find_project_root` before each test.
 
     To use this on all test cases in a test module, add this to the top::
 
@@ -16,4 +16,4 @@ def find_project_root_cache_clear() -> None:
     to protect from features and changes not applicable to Darker and Graylint.
 
     """
-    find_project_root.cache_clear()
+    clear_project_root_cache()
@@ -1,18 +1,65 @@
 """Miscellaneous utility functions"""
 
+# Modules needed only by some of the functions are imported when first needed, to speed
+# up starting the command line tools
+# pylint: disable=import-outside-toplevel
+
 import io
+import mmap
+import os
+import re
 import sys
-import tokenize
-from datetime import datetime, timezone
+from array import array
+from codecs import BOM_UTF8
 from itertools import chain
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
 
 TextLines = Tuple[str, ...]
 
+LineNormalization = Literal["exact", "ignore-trailing-whitespace", "ignore-indentation"]
+
+MemoryPolicy = Literal["keep-both", "keep-lines", "keep-string"]
+
+# Functions for turning lines into comparison keys for each line normalization mode.
+# Lines are already split at universal newlines, so stripping trailing whitespace also
+# removes any stray carriage returns left over from mixed newlines.
+LINE_NORMALIZERS: Dict[str, Callable[[str], str]] = {
+    "ignore-trailing-whitespace": str.rstrip,
+    "ignore-indentation": str.strip,
+}
+
 WINDOWS = sys.platform.startswith("win")
 GIT_DATEFORMAT = "%Y-%m-%d %H:%M:%S.%f +0000"
 
+# A modification time is either a formatted string or seconds since the Unix epoch
+Mtime = Union[str, float]
+
+NEWLINE_BYTES_RE = re.compile(rb"\r\n?|\n")
+
+
+def format_mtime(timestamp: float) -> str:
+    """Format seconds since the Unix epoch as a modification time in UTC
+
+    :param timestamp: The modification time as a Unix timestamp
+    :return: The modification time formatted like in Git diffs
+
+    """
+    from datetime import datetime, timezone
+
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(GIT_DATEFORMAT)
+
 
 def detect_newline(string: str) -> str:
     """Detect LF or CRLF newlines in a string by looking at the end of the first line"""
@@ -24,25 +71,89 @@ def detect_newline(string: str) -> str:
 
 def normalize_newlines(string: str) -> str:
     """Normalize newlines in a string to LF"""
+    if "\r" not in string:
+        return string
     return io.IncrementalNewlineDecoder(None, True).decode(string)
 
 
 def splitlines(string: str) -> list[str]:
-    """Split a string into lines at universal newlines."""
+    """Split a string into lines at universal newlines.
+
+    Strings with only LF newlines are split without normalizing them first, and
+    trailing newlines are dropped after splitting instead of copying the string.
+
+    """
     if not string:
         return []
-    return (
-        normalize_newlines(string)  # Normalize newlines to LF
-        .rstrip("\n")  # Remove trailing newline
-        .split("\n")  # Split into lines
-    )
+    lines = normalize_newlines(string).split("\n")
+    # Remove trailing newlines, but keep one empty line for strings with only newlines
+    while len(lines) > 1 and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _is_joined_lines(string: str, lines: TextLines, newline: str) -> bool:
+    """Return ``True`` if joining the lines with the newline reproduces the string
+
+    For LF and CRLF newlines, this is decided by counting characters without building
+    the joined string.
+
+    """
+    if len(string) != sum(map(len, lines)) + len(lines) * len(newline):
+        return False
+    if newline == "\n":
+        return "\r" not in string
+    if newline == "\r\n":
+        return string.count("\r\n") == len(lines)
+    return string == joinlines(lines, newline)
+
+
+def _is_split_lines(string: str, lines: TextLines, newline: str) -> bool:
+    """Return ``True`` if `splitlines` reproduces the lines from the string
+
+    The string must be the lines joined with the newline. Splitting it doesn't give the
+    same lines if a line contains newline characters, or the last one of several lines
+    is empty.
+
+    """
+    if newline not in {"\n", "\r\n"} or not _is_joined_lines(string, lines, newline):
+        return False
+    if len(lines) > 1 and not lines[-1]:
+        return False
+    expect_cr = len(lines) if newline == "\r\n" else 0
+    return string.count("\n") == len(lines) and string.count("\r") == expect_cr
 
 
 class TextDocument:
-    """Store & handle a multi-line text document, either as a string or list of lines"""
+    """Store & handle a multi-line text document, either as a string or list of lines
+
+    To save memory, documents have no instance dictionary, and the `MEMORY_POLICY`
+    class attribute controls whether both the string and the lines are kept once both
+    have been computed:
+
+    - ``"keep-both"`` (the default) caches both forms
+    - ``"keep-lines"`` drops the string once lines have been split from it, as long as
+      the string can be reproduced exactly from the lines, and doesn't cache strings
+      built from lines
+    - ``"keep-string"`` doesn't cache lines split from the string, and drops the lines
+      once a string has been built from them, as long as the lines can be reproduced
+      exactly by splitting the string
+
+    """
+
+    __slots__ = (
+        "_string",
+        "_lines",
+        "_encoding",
+        "_newline",
+        "_mtime",
+        "_normalized_lines",
+        "_fingerprint",
+    )
 
     DEFAULT_ENCODING = "utf-8"
     DEFAULT_NEWLINE = "\n"
+    MEMORY_POLICY: MemoryPolicy = "keep-both"
 
     # pylint: disable=too-many-arguments,too-many-positional-arguments
     def __init__(
@@ -51,13 +162,15 @@ class TextDocument:
         lines: Iterable[str] = None,
         encoding: str = DEFAULT_ENCODING,
         newline: str = DEFAULT_NEWLINE,
-        mtime: str = "",
+        mtime: Mtime = "",
     ):
-        self._string = string
-        self._lines = None if lines is None else tuple(lines)
+        self._string: Optional[str] = string
+        self._lines: Optional[TextLines] = None if lines is None else tuple(lines)
         self._encoding = encoding
         self._newline = newline
         self._mtime = mtime
+        self._normalized_lines: Optional[Dict[str, TextLines]] = None
+        self._fingerprint: Optional[bytes] = None
 
     def string_with_newline(self, newline: str) -> str:
         """Return the document as a string, using the given newline sequence"""
@@ -68,9 +181,19 @@ class TextDocument:
     @property
     def string(self) -> str:
         """Return the document as a string, converting and caching if necessary"""
-        if self._string is None:
-            self._string = self.string_with_newline(self.newline)
-        return self._string
+        if self._string is not None:
+            return self._string
+        string = self.string_with_newline(self.newline)
+        if self.MEMORY_POLICY == "keep-lines":
+            return string
+        self._string = string
+        if (
+            self.MEMORY_POLICY == "keep-string"
+            and self._lines is not None
+            and _is_split_lines(string, self._lines, self.newline)
+        ):
+            self._lines = None
+        return string
 
     @property
     def encoded_string(self) -> bytes:
@@ -80,9 +203,79 @@ class TextDocument:
     @property
     def lines(self) -> TextLines:
         """Return the document as a list of lines converting and caching if necessary"""
-        if self._lines is None:
-            self._lines = tuple(splitlines(self._string or ""))
-        return self._lines
+        if self._lines is not None:
+            return self._lines
+        lines = tuple(splitlines(self._string or ""))
+        if self.MEMORY_POLICY == "keep-string" and self._string is not None:
+            return lines
+        self._lines = lines
+        if (
+            self.MEMORY_POLICY == "keep-lines"
+            and self._string is not None
+            and _is_joined_lines(self._string, lines, self._newline)
+        ):
+            self._string = None
+        return lines
+
+    def normalized_lines(self, normalization: LineNormalization) -> Sequence[str]:
+        """Return the lines of the document normalized for comparison
+
+        The normalized lines are computed on first use and cached for each
+        normalization mode, so documents which are only compared exactly don't pay for
+        normalization at all.
+
+        :param normalization: ``"exact"`` to return lines as such,
+                              ``"ignore-trailing-whitespace"`` to strip trailing
+                              whitespace, or ``"ignore-indentation"`` to strip both
+                              leading and trailing whitespace
+        :return: The normalized lines, one for each line in the document
+
+        """
+        if normalization == "exact":
+            return self.lines
+        if self._normalized_lines is None:
+            self._normalized_lines = {}
+        if normalization not in self._normalized_lines:
+            normalize = LINE_NORMALIZERS[normalization]
+            self._normalized_lines[normalization] = tuple(map(normalize, self.lines))
+        return self._normalized_lines[normalization]
+
+    @property
+    def fingerprint(self) -> bytes:
+        """Return a digest of the lines of the document, computing and caching it once
+
+        Like equality, the fingerprint ignores the encoding, newlines and modification
+        time of the document. This makes it suitable as a cache key for the content.
+
+        """
+        if self._fingerprint is None:
+            import hashlib
+
+            data = joinlines(self.lines).encode("utf-8", "surrogatepass")
+            self._fingerprint = hashlib.blake2b(data, digest_size=16).digest()
+        return self._fingerprint
+
+    def view(self, start: int = 0, stop: Optional[int] = None) -> "TextDocumentView":
+        """Return a document of a range of lines in this document without copying them
+
+        :param start: The index of the first line, as in slicing
+        :param stop: The index after the last line, as in slicing
+        :return: A view of the lines. See `TextDocumentView`.
+
+        """
+        return TextDocumentView(self, start, stop)
+
+    def git_blob_sha(self) -> str:
+        """Return the SHA-1 Git would use for a blob of the encoded document
+
+        :return: The object name as a hexadecimal string
+
+        """
+        data = self.encoded_string
+        header = f"blob {len(data)}\0".encode("ascii")
+        import hashlib
+
+        return hashlib.sha1(header + data, usedforsecurity=False).hexdigest()
 
     @property
     def encoding(self) -> str:
@@ -96,7 +289,13 @@ class TextDocument:
 
     @property
     def mtime(self) -> str:
-        """Return the last modification time of the document"""
+        """Return the last modification time of the document
+
+        A modification time given as a Unix timestamp is formatted on first access.
+
+        """
+        if not isinstance(self._mtime, str):
+            self._mtime = format_mtime(self._mtime)
         return self._mtime
 
     @classmethod
@@ -105,14 +304,15 @@ class TextDocument:
         string: str,
         encoding: str = DEFAULT_ENCODING,
         override_newline: str = None,
-        mtime: str = "",
+        mtime: Mtime = "",
     ) -> "TextDocument":
         """Create a document object from a string
 
         :param string: The contents of the new text document
         :param encoding: The character encoding to be used when writing out the bytes
         :param override_newline: Replace existing newlines with the given newline string
-        :param mtime: The modification time of the original file
+        :param mtime: The modification time of the original file, either formatted or as
+                      a Unix timestamp
 
         """
         newline = detect_newline(string)
@@ -122,13 +322,36 @@ class TextDocument:
         return cls(string, None, encoding=encoding, newline=newline, mtime=mtime)
 
     @classmethod
-    def from_bytes(cls, data: bytes, mtime: str = "") -> "TextDocument":
+    def from_bytes(cls, data: bytes, mtime: Mtime = "") -> "TextDocument":
         """Create a document object from a binary string
 
+        UTF-8 content without a coding cookie, optionally with a byte order mark, is
+        decoded directly. Otherwise the encoding is detected like in Python source
+        files using `tokenize.detect_encoding`.
+
         :param data: The binary content of the new text document
-        :param mtime: The modification time of the original file
+        :param mtime: The modification time of the original file, either formatted or as
+                      a Unix timestamp
 
         """
+        start = len(BOM_UTF8) if data.startswith(BOM_UTF8) else 0
+        encoding = "utf-8-sig" if start else "utf-8"
+        if start == len(data):
+            return cls(lines=[], encoding=encoding, mtime=mtime)
+        # Like `tokenize.detect_encoding`, look for a coding cookie on two first lines
+        first_lf_pos = data.find(b"\n", start)
+        second_lf_pos = -1 if first_lf_pos < 0 else data.find(b"\n", first_lf_pos + 1)
+        cookie_end = len(data) if second_lf_pos < 0 else second_lf_pos
+        if data.find(b"coding", start, cookie_end) < 0:
+            try:
+                with memoryview(data) as view:
+                    string = str(view[start:], "utf-8")
+            except UnicodeDecodeError:
+                pass  # let the slow path below raise the usual exception
+            else:
+                return cls.from_str(string, encoding=encoding, mtime=mtime)
+        import tokenize
+
         srcbuf = io.BytesIO(data)
         encoding, lines = tokenize.detect_encoding(srcbuf.readline)
         if not lines:
@@ -136,15 +359,24 @@ class TextDocument:
         return cls.from_str(data.decode(encoding), encoding=encoding, mtime=mtime)
 
     @classmethod
-    def from_file(cls, path: Path) -> "TextDocument":
+    def from_file(cls, path: Path, memory_map: bool = False) -> "TextDocument":
         """Create a document object by reading a text file
 
         Also store the last modification time of the file.
 
+        :param path: The path to the file to read
+        :param memory_map: If ``True``, memory-map UTF-8 encoded files instead of reading
+                           them, and decode lines only when accessed. See
+                           `MappedTextDocument`. The ``lines`` of such a document are a
+                           `MappedLines` sequence, not a tuple.
+        :return: The text document
+
         """
-        mtime = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).strftime(
-            GIT_DATEFORMAT
-        )
+        mtime = path.stat().st_mtime
+        if memory_map:
+            document = MappedTextDocument.from_path(path, mtime)
+            if document is not None:
+                return document
         with path.open("rb") as srcbuf:
             return cls.from_bytes(srcbuf.read(), mtime)
 
@@ -154,7 +386,7 @@ class TextDocument:
         lines: Iterable[str],
         encoding: str = DEFAULT_ENCODING,
         newline: str = DEFAULT_NEWLINE,
-        mtime: str = "",
+        mtime: Mtime = "",
     ) -> "TextDocument":
         """Create a document object from a list of lines
 
@@ -168,10 +400,16 @@ class TextDocument:
         """Compare the equality two text documents, ignoring the modification times"""
         if not isinstance(other, TextDocument):
             return NotImplemented
+        if self._fingerprint is not None and other._fingerprint is not None:
+            return self._fingerprint == other._fingerprint
         if not self._string and not self._lines:
             return not other._string and not other._lines
         return self.lines == other.lines
 
+    def __hash__(self) -> int:
+        """Hash the document by its content fingerprint"""
+        return hash(self.fingerprint)
+
     def __repr__(self) -> str:
         """Return a Python representation of the document object"""
         encoding = (
@@ -184,7 +422,7 @@ class TextDocument:
             if self.newline == self.DEFAULT_NEWLINE
             else f", newline={self.newline!r}"
         )
-        mtime = "" if not self._mtime else f", mtime={self._mtime!r}"
+        mtime = "" if self._mtime == "" else f", mtime={self.mtime!r}"
         return (
             f"{type(self).__name__}("
             f"[{len(self.lines)} lines]"
@@ -192,9 +430,292 @@ class TextDocument:
         )
 
 
+class MappedLines(Sequence[str]):
+    """The lines of a memory-mapped UTF-8 file, decoded only when accessed
+
+    An index of line start offsets is built on first access. It takes eight bytes per
+    line, instead of a string object for every line. Lines are split at universal
+    newlines like in `splitlines`.
+
+    """
+
+    __slots__ = ("_buffer", "_start", "_offsets")
+
+    def __init__(self, buffer: mmap.mmap, start: int = 0):
+        """Wrap the given memory-mapped buffer
+
+        :param buffer: The memory-mapped file content
+        :param start: The offset of the first line, e.g. to skip a byte order mark
+
+        """
+        self._buffer = buffer
+        self._start = start
+        self._offsets: Optional["array[int]"] = None
+
+    @property
+    def offsets(self) -> "array[int]":
+        """Return start offsets of lines, followed by the end offset of the last line"""
+        if self._offsets is None:
+            self._offsets = self._index_lines()
+        return self._offsets
+
+    def _index_lines(self) -> "array[int]":
+        """Find the start offset of each line in the buffer"""
+        buffer, start = self._buffer, self._start
+        end = len(buffer)
+        # Like `splitlines`, ignore all newlines at the end of the document
+        while end > start and buffer[end - 1] in b"\r\n":
+            end -= 1
+        offsets = array("Q")
+        if end == start and len(buffer) == start:
+            return offsets
+        offsets.append(start)
+        offsets.extend(
+            match.end() for match in NEWLINE_BYTES_RE.finditer(buffer, start, end)
+        )
+        offsets.append(end)
+        return offsets
+
+    def __len__(self) -> int:
+        """Return the number of lines"""
+        return max(len(self.offsets) - 1, 0)
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(
+        self, index: "slice[Optional[int], Optional[int], Optional[int]]"
+    ) -> TextLines:
+        ...
+
+    def __getitem__(
+        self, index: "Union[int, slice[Optional[int], Optional[int], Optional[int]]]"
+    ) -> Union[str, TextLines]:
+        """Decode and return a line, or a tuple of lines for a slice"""
+        if isinstance(index, slice):
+            return tuple(self._decode(line) for line in range(len(self))[index])
+        return self._decode(range(len(self))[index])
+
+    def __iter__(self) -> Iterator[str]:
+        """Decode and yield each line in turn"""
+        return map(self._decode, range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the lines to any sequence of strings, item by item"""
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            line == other_line for line, other_line in zip(self, other)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def _decode(self, line: int) -> str:
+        """Decode a line without its trailing newline"""
+        start, end = self.offsets[line], self.offsets[line + 1]
+        return self._buffer[start:end].rstrip(b"\r\n").decode("utf-8")
+
+
+class MappedTextDocument(TextDocument):
+    """A text document backed by a memory-mapped UTF-8 file
+
+    The lines of the document are a `MappedLines` sequence, which decodes lines only on
+    access. The string of the whole document is decoded only if requested. Unlike with
+    `TextDocument.from_bytes`, invalid UTF-8 is only detected when it's decoded.
+
+    When pickled, e.g. for passing to another process, the document is converted to a
+    regular `TextDocument`.
+
+    The memory map stays open until `close` is called, or until the end of a ``with``
+    block using the document. The document must not outlive a rewrite of its file in
+    place: truncating a memory-mapped file makes reading its lines crash the process
+    with a bus error. Close the document first, or replace the file with a new one like
+    `darkgraylib.files.write_documents` does.
+
+    """
+
+    __slots__ = ("_buffer", "_start", "_mapped_lines")
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        buffer: mmap.mmap,
+        start: int = 0,
+        encoding: str = TextDocument.DEFAULT_ENCODING,
+        newline: str = TextDocument.DEFAULT_NEWLINE,
+        mtime: Mtime = "",
+    ):
+        super().__init__(None, None, encoding=encoding, newline=newline, mtime=mtime)
+        self._buffer = buffer
+        self._start = start
+        self._mapped_lines = MappedLines(buffer, start)
+
+    @classmethod
+    def from_path(cls, path: Path, mtime: Mtime = "") -> Optional["MappedTextDocument"]:
+        """Memory-map a UTF-8 encoded file
+
+        :param path: The path to the file to map
+        :param mtime: The modification time of the file
+        :return: The document, or ``None`` if the file is empty or not UTF-8 encoded
+
+        """
+        with path.open("rb") as srcbuf:
+            if not path.stat().st_size:
+                return None  # empty files can't be memory-mapped
+            buffer = mmap.mmap(srcbuf.fileno(), 0, access=mmap.ACCESS_READ)
+        import tokenize
+
+        encoding, _ = tokenize.detect_encoding(buffer.readline)
+        if encoding not in {"utf-8", "utf-8-sig"}:
+            buffer.close()
+            return None
+        start = len(BOM_UTF8) if encoding == "utf-8-sig" else 0
+        first_lf_pos = buffer.find(b"\n", start)
+        newline = (
+            "\r\n"
+            if first_lf_pos > start and buffer[first_lf_pos - 1] == ord("\r")
+            else "\n"
+        )
+        return cls(buffer, start, encoding=encoding, newline=newline, mtime=mtime)
+
+    def close(self) -> None:
+        """Close the memory map of the file
+
+        Lines and the string which haven't been decoded yet can't be accessed after
+        closing.
+
+        """
+        self._buffer.close()
+
+    @property
+    def lines(self) -> Sequence[str]:  # type: ignore[override]
+        """Return the lines of the file, decoded only when accessed
+
+        Unlike for other documents, the lines are a `MappedLines` sequence instead of a
+        tuple. They can't be hashed or concatenated with tuples.
+
+        """
+        return self._mapped_lines
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the lines of two documents, ignoring the modification times"""
+        if not isinstance(other, TextDocument):
+            return NotImplemented
+        return self.lines == other.lines
+
+    __hash__ = TextDocument.__hash__
+
+    def __enter__(self) -> "MappedTextDocument":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def string(self) -> str:
+        """Return the document as a string, decoding the file if necessary"""
+        if self._string is not None:
+            return self._string
+        start = self._start
+        with memoryview(self._buffer) as view:
+            string = str(view[start:], "utf-8")
+        if self.MEMORY_POLICY != "keep-lines":
+            self._string = string
+        return string
+
+    def __reduce__(self) -> Tuple[type, Tuple[str, None, str, str, Mtime]]:
+        """Pickle as a regular text document, since memory maps can't be pickled"""
+        return (
+            TextDocument,
+            (self.string, None, self.encoding, self.newline, self._mtime),
+        )
+
+
 DiffChunk = Tuple[int, TextLines, TextLines]
 
 
+class TextDocumentView(TextDocument):
+    """A range of lines in another text document
+
+    The lines of the range are sliced from the parent document only when accessed, and
+    the string and encoded string only when requested. The encoding, newline and
+    modification time are those of the parent document.
+
+    """
+
+    __slots__ = ("_parent", "_start", "_stop")
+
+    def __init__(
+        self, parent: TextDocument, start: int = 0, stop: Optional[int] = None
+    ):
+        """Refer to a range of lines in the parent document
+
+        :param parent: The document to refer to
+        :param start: The index of the first line, as in slicing
+        :param stop: The index after the last line, as in slicing
+
+        """
+        super().__init__(
+            None,
+            None,
+            encoding=parent.encoding,
+            newline=parent.newline,
+            mtime=parent._mtime,  # pylint: disable=protected-access
+        )
+        line_range = range(len(parent.lines))[start:stop]
+        offset = 0
+        if isinstance(parent, TextDocumentView):
+            # Refer directly to the lines of the original document
+            offset = parent._start
+            parent = parent._parent
+        self._parent: TextDocument = parent
+        self._start: int = offset + line_range.start
+        self._stop: int = offset + max(line_range.start, line_range.stop)
+
+    @property
+    def parent(self) -> TextDocument:
+        """Return the document this is a view of"""
+        return self._parent
+
+    @property
+    def start(self) -> int:
+        """Return the index of the first line in the parent document"""
+        return self._start
+
+    @property
+    def stop(self) -> int:
+        """Return the index after the last line in the parent document"""
+        return self._stop
+
+    @property
+    def lines(self) -> TextLines:
+        """Return the lines in the range, slicing them from the parent if necessary"""
+        if self._lines is not None:
+            return self._lines
+        start, stop = self._start, self._stop
+        lines = self._parent.lines[start:stop]
+        if self.MEMORY_POLICY != "keep-string":
+            self._lines = lines
+        return lines
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the lines in the range to the lines of another document"""
+        if not isinstance(other, TextDocument):
+            return NotImplemented
+        return self.lines == other.lines
+
+    __hash__ = TextDocument.__hash__
+
+    def __reduce__(self) -> Tuple[type, Tuple[None, TextLines, str, str, Mtime]]:
+        """Pickle as a regular text document, without the parent document"""
+        return (
+            TextDocument,
+            (None, self.lines, self.encoding, self.newline, self._mtime),
+        )
+
+
 def joinlines(lines: Iterable[str], newline: str = "\n") -> str:
     """Join a list of lines back, adding a linefeed after each line
 
@@ -218,11 +739,49 @@ def get_path_ancestry(path: Path) -> Iterable[Path]:
     return reverse_parents
 
 
+def _resolve_with_parent_cache(path: Path, resolved_parents: Dict[Path, Path]) -> Path:
+    """Resolve a path, resolving each parent directory only once
+
+    Paths ending in a symlink or a relative component are resolved in full.
+
+    :param path: The path to resolve
+    :param resolved_parents: A cache of already resolved parent directories
+    :return: The resolved path
+
+    """
+    if path.name in {"", ".", ".."} or path.is_symlink():
+        return path.resolve()
+    parent = path.parent
+    if parent not in resolved_parents:
+        resolved_parents[parent] = parent.resolve()
+    return resolved_parents[parent] / path.name
+
+
 def get_common_root(paths: Iterable[Path]) -> Path:
-    """Find the deepest common parent directory of given paths"""
-    resolved_paths = [path.resolve() for path in paths]
-    parents = reversed(list(zip(*(get_path_ancestry(path) for path in resolved_paths))))
-    for first_path, *other_paths in parents:
-        if all(path == first_path for path in other_paths):
-            return first_path
-    raise ValueError(f"Paths have no common parent Git root: {resolved_paths}")
+    """Find the deepest common parent directory of given paths
+
+    The common prefix of the paths is narrowed down one path at a time.
+
+    """
+    resolved_parents: Dict[Path, Path] = {}
+    resolved_paths = []
+    common_parts: Tuple[str, ...] = ()
+    common_keys: Tuple[str, ...] = ()
+    for path in paths:
+        resolved = _resolve_with_parent_cache(path, resolved_parents)
+        resolved_paths.append(resolved)
+        # The ancestry of a file ends in its parent, and that of a directory in itself
+        parts = resolved.parts if resolved.is_dir() else resolved.parts[:-1]
+        keys = tuple(map(os.path.normcase, parts)) if WINDOWS else parts
+        if len(resolved_paths) == 1:
+            common_parts, common_keys = parts, keys
+            continue
+        length = 0
+        for common_key, key in zip(common_keys, keys):
+            if common_key != key:
+                break
+            length += 1
+        common_parts, common_keys = common_parts[:length], common_keys[:length]
+    if not common_parts:
+        raise ValueError(f"Paths have no common parent Git root: {resolved_paths}")
+    return Path(*common_parts)
@@ -0,0 +1,284 @@
+"""Watch source files for changes using Linux inotify
+
+This lets Darker and Graylint run continuously during local development::
+
+    >>> def process(paths):  # doctest: +SKIP
+    ...     print(sorted(paths))
+    >>> watch([Path("src")], process)  # doctest: +SKIP
+
+Bursts of changes, e.g. from an editor saving many files, are collected into a single
+batch of changed paths. Caches which depend on changed files are invalidated before the
+batch is delivered.
+
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from darkgraylib.config import clear_config_cache
+from darkgraylib.discovery import DEFAULT_EXCLUDED_DIRECTORIES
+from darkgraylib.files import clear_project_root_cache
+
+# Constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+EVENT_HEADER = struct.Struct("iIII")
+
+# Names of files whose changes affect cached project roots
+PROJECT_ROOT_MARKERS = frozenset({".git", ".hg", "pyproject.toml"})
+
+DEFAULT_DEBOUNCE_SECONDS = 0.2
+
+
+def _load_libc() -> ctypes.CDLL:
+    """Load the C library with the inotify functions
+
+    :raise OSError: if not running on Linux
+
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(
+            f"Watching files needs Linux inotify, not available on {sys.platform}"
+        )
+    return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+
+def invalidate_caches(paths: Iterable[Path]) -> None:
+    """Invalidate cached information about the given changed files
+
+    :param paths: Paths of files which have been created, modified or removed
+
+    """
+    for path in paths:
+        if path.name in PROJECT_ROOT_MARKERS:
+            clear_project_root_cache(path.parent)
+        if path.name == "pyproject.toml":
+            clear_config_cache(path)
+
+
+class Watcher:
+    """Collect changes to files in directory trees and to individual files
+
+    Every directory in the trees is watched, except for directories with names in
+    `DEFAULT_EXCLUDED_DIRECTORIES`. New directories are watched when they appear.
+
+    For individual files, only the parent directory is watched, and only changes to
+    those files and to project root markers in the same directory are reported.
+
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+        excluded_directories: Iterable[str] = DEFAULT_EXCLUDED_DIRECTORIES,
+    ):
+        """Start watching the given files and directories
+
+        :param paths: Files and directories to watch
+        :param debounce: Seconds to wait for more changes after a change
+        :param excluded_directories: Names of directories not to watch
+        :raise OSError: if inotify is not available
+
+        """
+        self._libc = _load_libc()
+        self._debounce = debounce
+        self._excluded_directories = frozenset(excluded_directories)
+        self._directories: Dict[int, Path] = {}
+        # Names of watched files in directories which aren't watched as a whole
+        self._file_names: Dict[Path, Set[str]] = {}
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        files = []
+        for path in paths:
+            path = path.resolve()
+            if path.is_dir():
+                self._add_tree(path)
+            else:
+                files.append(path)
+        for path in files:
+            self._add_file(path)
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop watching and release the inotify file descriptor"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add_file(self, path: Path) -> None:
+        """Watch a single file unless its directory is already watched as a whole"""
+        directory = path.parent
+        if directory not in self._file_names:
+            if directory in self._directories.values():
+                return
+            watch_descriptor = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(directory), WATCH_MASK
+            )
+            if watch_descriptor < 0:
+                return  # the directory doesn't exist or can't be read
+            self._directories[watch_descriptor] = directory
+        self._file_names.setdefault(directory, set()).add(path.name)
+
+    def _add_tree(self, directory: Path, changed: Optional[Set[Path]] = None) -> None:
+        """Watch a directory and all its subdirectories
+
+        :param directory: The directory to watch
+        :param changed: For a new directory, the set of changed paths to add files in
+                        the directory to, since they may have been created before the
+                        directory was watched
+
+        """
+        watch_descriptor = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), WATCH_MASK
+        )
+        if watch_descriptor < 0:
+            return  # the directory vanished or can't be read
+        self._directories[watch_descriptor] = directory
+        self._file_names.pop(directory, None)
+        subdirectories = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=False):
+                        if changed is not None:
+                            changed.add(Path(entry.path))
+                    elif entry.name not in self._excluded_directories:
+                        subdirectories.append(Path(entry.path))
+        except OSError:
+            return
+        for subdirectory in subdirectories:
+            self._add_tree(subdirectory, changed)
+
+    def _read_events(self, changed: Set[Path]) -> None:
+        """Add paths from all pending inotify events to the set of changed paths"""
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                watch_descriptor, mask, _, length = EVENT_HEADER.unpack_from(
+                    data, offset
+                )
+                offset += EVENT_HEADER.size
+                end = offset + length
+                name = data[offset:end].rstrip(b"\0")
+                offset = end
+                self._handle_event(watch_descriptor, mask, os.fsdecode(name), changed)
+
+    def _handle_event(
+        self, watch_descriptor: int, mask: int, name: str, changed: Set[Path]
+    ) -> None:
+        """Record a changed path, and watch new directories"""
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost, so report every watched directory and file as changed
+            for watched in self._directories.values():
+                watched_names = self._file_names.get(watched)
+                if watched_names is None:
+                    changed.add(watched)
+                else:
+                    changed.update(watched / name for name in watched_names)
+            return
+        directory = self._directories.get(watch_descriptor)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            del self._directories[watch_descriptor]
+            self._file_names.pop(directory, None)
+            return
+        if not name:
+            return  # the directory itself was deleted
+        path = directory / name
+        file_names = self._file_names.get(directory)
+        if file_names is not None:
+            if name in file_names or name in PROJECT_ROOT_MARKERS:
+                changed.add(path)
+            return
+        if mask & IN_ISDIR:
+            if (
+                mask & (IN_CREATE | IN_MOVED_TO)
+                and name not in self._excluded_directories
+            ):
+                self._add_tree(path, changed)
+            if name not in PROJECT_ROOT_MARKERS:
+                return
+        changed.add(path)
+
+    def read_batch(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Wait for changes, and return paths changed during a burst of changes
+
+        After the first change, changes are collected until there have been none for
+        the debounce period.
+
+        :param timeout: Maximum seconds to wait for the first change, or ``None`` to
+                        wait indefinitely
+        :return: Paths of created, modified, moved and deleted files and marker
+                 directories. Empty if the timeout expired.
+
+        """
+        changed: Set[Path] = set()
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return changed
+        while True:
+            self._read_events(changed)
+            if not select.select([self._fd], [], [], self._debounce)[0]:
+                break
+        invalidate_caches(changed)
+        return changed
+
+
+def watch(
+    paths: Iterable[Path],
+    callback: Callable[[Set[Path]], None],
+    debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """Call a function with batches of changed paths until stopped
+
+    :param paths: Files and directories to watch, e.g. ``src`` from the command line
+    :param callback: The function to call with the set of paths changed in a burst
+    :param debounce: Seconds to wait for more changes after a change
+    :param stop: An event to set for stopping. Without one, watch until interrupted.
+
+    """
+    with Watcher(paths, debounce) as watcher:
+        while stop is None or not stop.is_set():
+            changed = watcher.read_batch(timeout=0.5)
+            if changed:
+                callback(changed)